@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'abid_portfolio.settings')
+# Async page views (portfolio/views/main_async.py)
+os.environ.setdefault('PORTFOLIO_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .database import sqlite_databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -30,6 +33,11 @@ ALLOWED_HOSTS = ['*']
 # Site URL for absolute URLs
 SITE_URL = 'http://localhost:8000' if DEBUG else 'https://your-domain.com'  # Update this in production
 
+# Profile links (schema.org sameAs) and the contact address used in the
+# site's JSON-LD when no Profile has been entered
+SITE_SAME_AS = ('https://github.com/abid4850',)
+SITE_EMAIL = 'abidhussainnoul512@gmail.com'
+
 
 # Application definition
 
@@ -46,6 +54,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'portfolio.metrics.TimingMiddleware',
+    'portfolio.middleware.CompressionMiddleware',
+    'portfolio.nplusone.NPlusOneMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,10 +69,18 @@ ROOT_URLCONF = 'abid_portfolio.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, timed for Server-Timing (see portfolio/metrics.py)
+        'BACKEND': 'portfolio.metrics.TimedDjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory, so nothing is parsed per
+            # request. The runserver autoreloader still picks up edits.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -77,13 +96,97 @@ WSGI_APPLICATION = 'abid_portfolio.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# SQLite in WAL mode, with a read-only "replica" alias on the same file for
+# reads (see abid_portfolio/database.py and portfolio/routers.py).
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+DATABASES = sqlite_databases(BASE_DIR / 'db.sqlite3')
+
+DATABASE_ROUTERS = ['portfolio.routers.ReadWriteRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The page cache and its content version must be shared by every worker
+# process, so production uses the file-based backend instead of local memory.
+
+if DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+        }
+    }
+
+# Whole-page cache for the public views (see portfolio/cache.py), in seconds
+PAGE_CACHE_TIMEOUT = 60 * 10
+PAGE_CACHE_STALE_TIMEOUT = 60 * 60 * 24
+PAGE_CACHE_LOCK_TIMEOUT = 30
+# Query parameters that select a different cached page; others are ignored
+PAGE_CACHE_QUERY_PARAMS = ('cursor', 'q')
+
+# Versioned template fragments, JSON-LD and the site profile (see
+# portfolio/templatetags/fragment_extras.py)
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Minified/compressed bodies of ETagged responses (see portfolio/middleware.py)
+COMPRESSION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Posts per page on the blog listing
+BLOG_PAGE_SIZE = 10
+
+# Contact form submissions are queued and inserted in batches by a background
+# thread (see portfolio/writebehind.py). Set to False to save them inline.
+CONTACT_WRITE_BEHIND = True
+WRITE_BEHIND_BATCH_SIZE = 100
+WRITE_BEHIND_INTERVAL = 1.0
+WRITE_BEHIND_MAX_SIZE = 10000
+
+# Background jobs (see portfolio/jobs.py), run by `manage.py run_worker`.
+# JOBS_RUN_INLINE runs them in-process on commit instead (no worker needed).
+JOBS_RUN_INLINE = False
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 10            # seconds, doubled on every attempt
+JOB_MAX_RETRY_DELAY = 60 * 60
+JOB_LOCK_TIMEOUT = 60 * 30      # running jobs older than this are re-queued
+JOB_KEEP_DAYS = 7               # finished jobs are deleted after this
+
+# Default and maximum ?limit= of the JSON API list endpoints
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Above this many URLs sitemap.xml becomes an index of shards this size
+SITEMAP_SHARD_SIZE = 5000
+
+# Log SQL statements repeated this many times in one request to the
+# portfolio.nplusone logger (see portfolio/nplusone.py). Defaults to DEBUG.
+NPLUSONE_DETECTION = DEBUG
+NPLUSONE_THRESHOLD = 3
+
+# Server-Timing header on portfolio views, and the addresses allowed to read
+# /metrics/ (staff users always can). See portfolio/metrics.py.
+SERVER_TIMING = True
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Serve the pages with the async views in portfolio/views/main_async.py.
+# abid_portfolio/asgi.py turns this on; under WSGI every async view would
+# need an event loop of its own, so it stays off there.
+ASYNC_VIEWS = os.environ.get('PORTFOLIO_ASYNC_VIEWS') == '1'
+
+# Results `manage.py bench` compares against (written by --save-baseline)
+BENCH_BASELINE = BASE_DIR / 'bench-baseline.json'
+
+# Spec hashes of the cards rendered by create_logos and friends (see
+# portfolio/rendering.py); kept out of MEDIA_ROOT, which is public
+RENDER_MANIFEST = BASE_DIR / '.render-manifest.json'
+
+# Output directory of the export_static command
+STATIC_EXPORT_ROOT = BASE_DIR / 'export'
 
 
 # Password validation
@@ -130,6 +233,27 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    # Uploads are named by content hash so identical bytes are stored once
+    'default': {
+        'BACKEND': 'portfolio.storage.ContentAddressedStorage',
+    },
+    # Content-hashed file names (and staticfiles.json) in production, so
+    # /static/ can be cached forever; see portfolio/assets.py
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+        ),
+    },
+}
+
+# Vendored third-party assets and our own CSS/JS sources for build_assets
+ASSETS_ROOT = BASE_DIR / 'assets'
+
+# Widths of the responsive derivatives generated for uploaded images
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 960, 1280)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
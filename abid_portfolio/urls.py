@@ -18,19 +18,13 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap
-from portfolio.sitemaps import StaticViewSitemap, ProjectSitemap
-
-sitemaps = {
-    'static': StaticViewSitemap,
-    'projects': ProjectSitemap,
-}
+from portfolio.views.sitemaps import sitemap_index, sitemap_section
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('portfolio.urls')),
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps},
-         name='django.contrib.sitemaps.views.sitemap'),
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    path('sitemap-<slug:section>-<int:page>.xml', sitemap_section, name='sitemap_section'),
 ]
 
 # Serve media files during development
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Profile, SkillCategory, Skill, Education, Project, Service, Contact, Blog
+from django.utils import timezone
+from .models import Profile, SkillCategory, Skill, Education, Project, Service, Contact, Blog, Job
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
@@ -47,6 +48,7 @@ class BlogAdmin(admin.ModelAdmin):
     list_display = ['title', 'author', 'published_date', 'created_at']
     list_filter = ['published_date', 'created_at', 'author']
     search_fields = ['title', 'excerpt', 'content', 'author__username']
+    list_select_related = ['author']
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = ['created_at', 'updated_at']
     fieldsets = (
@@ -68,3 +70,19 @@ class BlogAdmin(admin.ModelAdmin):
         if obj:  # Editing existing object
             readonly.append('author')
         return readonly
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['task', 'status', 'priority', 'attempts', 'run_at', 'updated_at']
+    list_filter = ['status', 'task']
+    search_fields = ['task', 'last_error']
+    readonly_fields = ['locked_by', 'locked_at', 'last_error', 'created_at', 'updated_at']
+    actions = ['retry_jobs']
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now(), last_error='',
+        )
+        self.message_user(request, f'{count} job(s) queued again.')
@@ -0,0 +1,284 @@
+"""
+Front-end asset pipeline.
+
+Third-party CSS/JS/fonts are pinned below and downloaded once into
+``assets/vendor/``. Every vendored file must match the SRI hash recorded for
+it in ``assets/vendor.lock.json``, whether it was just downloaded or is
+already on disk; ``build_assets --pin`` records hashes for new entries, and
+the lock file is committed and reviewed like code. ``python manage.py build_assets`` concatenates them with
+our own sources in ``assets/src/`` into minified bundles under
+``static/dist/``:
+
+    site.css  Bootstrap, Font Awesome (only the icons we use), Inter, AOS, site styles
+    site.js   Bootstrap, AOS, site scripts
+    tilt.js   vanilla-tilt, for the projects page
+
+Fonts referenced by the CSS are copied to ``static/dist/fonts/``. The icon
+fonts are subset to the glyphs the templates and icon fields use when
+fontTools and brotli are installed (see requirements-optional.txt). In
+production ``ManifestStaticFilesStorage`` gives every file a content-hashed
+name, so it can be cached forever.
+
+Until the bundles have been built, ``{% bundle %}`` (see
+templatetags/asset_extras.py) falls back to the upstream CDN URLs and inlines
+our own sources, so the site works straight from a checkout.
+"""
+import importlib.util
+import base64
+import hashlib
+import json
+import re
+import shutil
+import urllib.request
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import DatabaseError
+
+FA_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0'
+
+
+class Source(NamedTuple):
+    path: str                  # relative to ASSETS_ROOT
+    url: Optional[str] = None  # upstream URL: downloaded from, and used until the bundle is built
+
+
+VENDOR = (
+    Source('vendor/bootstrap/bootstrap.min.css',
+           'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css'),
+    Source('vendor/bootstrap/bootstrap.bundle.min.js',
+           'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js'),
+    Source('vendor/fontawesome/css/all.min.css', f'{FA_CDN}/css/all.min.css'),
+    Source('vendor/fontawesome/webfonts/fa-solid-900.woff2', f'{FA_CDN}/webfonts/fa-solid-900.woff2'),
+    Source('vendor/fontawesome/webfonts/fa-regular-400.woff2', f'{FA_CDN}/webfonts/fa-regular-400.woff2'),
+    Source('vendor/fontawesome/webfonts/fa-brands-400.woff2', f'{FA_CDN}/webfonts/fa-brands-400.woff2'),
+    Source('vendor/inter/inter-latin-wght-normal.woff2',
+           'https://cdn.jsdelivr.net/npm/@fontsource-variable/inter@5.0.16/files/inter-latin-wght-normal.woff2'),
+    Source('vendor/aos/aos.css', 'https://unpkg.com/aos@2.3.1/dist/aos.css'),
+    Source('vendor/aos/aos.js', 'https://unpkg.com/aos@2.3.1/dist/aos.js'),
+    Source('vendor/vanilla-tilt/vanilla-tilt.min.js',
+           'https://cdnjs.cloudflare.com/ajax/libs/vanilla-tilt/1.7.2/vanilla-tilt.min.js'),
+)
+VENDOR_BY_PATH = {source.path: source for source in VENDOR}
+
+BUNDLES = {
+    'site.css': (
+        VENDOR_BY_PATH['vendor/bootstrap/bootstrap.min.css'],
+        VENDOR_BY_PATH['vendor/fontawesome/css/all.min.css'],
+        Source('src/inter.css',
+               'https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap'),
+        VENDOR_BY_PATH['vendor/aos/aos.css'],
+        Source('src/portfolio.css'),
+    ),
+    'site.js': (
+        VENDOR_BY_PATH['vendor/bootstrap/bootstrap.bundle.min.js'],
+        VENDOR_BY_PATH['vendor/aos/aos.js'],
+        Source('src/portfolio.js'),
+    ),
+    'tilt.js': (
+        VENDOR_BY_PATH['vendor/vanilla-tilt/vanilla-tilt.min.js'],
+    ),
+}
+
+DIST_DIR = 'dist'
+LOCK_NAME = 'vendor.lock.json'
+ICON_CSS = 'vendor/fontawesome/css/all.min.css'
+
+# Model fields holding Font Awesome class names entered in the admin
+ICON_FIELDS = (('portfolio.skillcategory', 'icon'), ('portfolio.service', 'icon'))
+
+ICON_CLASS_RE = re.compile(r'\bfa-[a-z0-9-]+')
+ICON_RULE_RE = re.compile(r'((?:\.fa-[a-z0-9-]+:(?:before|after),?)+)\{content:"\\([0-9a-f]+)"\}')
+FONT_FACE_RE = re.compile(r'@font-face\{[^}]*\}')
+URL_RE = re.compile(r'url\(([\'"]?)([^)\'"]+)\1\)(\s*format\([^)]*\))?')
+SOURCE_MAP_RE = re.compile(r'/[*/]# sourceMappingURL=[^\n]*?(\*/)?$', re.MULTILINE)
+
+
+def assets_root():
+    return Path(getattr(settings, 'ASSETS_ROOT', settings.BASE_DIR / 'assets'))
+
+
+def dist_root():
+    return Path(settings.STATICFILES_DIRS[0]) / DIST_DIR
+
+
+def _static_files():
+    """The collected manifest (``ManifestStaticFilesStorage``), else the built bundles."""
+    manifest_name = getattr(staticfiles_storage, 'manifest_name', None)
+    if manifest_name:
+        try:
+            manifest = Path(staticfiles_storage.path(manifest_name))
+        except NotImplementedError:
+            manifest = None
+        if manifest and manifest.exists():
+            return [manifest]
+    dist = dist_root()
+    return sorted(path for path in dist.rglob('*') if path.is_file()) if dist.exists() else []
+
+
+def static_state():
+    """``(fingerprint, mtime)`` of the built static files; one ``stat`` in production."""
+    stats = [(str(path), path.stat()) for path in _static_files()]
+    payload = repr([(name, st.st_size, st.st_mtime_ns) for name, st in stats]).encode('utf-8')
+    return hashlib.md5(payload).hexdigest(), max((st.st_mtime for _, st in stats), default=0)
+
+
+
+class IntegrityError(ValueError):
+    pass
+
+
+def sri(data):
+    """Subresource Integrity value of ``data``, as used in ``integrity=""``."""
+    return 'sha384-' + base64.b64encode(hashlib.sha384(data).digest()).decode('ascii')
+
+
+def load_lock():
+    """``{vendored path: SRI hash}`` from ``assets/vendor.lock.json``."""
+    try:
+        return json.loads((assets_root() / LOCK_NAME).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def save_lock(lock):
+    (assets_root() / LOCK_NAME).write_text(json.dumps(lock, indent=2, sort_keys=True) + '\n')
+
+
+def fetch(source, lock, refresh=False, pin=False):
+    """Download ``source`` into ``assets/`` unless it is already there.
+
+    The file must match its hash in ``lock``; a download that does not is
+    not written. With ``pin`` a source without a hash is pinned to what was
+    fetched. Returns whether the file was downloaded.
+    """
+    path = assets_root() / source.path
+    downloaded = refresh or not path.exists()
+    if downloaded:
+        with urllib.request.urlopen(source.url, timeout=30) as response:
+            data = response.read()
+    else:
+        data = path.read_bytes()
+
+    expected = lock.get(source.path)
+    if expected is None:
+        if not pin:
+            raise IntegrityError(f'{source.path} has no hash in {LOCK_NAME}; check it, then run build_assets --pin')
+        lock[source.path] = sri(data)
+    elif sri(data) != expected:
+        raise IntegrityError(f'{source.path} does not match its hash in {LOCK_NAME}')
+
+    if downloaded:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return downloaded
+
+
+def used_icons():
+    """Font Awesome class names used by the templates and icon fields."""
+    names = set()
+    for template_dir in Path(settings.BASE_DIR).glob('*/templates'):
+        for path in template_dir.rglob('*.html'):
+            names.update(ICON_CLASS_RE.findall(path.read_text(encoding='utf-8')))
+    for label, field in ICON_FIELDS:
+        try:
+            values = apps.get_model(label).objects.values_list(field, flat=True)
+            for value in values:
+                names.update(ICON_CLASS_RE.findall(value or ''))
+        except DatabaseError:
+            # No database yet (e.g. building before the first migrate)
+            pass
+    return names
+
+
+def prune_icons(css, names):
+    """Drop icon rules not in ``names``; return ``(css, codepoints)`` kept."""
+    codepoints = set()
+
+    def keep(match):
+        selectors = [s for s in match.group(1).split(',') if s.split(':')[0][1:] in names]
+        if not selectors:
+            return ''
+        codepoints.add(int(match.group(2), 16))
+        return f'{",".join(selectors)}{{content:"\\{match.group(2)}"}}'
+
+    return ICON_RULE_RE.sub(keep, css), codepoints
+
+
+def minify_css(css):
+    """Minifier for our own stylesheets; vendored files ship minified."""
+    css = re.sub(r'/\*(?!!).*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    # Not before ':', where a space can be a descendant combinator (`.a :hover`)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(js):
+    """Conservative minifier for our own scripts: comments and indentation only."""
+    lines = []
+    for line in js.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def read_source(source):
+    text = (assets_root() / source.path).read_text(encoding='utf-8')
+    return SOURCE_MAP_RE.sub('', text)
+
+
+def rewrite_urls(css, source, fonts):
+    """Point font ``url()``s at ``fonts/`` and collect them into ``fonts``.
+
+    ``src`` entries for files that are not vendored (TrueType fallbacks, the
+    v4 compatibility font) are dropped, along with ``@font-face`` rules left
+    without any.
+    """
+    base = (assets_root() / source.path).parent
+
+    def rewrite(match):
+        target = (base / match.group(2)).resolve()
+        if not target.exists():
+            return ''
+        fonts[target.name] = target
+        return f'url(fonts/{target.name}){match.group(3) or ""}'
+
+    def rewrite_face(match):
+        face = URL_RE.sub(rewrite, match.group(0))
+        face = re.sub(r'src:[,\s]*', 'src:', face)
+        face = re.sub(r',\s*(?=[;}])', '', face)
+        face = re.sub(r',\s*,', ',', face)
+        return '' if re.search(r'src:\s*[;}]', face) else face
+
+    return FONT_FACE_RE.sub(rewrite_face, css)
+
+
+def subset_font(source, target, codepoints):
+    """Write ``source`` to ``target`` keeping only ``codepoints``.
+
+    Returns False (and copies the whole font) when fontTools or its brotli
+    dependency for WOFF2 is not installed.
+    """
+    try:
+        from fontTools import subset
+    except ImportError:
+        subset = None
+    # fontTools imports brotli itself when it writes WOFF2
+    if subset is None or importlib.util.find_spec('brotli') is None:
+        shutil.copyfile(source, target)
+        return False
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    font = subset.load_font(str(source), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    subset.save_font(font, str(target), options)
+    return True
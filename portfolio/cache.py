@@ -0,0 +1,242 @@
+"""
+Page cache for the public portfolio views.
+
+Cached pages are keyed by a site-wide content version that is bumped whenever
+an admin edit touches one of the models the pages are built from (see
+``portfolio.signals``), and by the built static files, so pages never point at
+the assets of an earlier ``build_assets``/``collectstatic``. A bump makes every cached page miss at once, so to avoid
+a stampede only the worker that wins a short rebuild lock renders the page; the
+others keep serving the last copy that was built, whatever its version. Each
+copy keeps the validators it was rendered with (see ``_to_entry``).
+
+The lock must be atomic across processes. ``cache.add`` is, on the locmem,
+memcached, Redis and database backends, but not on ``FileBasedCache`` (a
+check-then-write on the cache file), so there the lock is a file created with
+``O_CREAT | O_EXCL`` next to the cache files instead.
+
+``cached_page`` also wraps async views, using the cache's async methods.
+"""
+import hashlib
+import os
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.http import HttpResponse
+from django.utils.http import http_date, quote_etag, urlencode
+
+from .assets import static_state
+
+CONTENT_VERSION_KEY = 'portfolio:content-version'
+
+
+def get_content_version():
+    """Return the current content version, initialising it on first use."""
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        # Seed with a timestamp so a cache flush never reuses an old version.
+        cache.add(CONTENT_VERSION_KEY, int(time.time()), None)
+        version = cache.get(CONTENT_VERSION_KEY)
+    return version
+
+
+async def aget_content_version():
+    version = await cache.aget(CONTENT_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CONTENT_VERSION_KEY, int(time.time()), None)
+        version = await cache.aget(CONTENT_VERSION_KEY)
+    return version
+
+
+def bump_content_version():
+    """Invalidate every page (and fragment) built from the current content."""
+    try:
+        return cache.incr(CONTENT_VERSION_KEY)
+    except ValueError:
+        version = int(time.time())
+        cache.set(CONTENT_VERSION_KEY, version, None)
+        return version
+
+
+def _lock_path(backend, key):
+    return os.path.join(backend._dir, 'locks', hashlib.md5(key.encode('utf-8')).hexdigest() + '.lock')
+
+
+def _acquire_file_lock(backend, key, timeout):
+    path = _lock_path(backend, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for _ in range(2):
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if os.path.getmtime(path) + timeout > time.time():
+                    return False
+                # Left behind by a worker that died while rebuilding
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+    return False
+
+
+def _release_file_lock(backend, key):
+    try:
+        os.unlink(_lock_path(backend, key))
+    except FileNotFoundError:
+        pass
+
+
+def acquire_lock(key, timeout):
+    """Take the rebuild lock ``key`` for up to ``timeout`` seconds; False if it is held."""
+    backend = caches['default']
+    if isinstance(backend, FileBasedCache):
+        return _acquire_file_lock(backend, key, timeout)
+    return backend.add(key, 1, timeout)
+
+
+def release_lock(key):
+    backend = caches['default']
+    if isinstance(backend, FileBasedCache):
+        _release_file_lock(backend, key)
+    else:
+        backend.delete(key)
+
+
+async def aacquire_lock(key, timeout):
+    backend = caches['default']
+    if isinstance(backend, FileBasedCache):
+        return _acquire_file_lock(backend, key, timeout)
+    return await backend.aadd(key, 1, timeout)
+
+
+async def arelease_lock(key):
+    backend = caches['default']
+    if isinstance(backend, FileBasedCache):
+        _release_file_lock(backend, key)
+    else:
+        await backend.adelete(key)
+
+
+def _page_key(request, prefix):
+    # Only the parameters the views read; anything else (utm_*, cache
+    # busters) would otherwise make a new entry per distinct query string
+    names = getattr(settings, 'PAGE_CACHE_QUERY_PARAMS', ('cursor', 'q'))
+    params = sorted((name, value) for name, value in request.GET.items() if name in names)
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{urlencode(params)}'
+    digest = hashlib.md5(url.encode('utf-8')).hexdigest()
+    return f'portfolio:page:{prefix}:{digest}'
+
+
+def _fresh_key(request, version):
+    return _page_key(request, f'v{version}.{static_state()[0]}')
+
+
+def _is_cacheable(request):
+    return request.method in ('GET', 'HEAD')
+
+
+def cached_page(view_func):
+    """Serve ``view_func`` from the versioned page cache.
+
+    Only successful ``GET``/``HEAD`` responses are stored. Timeouts come from
+    ``PAGE_CACHE_TIMEOUT`` (fresh copy), ``PAGE_CACHE_STALE_TIMEOUT`` (fallback
+    copy served while another worker rebuilds) and ``PAGE_CACHE_LOCK_TIMEOUT``.
+    Pages are keyed by their path and the ``PAGE_CACHE_QUERY_PARAMS`` only.
+    """
+    if iscoroutinefunction(view_func):
+        return _async_cached_page(view_func)
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not _is_cacheable(request):
+            return view_func(request, *args, **kwargs)
+
+        version = get_content_version()
+        fresh_key = _fresh_key(request, version)
+        stale_key = _page_key(request, 'stale')
+
+        entry = cache.get(fresh_key)
+        if entry is not None:
+            return _to_response(entry)
+
+        lock_key = f'{fresh_key}:lock'
+        lock_timeout = getattr(settings, 'PAGE_CACHE_LOCK_TIMEOUT', 30)
+        if not acquire_lock(lock_key, lock_timeout):
+            # Someone else is rebuilding this page: serve the previous copy
+            # if there is one rather than piling onto the database.
+            entry = cache.get(stale_key)
+            if entry is not None:
+                return _to_response(entry)
+            return view_func(request, *args, **kwargs)
+
+        try:
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                entry = _to_entry(request, response)
+                cache.set(fresh_key, entry, getattr(settings, 'PAGE_CACHE_TIMEOUT', 600))
+                cache.set(stale_key, entry, getattr(settings, 'PAGE_CACHE_STALE_TIMEOUT', 60 * 60 * 24))
+            return response
+        finally:
+            release_lock(lock_key)
+
+    return wrapper
+
+
+def _async_cached_page(view_func):
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        if not _is_cacheable(request):
+            return await view_func(request, *args, **kwargs)
+
+        version = await aget_content_version()
+        fresh_key = _fresh_key(request, version)
+        stale_key = _page_key(request, 'stale')
+
+        entry = await cache.aget(fresh_key)
+        if entry is not None:
+            return _to_response(entry)
+
+        lock_key = f'{fresh_key}:lock'
+        lock_timeout = getattr(settings, 'PAGE_CACHE_LOCK_TIMEOUT', 30)
+        if not await aacquire_lock(lock_key, lock_timeout):
+            entry = await cache.aget(stale_key)
+            if entry is not None:
+                return _to_response(entry)
+            return await view_func(request, *args, **kwargs)
+
+        try:
+            response = await view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                entry = _to_entry(request, response)
+                await cache.aset(fresh_key, entry, getattr(settings, 'PAGE_CACHE_TIMEOUT', 600))
+                await cache.aset(stale_key, entry, getattr(settings, 'PAGE_CACHE_STALE_TIMEOUT', 60 * 60 * 24))
+            return response
+        finally:
+            await arelease_lock(lock_key)
+
+    return wrapper
+
+
+def _to_entry(request, response):
+    # conditional_on (see conditional.py) computes the validators before the
+    # view runs. Keeping them with the body means a stale copy goes out with
+    # its own ETag/Last-Modified, not the current ones, which would let the
+    # browser keep the old page on 304s.
+    etag, last_modified = getattr(request, '_content_validators', (None, None))
+    return (response.content, response['Content-Type'], etag, last_modified)
+
+
+def _to_response(entry):
+    content, content_type, *validators = entry
+    response = HttpResponse(content, content_type=content_type)
+    if validators:
+        etag, last_modified = validators
+        if etag:
+            response.headers['ETag'] = quote_etag(etag)
+        if last_modified:
+            response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,134 @@
+"""
+Conditional GET support (ETag / Last-Modified / 304) for the portfolio views.
+
+Each view declares the content it is built from. Its validators are derived
+from ``MAX(updated_at)`` and ``COUNT(*)`` over those sources, gathered with a
+single ``UNION ALL`` query, so a 304 can be answered without rendering. The
+result is cached under the content version (see ``portfolio.cache``), so the
+query only runs again after an edit; other requests cost one cache lookup.
+
+The templates and the built static files are part of every validator, so a
+deploy, ``build_assets`` or ``collectstatic`` invalidates pages that point at
+old asset URLs.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.db.models import CharField, Count, Max, Model, Value
+from django.views.decorators.http import condition
+
+from .assets import static_state
+from .cache import get_content_version
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / 'templates'
+
+VALIDATORS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _templates_mtime():
+    """Latest template modification time, so a deploy invalidates validators."""
+    mtimes = [path.stat().st_mtime for path in TEMPLATE_DIR.rglob('*.html')]
+    return max(mtimes, default=0)
+
+
+TEMPLATES_MTIME = _templates_mtime()
+
+
+def _aggregate(queryset):
+    label = Value(queryset.model._meta.label_lower, output_field=CharField())
+    return (
+        queryset.order_by()
+        .annotate(label=label)
+        .values('label')
+        .annotate(ts=Max('updated_at'), n=Count('pk'))
+        .values_list('label', 'ts', 'n')
+    )
+
+
+def content_fingerprint(querysets, static=None):
+    """Return ``(etag, last_modified)`` for ``querysets`` in one query."""
+    aggregates = [_aggregate(qs) for qs in querysets]
+    rows = list(aggregates[0].union(*aggregates[1:], all=True)) if aggregates else []
+    rows.sort(key=lambda row: row[0])
+    static_hash, static_mtime = static or static_state()
+
+    timestamps = [ts for _, ts, _ in rows if ts is not None]
+    last_modified = max(timestamps, default=None)
+    deployed = datetime.fromtimestamp(max(TEMPLATES_MTIME, static_mtime), tz=timezone.utc)
+    if last_modified is None or deployed > last_modified:
+        last_modified = deployed
+
+    payload = repr((rows, TEMPLATES_MTIME, static_hash)).encode('utf-8')
+    return hashlib.md5(payload).hexdigest(), last_modified
+
+
+def _validators_key(view_func, static_hash, args, kwargs):
+    view = f'{view_func.__module__}.{view_func.__qualname__}'
+    digest = hashlib.md5(repr((view, static_hash, args, sorted(kwargs.items()))).encode('utf-8')).hexdigest()
+    return f'portfolio:validators:v{get_content_version()}:{digest}'
+
+
+def conditional_on(*sources):
+    """Answer conditional requests for a view from the content it depends on.
+
+    ``sources`` are model classes, or callables taking the view arguments and
+    returning a queryset (for detail pages)::
+
+        @conditional_on(Profile, lambda request, slug: Blog.objects.filter(slug=slug))
+    """
+    def without_validators(response):
+        # condition() stamps every response; a 404 must not be revalidated
+        if response.status_code not in (200, 304):
+            del response['ETag']
+            del response['Last-Modified']
+        return response
+
+    def decorator(view_func):
+        def get_validators(request, *args, **kwargs):
+            if not hasattr(request, '_content_validators'):
+                static = static_state()
+                key = _validators_key(view_func, static[0], args, kwargs)
+                validators = cache.get(key)
+                if validators is None:
+                    querysets = [
+                        source._default_manager.all()
+                        if isinstance(source, type) and issubclass(source, Model)
+                        else source(request, *args, **kwargs)
+                        for source in sources
+                    ]
+                    validators = content_fingerprint(querysets, static)
+                    cache.set(key, validators, VALIDATORS_CACHE_TIMEOUT)
+                request._content_validators = validators
+            return request._content_validators
+
+        def etag(request, *args, **kwargs):
+            return get_validators(request, *args, **kwargs)[0]
+
+        def last_modified(request, *args, **kwargs):
+            return get_validators(request, *args, **kwargs)[1]
+
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view_func)
+
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+                # Run the cache lookup (and any fingerprint query) off the
+                # event loop; condition() then reads them from the request.
+                await sync_to_async(get_validators)(request, *args, **kwargs)
+                return without_validators(await conditional_view(request, *args, **kwargs))
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            return without_validators(conditional_view(request, *args, **kwargs))
+        return wrapper
+
+    return decorator
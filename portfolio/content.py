@@ -0,0 +1,454 @@
+"""
+Blog content pipeline: ``Blog.content`` (Markdown, HTML allowed) is compiled
+once, when the post is saved, into ``Blog.content_html`` and ``Blog.toc_html``.
+The detail page emits those as they are.
+
+``compile_content(source)`` runs three steps:
+
+    markdown()    a Markdown subset: ATX and setext headings, paragraphs,
+                  emphasis, ``code``, fenced code blocks, links, images,
+                  lists, block quotes and rules. Blocks that start with an
+                  HTML block tag are passed through untouched, so the
+                  existing HTML posts compile to themselves.
+    Sanitizer     re-serializes the HTML keeping only ALLOWED_TAGS and
+                  ALLOWED_ATTRIBUTES, and only http(s), mailto, tel and
+                  relative URLs; script, style and embedded content are
+                  dropped with their contents.
+                  Images get ``loading="lazy"`` and ``decoding="async"``; files
+                  in MEDIA_ROOT also get their width and height, a blurred
+                  placeholder background and, once they have responsive
+                  derivatives, a JPEG ``srcset``.
+                  Headings get an ``id`` and an empty self-link (its ``#`` comes
+                  from CSS, so it stays out of the text); h2/h3 make up the
+                  table of contents.
+"""
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.text import slugify
+from PIL import Image
+
+from .images import get_variants, image_metadata
+
+ALLOWED_TAGS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'cite', 'code', 'dd', 'del', 'div', 'dl', 'dt', 'em',
+    'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'ins', 'kbd', 'li', 'mark',
+    'ol', 'p', 'pre', 'q', 's', 'section', 'small', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td',
+    'tfoot', 'th', 'thead', 'tr', 'u', 'ul',
+}
+# Removed together with everything inside them
+DROPPED_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'noscript', 'textarea', 'select', 'svg', 'math'}
+VOID_TAGS = {'br', 'hr', 'img'}
+GLOBAL_ATTRIBUTES = {'class', 'title', 'lang', 'dir'}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'rel', 'target'},
+    'img': {'src', 'alt', 'width', 'height', 'srcset', 'sizes'},
+    'ol': {'start', 'reversed'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan', 'scope'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+URL_SCHEMES = {'', 'http', 'https', 'mailto', 'tel'}
+HEADINGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+TOC_LEVELS = ('h2', 'h3')
+# Fewer headings than this get no table of contents
+TOC_MIN_ENTRIES = 3
+# Width of the post column (see blog_detail.html)
+IMAGE_SIZES = '(min-width: 992px) 83vw, 100vw'
+
+
+def _balanced(depth):
+    """URL characters whose parentheses are balanced, nested up to ``depth`` deep."""
+    chars = r'[^()\s<>]'
+    return rf'(?:{chars}|\({_balanced(depth - 1)}\))*' if depth else rf'{chars}*'
+
+
+# A link destination may contain balanced parentheses, as in CommonMark
+DESTINATION = _balanced(3)
+
+HTML_BLOCK_RE = re.compile(
+    r'^ {0,3}</?(?:address|article|aside|blockquote|details|div|dl|fieldset|figure|footer|form|h[1-6]|header|hr|'
+    r'li|main|nav|ol|p|pre|section|table|ul|script|style|iframe|!--)(?:[\s/>]|$)',
+    re.IGNORECASE,
+)
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})\s*([\w+-]*)')
+ATX_RE = re.compile(r'^ {0,3}(#{1,6})(?:\s+(.*?))?(?:\s+#+)?\s*$')
+SETEXT_RE = re.compile(r'^ {0,3}(=+|-+)\s*$')
+RULE_RE = re.compile(r'^ {0,3}([-*_])(?:\s*\1){2,}\s*$')
+QUOTE_RE = re.compile(r'^ {0,3}> ?')
+LIST_RE = re.compile(r'^( {0,3})([-*+]|\d{1,9}[.)])\s+')
+
+CODE_SPAN_RE = re.compile(r'(`+)(.+?)\1', re.DOTALL)
+IMAGE_RE = re.compile(rf'!\[([^\]]*)\]\(\s*<?({DESTINATION})>?(?:\s+"([^"]*)")?\s*\)')
+LINK_RE = re.compile(rf'\[((?:[^\[\]]|\[[^\]]*\])*)\]\(\s*<?({DESTINATION})>?(?:\s+"([^"]*)")?\s*\)')
+AUTOLINK_RE = re.compile(r'<((?:https?|mailto):[^\s<>]+)>')
+TAG_RE = re.compile(r'</?[a-zA-Z][^<>]*>|<!--.*?-->', re.DOTALL)
+ENTITY_RE = re.compile(r'&(?:#\d+|#x[0-9a-fA-F]+|\w+);')
+STRONG_RE = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1', re.DOTALL)
+EM_RE = re.compile(r'(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?!\*)|(?<![\w_])_(?=\S)(.+?)(?<=\S)_(?![\w_])', re.DOTALL)
+STRIKE_RE = re.compile(r'~~(?=\S)(.+?)(?<=\S)~~', re.DOTALL)
+BREAK_RE = re.compile(r'(?: {2,}|\\)\n')
+ESCAPE_RE = re.compile(r'\\([\\`*_{}\[\]()#+\-.!~>|])')
+TOKEN = '\x00{}\x00'
+TOKEN_RE = re.compile(r'\x00(\d+)\x00')
+
+
+# Markdown
+
+def _text(text):
+    """Escape ``&`` and ``<`` that are not already entities or tags."""
+    text = re.sub(r'&(?!#\d+;|#x[0-9a-fA-F]+;|\w+;)', '&amp;', text)
+    return re.sub(r'<(?![a-zA-Z/!])', '&lt;', text)
+
+
+def inline(text):
+    """Render inline Markdown in ``text``."""
+    stash = []
+
+    def keep(html):
+        stash.append(html)
+        return TOKEN.format(len(stash) - 1)
+
+    text = CODE_SPAN_RE.sub(lambda m: keep(f'<code>{escape(m.group(2).strip(), quote=False)}</code>'), text)
+    text = ESCAPE_RE.sub(lambda m: keep(escape(m.group(1))), text)
+    text = AUTOLINK_RE.sub(lambda m: keep(f'<a href="{escape(m.group(1))}">{escape(m.group(1))}</a>'), text)
+    text = TAG_RE.sub(lambda m: keep(m.group(0)), text)
+    text = IMAGE_RE.sub(lambda m: keep(
+        f'<img src="{escape(m.group(2))}" alt="{escape(m.group(1))}"'
+        + (f' title="{escape(m.group(3))}"' if m.group(3) else '') + '>'
+    ), text)
+    text = LINK_RE.sub(lambda m: keep(
+        f'<a href="{escape(m.group(2))}"' + (f' title="{escape(m.group(3))}"' if m.group(3) else '') + '>'
+        + inline(m.group(1)) + '</a>'
+    ), text)
+
+    text = _text(text)
+    text = STRONG_RE.sub(r'<strong>\2</strong>', text)
+    text = EM_RE.sub(lambda m: f'<em>{m.group(1) or m.group(2)}</em>', text)
+    text = STRIKE_RE.sub(r'<del>\1</del>', text)
+    text = BREAK_RE.sub('<br>\n', text)
+
+    while TOKEN_RE.search(text):
+        text = TOKEN_RE.sub(lambda m: stash[int(m.group(1))], text)
+    return text
+
+
+def _starts_block(line):
+    return bool(
+        FENCE_RE.match(line) or ATX_RE.match(line) or RULE_RE.match(line)
+        or QUOTE_RE.match(line) or HTML_BLOCK_RE.match(line)
+    )
+
+
+def _list_items(lines):
+    """Split list ``lines`` into ``(ordered, start, [item lines])``."""
+    first = LIST_RE.match(lines[0])
+    indent = len(first.group(1))
+    ordered = first.group(2)[0].isdigit()
+    start = int(first.group(2)[:-1]) if ordered else None
+    items = []
+    for line in lines:
+        match = LIST_RE.match(line)
+        if match and len(match.group(1)) == indent:
+            items.append([line[match.end():]])
+        else:
+            # Continuation lines lose the item's indentation
+            items[-1].append(re.sub(r'^ {1,%d}' % (len(first.group(0))), '', line))
+    return ordered, start, items
+
+
+def markdown(source):
+    """Render Markdown ``source`` to HTML (not sanitized)."""
+    lines = source.replace('\r\n', '\n').replace('\r', '\n').expandtabs(4).split('\n')
+    html = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            i += 1
+            continue
+
+        fence = FENCE_RE.match(line)
+        if fence:
+            marker, language = fence.groups()
+            code = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(marker):
+                code.append(lines[i])
+                i += 1
+            i += 1
+            attribute = f' class="language-{escape(language)}"' if language else ''
+            html.append(f'<pre><code{attribute}>{escape(chr(10).join(code), quote=False)}\n</code></pre>')
+            continue
+
+        if HTML_BLOCK_RE.match(line):
+            block = []
+            while i < len(lines) and lines[i].strip():
+                block.append(lines[i])
+                i += 1
+            html.append('\n'.join(block))
+            continue
+
+        heading = ATX_RE.match(line)
+        if heading:
+            level = len(heading.group(1))
+            html.append(f'<h{level}>{inline(heading.group(2) or "")}</h{level}>')
+            i += 1
+            continue
+
+        if RULE_RE.match(line):
+            html.append('<hr>')
+            i += 1
+            continue
+
+        if QUOTE_RE.match(line):
+            quoted = []
+            while i < len(lines) and lines[i].strip() and (QUOTE_RE.match(lines[i]) or quoted):
+                quoted.append(QUOTE_RE.sub('', lines[i], count=1))
+                i += 1
+            html.append(f'<blockquote>\n{markdown(chr(10).join(quoted))}\n</blockquote>')
+            continue
+
+        marker = LIST_RE.match(line)
+        if marker:
+            indent, ordered = len(marker.group(1)), marker.group(2)[0].isdigit()
+
+            def same_list(text):
+                match = LIST_RE.match(text)
+                return match and (len(match.group(1)) > indent or match.group(2)[0].isdigit() == ordered)
+
+            block = []
+            loose = False
+            while i < len(lines):
+                current = lines[i]
+                if current.strip():
+                    if LIST_RE.match(current) and not same_list(current):
+                        break
+                    if block and not block[-1].strip() and not (same_list(current) or current.startswith('  ')):
+                        break
+                    if block and block[-1].strip() and _starts_block(current) and not current.startswith(' '):
+                        break
+                    block.append(current)
+                elif i + 1 < len(lines) and (same_list(lines[i + 1]) or lines[i + 1].startswith('  ')):
+                    loose = True
+                    block.append('')
+                else:
+                    break
+                i += 1
+            ordered, start, items = _list_items(block)
+            tag = 'ol' if ordered else 'ul'
+            attribute = f' start="{start}"' if ordered and start != 1 else ''
+            rendered = []
+            for item in items:
+                body = markdown('\n'.join(item))
+                if not loose and body.startswith('<p>') and body.count('<p>') == 1:
+                    body = body.replace('<p>', '', 1).replace('</p>', '', 1)
+                rendered.append(f'<li>{body}</li>')
+            html.append(f'<{tag}{attribute}>\n' + '\n'.join(rendered) + f'\n</{tag}>')
+            continue
+
+        paragraph = []
+        while i < len(lines) and lines[i].strip():
+            setext = SETEXT_RE.match(lines[i])
+            if paragraph and setext:
+                level = 1 if setext.group(1)[0] == '=' else 2
+                html.append(f'<h{level}>{inline(chr(10).join(paragraph).strip())}</h{level}>')
+                paragraph = None
+                i += 1
+                break
+            if paragraph and (_starts_block(lines[i]) or LIST_RE.match(lines[i])):
+                break
+            paragraph.append(lines[i])
+            i += 1
+        if paragraph:
+            html.append(f'<p>{inline(chr(10).join(paragraph).strip())}</p>')
+    return '\n'.join(html)
+
+
+# Sanitizing
+
+def _safe_url(url):
+    url = url.strip()
+    try:
+        scheme = urlsplit(unquote(url)).scheme.lower()
+    except ValueError:
+        return None
+    # Browsers ignore whitespace and control characters inside the scheme
+    scheme = re.sub(r'[\s\x00-\x1f]', '', scheme)
+    return url if scheme in URL_SCHEMES else None
+
+
+def media_name(src):
+    """Storage name of a ``MEDIA_URL`` image, or None for other URLs."""
+    path = urlsplit(src).path
+    if not path.startswith(settings.MEDIA_URL):
+        return None
+    name = unquote(path[len(settings.MEDIA_URL):])
+    return name if name and '..' not in name.split('/') else None
+
+
+def image_attributes(attrs, name=None):
+    """Add lazy loading and, for the stored image ``name``, dimensions, a placeholder and a ``srcset``."""
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    if name is None:
+        return attrs
+    try:
+        with default_storage.open(name) as file:
+            width, height, placeholder = image_metadata(file)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        width = height = placeholder = None
+    if width and 'width' not in attrs and 'height' not in attrs:
+        attrs['width'], attrs['height'] = str(width), str(height)
+    if placeholder:
+        # The same placeholder as lazy_image (see media_extras)
+        attrs['style'] = f'background: url({placeholder}) center / cover no-repeat'
+    jpeg = get_variants(name)['jpeg']
+    if jpeg and 'srcset' not in attrs:
+        attrs['srcset'] = ', '.join(f'{default_storage.url(path)} {size}w' for size, path in jpeg)
+        attrs.setdefault('sizes', IMAGE_SIZES)
+    return attrs
+
+
+class Sanitizer(HTMLParser):
+    """Re-serialize HTML keeping only the allowed markup; see the module docstring."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.open = []
+        self.dropping = 0
+        self.heading = None  # (tag, index of its start tag in out, text parts)
+        self.toc = []
+        self.ids = set()
+        self.images = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = GLOBAL_ATTRIBUTES | ALLOWED_ATTRIBUTES.get(tag, set())
+        clean = {}
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES:
+                value = _safe_url(value)
+                if value is None:
+                    continue
+            clean[name] = value
+        if tag == 'a' and clean.get('target') == '_blank':
+            clean['rel'] = 'noopener noreferrer'
+        if tag == 'img':
+            if 'src' not in clean:
+                return
+            name = media_name(clean['src'])
+            if name is not None and not default_storage.exists(name):
+                name = None
+            clean = image_attributes(clean, name)
+            if name is not None:
+                self.images.append(name)
+
+        rendered = ''.join(f' {name}="{escape(value)}"' for name, value in clean.items())
+        if tag in HEADINGS and self.heading is None:
+            self.heading = (tag, len(self.out), [], rendered)
+        self.out.append(f'<{tag}{rendered}>')
+        if tag not in VOID_TAGS:
+            self.open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open and self.open[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        if self.dropping or tag not in self.open:
+            return
+        # Close anything left open inside this element
+        while self.open:
+            current = self.open.pop()
+            if current == tag:
+                break
+            self.out.append(f'</{current}>')
+        if self.heading and self.heading[0] == tag:
+            self.close_heading()
+        self.out.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        if self.heading:
+            self.heading[2].append(data)
+        self.out.append(escape(data, quote=False))
+
+    def close_heading(self):
+        tag, index, parts, rendered = self.heading
+        self.heading = None
+        text = ' '.join(''.join(parts).split())
+        anchor = slugify(text) or 'section'
+        candidate, n = anchor, 1
+        while candidate in self.ids:
+            n += 1
+            candidate = f'{anchor}-{n}'
+        self.ids.add(candidate)
+        rendered = re.sub(r' id="[^"]*"', '', rendered)
+        self.out[index] = f'<{tag} id="{candidate}"{rendered}>'
+        self.out.append(
+            f' <a class="heading-anchor" href="#{candidate}" aria-label="Link to this section"></a>'
+        )
+        if tag in TOC_LEVELS and text:
+            self.toc.append((tag, candidate, text))
+
+    def result(self):
+        self.close()
+        while self.open:
+            self.out.append(f'</{self.open.pop()}>')
+        return ''.join(self.out)
+
+
+def toc_html(entries):
+    """Nested ``<ul>`` of ``(tag, id, text)`` headings (h3 under h2)."""
+    if len(entries) < TOC_MIN_ENTRIES:
+        return ''
+    html, nested = ['<ul class="toc">'], False
+    for tag, anchor, text in entries:
+        item = f'<li><a href="#{anchor}">{escape(text, quote=False)}</a>'
+        if tag == TOC_LEVELS[1] and not nested and len(html) > 1:
+            html[-1] = html[-1].removesuffix('</li>')
+            html.append('<ul>')
+            nested = True
+        elif tag == TOC_LEVELS[0] and nested:
+            html.append('</ul></li>')
+            nested = False
+        html.append(item + '</li>')
+    if nested:
+        html.append('</ul></li>')
+    html.append('</ul>')
+    return ''.join(html)
+
+
+def sanitize(html):
+    """Return ``(clean html, toc entries, media image names)``."""
+    sanitizer = Sanitizer()
+    sanitizer.feed(html)
+    return sanitizer.result(), sanitizer.toc, sanitizer.images
+
+
+def compile_content(source):
+    """Return ``(content_html, toc_html)`` for Markdown/HTML ``source``."""
+    html, toc, _ = sanitize(markdown(source or ''))
+    return html, toc_html(toc)
+
+
+def inline_images(html):
+    """Storage names of the stored images used in compiled ``html``."""
+    return sanitize(html)[2]
@@ -1,10 +1,48 @@
 from django.conf import settings
+from django.core.cache import cache
+
+from .cache import aget_content_version, get_content_version
+from .metrics import timed
 from .models import Profile
 
+
+def get_site_profile():
+    """The site profile, cached until the content version changes."""
+    key = f'portfolio:profile:v{get_content_version()}'
+    # Cached as a 1-tuple so that "no profile" is a cache hit too
+    entry = cache.get(key)
+    if entry is None:
+        entry = (Profile.objects.first(),)
+        cache.set(key, entry, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24))
+    return entry[0]
+
+
+async def aget_site_profile(request=None):
+    """``get_site_profile`` for async views.
+
+    With ``request``, the profile is also kept on it, and ``site_profile``
+    uses it instead of looking it up again while the page renders.
+    """
+    key = f'portfolio:profile:v{await aget_content_version()}'
+    entry = await cache.aget(key)
+    if entry is None:
+        entry = (await Profile.objects.afirst(),)
+        await cache.aset(key, entry, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24))
+    if request is not None:
+        request._site_profile = entry
+    return entry[0]
+
+
+@timed('ctx')
 def site_profile(request):
-    """Provide site-wide metadata and profile to all templates."""
+    """Provide site-wide metadata and profile to all templates.
+
+    Async views render through ``sync_to_async``, so this always runs in a
+    worker thread, where the ORM is allowed.
+    """
     try:
-        profile = Profile.objects.first()
+        entry = getattr(request, '_site_profile', None)
+        profile = entry[0] if entry is not None else get_site_profile()
     except:
         profile = None
     
@@ -0,0 +1,255 @@
+"""
+Responsive image derivatives for uploaded images.
+
+Every image stored on ``Project.image``, ``Blog.image`` and
+``Profile.profile_image`` gets resized copies at ``IMAGE_DERIVATIVE_WIDTHS`` in
+AVIF, WebP and JPEG, written next to the original::
+
+    blog/analysis_image.png -> blog/analysis_image-640w.avif
+                               blog/analysis_image-640w.webp
+                               blog/analysis_image-640w.jpg
+
+The ``responsive_image`` template tag (``portfolio.templatetags.media_extras``)
+turns them into ``srcset`` lists.
+
+Each of those fields also has ``<field>_width``, ``<field>_height`` and
+``<field>_placeholder`` columns, filled in by ``update_image_metadata`` when
+the model is saved with a new upload (migration 0011 fills in existing rows,
+``manage.py backfill_image_metadata --all`` reads them again). The
+placeholder is a blurred thumbnail a few pixels wide, as a ``data:`` URI,
+that ``lazy_image`` shows until the real image loads, so pages get the
+dimensions and the placeholder without opening the file.
+"""
+import base64
+import io
+import os
+import re
+from pathlib import Path, PurePosixPath
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from PIL import Image, ImageFilter, ImageOps
+
+DEFAULT_WIDTHS = (320, 640, 960, 1280)
+
+# Output formats in order of preference, with their file extension and the
+# Pillow save options used for them.
+FORMATS = {
+    'avif': ('avif', {'quality': 55, 'speed': 6}),
+    'webp': ('webp', {'quality': 78, 'method': 4}),
+    'jpeg': ('jpg', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+
+# Image fields that get derivatives, by model label.
+IMAGE_FIELDS = {
+    'portfolio.project': ('image',),
+    'portfolio.blog': ('image',),
+    'portfolio.profile': ('profile_image',),
+}
+
+VARIANTS_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Longest side (pixels) of the placeholder thumbnails, and their WebP quality
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+
+def get_widths():
+    return tuple(sorted(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', DEFAULT_WIDTHS)))
+
+
+def derivative_name(name, width, fmt):
+    """Storage name of the ``width``-pixel ``fmt`` derivative of ``name``."""
+    path = PurePosixPath(name)
+    extension = FORMATS[fmt][0]
+    return str(path.with_name(f'{path.stem}-{width}w.{extension}'))
+
+
+def target_widths(original_width, widths):
+    """Widths to generate for an image ``original_width`` pixels wide.
+
+    Images are never upscaled: an image narrower than every configured width
+    gets a single derivative at its own width, so its ``srcset`` descriptor
+    is true.
+    """
+    return [w for w in widths if w <= original_width] or [original_width]
+
+
+def _flatten(image):
+    """``image`` as RGB, with any transparency on white."""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        flattened = Image.new('RGB', image.size, (255, 255, 255))
+        flattened.paste(image, mask=image.getchannel('A'))
+        return flattened
+    return image if image.mode == 'RGB' else image.convert('RGB')
+
+
+def render_derivatives(source_path, widths, force=False):
+    """Write derivatives for the image at ``source_path``.
+
+    Works on plain filesystem paths and needs no Django state, so it can run in
+    worker processes. Returns ``(width, fmt, path)`` for every derivative.
+    """
+    source = Path(source_path)
+    results = []
+    with Image.open(source_path) as original:
+        image = _flatten(ImageOps.exif_transpose(original))
+
+        for width in widths:
+            if width > image.width:
+                # Earlier releases stored a narrow image's only derivative
+                # under the smallest width; drop those mislabelled files
+                for extension, _ in FORMATS.values():
+                    source.with_name(f'{source.stem}-{width}w.{extension}').unlink(missing_ok=True)
+
+        for width in target_widths(image.width, widths):
+            size = min(width, image.width)
+            height = max(1, round(image.height * size / image.width))
+            resized = None
+            for fmt, (extension, options) in FORMATS.items():
+                path = source.with_name(f'{source.stem}-{width}w.{extension}')
+                results.append((width, fmt, str(path)))
+                if not force and os.path.exists(path):
+                    continue
+                if resized is None:
+                    resized = image.resize((size, height), Image.LANCZOS)
+                resized.save(path, fmt.upper(), **options)
+    return results
+
+
+def generate_derivatives(name, force=False):
+    """Generate derivatives for the stored file ``name`` and remember them."""
+    results = render_derivatives(default_storage.path(name), get_widths(), force=force)
+    return remember_variants(name, results)
+
+
+def remember_variants(name, results):
+    """Cache the ``(width, fmt, ...)`` list produced by ``render_derivatives``."""
+    variants = {fmt: [] for fmt in FORMATS}
+    for width, fmt, _ in results:
+        variants[fmt].append((width, derivative_name(name, width, fmt)))
+    cache.set(_variants_key(name), variants, VARIANTS_CACHE_TIMEOUT)
+    return variants
+
+
+def get_variants(name):
+    """Return ``{fmt: [(width, storage_name), ...]}`` of existing derivatives."""
+    key = _variants_key(name)
+    variants = cache.get(key)
+    if variants is None:
+        variants = {fmt: [] for fmt in FORMATS}
+        widths = get_widths()
+        if not default_storage.exists(derivative_name(name, widths[0], 'jpeg')):
+            widths = _narrow_widths(name, widths[0]) or widths
+        for width in widths:
+            for fmt in FORMATS:
+                candidate = derivative_name(name, width, fmt)
+                if default_storage.exists(candidate):
+                    variants[fmt].append((width, candidate))
+        cache.set(key, variants, VARIANTS_CACHE_TIMEOUT)
+    return variants
+
+
+def _narrow_widths(name, smallest):
+    """Widths below ``smallest`` that ``name`` has a JPEG derivative at (see ``target_widths``)."""
+    path = PurePosixPath(name)
+    pattern = re.compile(rf'{re.escape(path.stem)}-(\d+)w\.{FORMATS["jpeg"][0]}')
+    try:
+        _, files = default_storage.listdir(str(path.parent))
+    except FileNotFoundError:
+        return []
+    matches = (pattern.fullmatch(file) for file in files)
+    return sorted(int(match.group(1)) for match in matches if match and int(match.group(1)) < smallest)
+
+
+def existing_derivatives(name):
+    """Storage names of every derivative of ``name`` on disk, at any width."""
+    path = PurePosixPath(name)
+    extensions = '|'.join(re.escape(extension) for extension, _ in FORMATS.values())
+    pattern = re.compile(rf'{re.escape(path.stem)}-\d+w\.(?:{extensions})')
+    try:
+        _, files = default_storage.listdir(str(path.parent))
+    except FileNotFoundError:
+        return []
+    return [str(path.with_name(file)) for file in sorted(files) if pattern.fullmatch(file)]
+
+
+def forget_variants(name):
+    """Drop the cached ``get_variants`` list of ``name``."""
+    cache.delete(_variants_key(name))
+
+
+def has_derivatives(name):
+    return bool(get_variants(name)['jpeg'])
+
+
+def _variants_key(name):
+    return f'portfolio:image-variants:{name}'
+
+
+def image_names_for(instance):
+    """Names of the stored images on ``instance`` that get derivatives."""
+    names = []
+    for field_name in IMAGE_FIELDS.get(instance._meta.label_lower, ()):
+        file = getattr(instance, field_name)
+        if file and file.name:
+            names.append(file.name)
+    return names
+
+
+def metadata_columns(field_name):
+    return f'{field_name}_width', f'{field_name}_height', f'{field_name}_placeholder'
+
+
+def image_metadata(file):
+    """Return ``(width, height, placeholder data URI)`` for the open image ``file``."""
+    with Image.open(file) as original:
+        image = ImageOps.exif_transpose(original)
+        width, height = image.size
+        image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+        image = _flatten(image).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    image.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    return width, height, 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def read_image_metadata(file):
+    """``image_metadata`` of a FieldFile, new upload or stored; ``(None, None, '')`` if unreadable."""
+    try:
+        if file._committed:
+            with file.storage.open(file.name) as stored:
+                return image_metadata(stored)
+        # An upload not saved yet: leave it rewound for the storage
+        file.seek(0)
+        try:
+            return image_metadata(file)
+        finally:
+            file.seek(0)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None, None, ''
+
+
+def update_image_metadata(instance, force=False):
+    """Fill in the metadata columns of ``instance``'s image fields.
+
+    They are read again for new uploads, for images without them, and with
+    ``force``; cleared images clear them. Returns the names of the columns set.
+    """
+    updated = []
+    for field_name in IMAGE_FIELDS.get(instance._meta.label_lower, ()):
+        file = getattr(instance, field_name)
+        columns = metadata_columns(field_name)
+        if not file:
+            values = (None, None, '')
+        elif force or not file._committed or getattr(instance, columns[0]) is None:
+            values = read_image_metadata(file)
+        else:
+            continue
+        for column, value in zip(columns, values):
+            setattr(instance, column, value)
+        updated += columns
+    return updated
@@ -0,0 +1,188 @@
+"""
+Background jobs stored in the site's own database; no broker needed.
+
+Functions decorated with ``@task`` (see portfolio/tasks.py) can be queued::
+
+    from portfolio.jobs import enqueue
+    enqueue(tasks.generate_image_derivatives, name='blog/cover.png', priority=10)
+
+``manage.py run_worker`` claims due jobs, highest ``priority`` first, and runs
+them. A job is claimed with a conditional ``UPDATE`` (``status = 'queued'``),
+so any number of worker threads or processes can share the table. A failing
+job is retried with exponential backoff until ``max_attempts``, then marked
+failed with its traceback in ``last_error``. Jobs left running by a worker
+that died are queued again after ``JOB_LOCK_TIMEOUT``.
+
+``enqueue()`` writes the job in the caller's transaction, so a job queued
+from a ``post_save`` handler only becomes visible if the save commits. With
+``JOBS_RUN_INLINE = True`` jobs run in-process on commit instead, for
+development without a worker.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+CLAIM_CANDIDATES = 5
+
+
+def task(func):
+    """Register ``func`` as a job task under its dotted path."""
+    func.task_name = f'{func.__module__}.{func.__name__}'
+    TASKS[func.task_name] = func
+    return func
+
+
+def _task_name(func_or_name):
+    name = getattr(func_or_name, 'task_name', func_or_name)
+    if name not in TASKS:
+        raise LookupError(f'Unknown task {name!r}; decorate it with @task')
+    return name
+
+
+def _run_inline(name, kwargs):
+    transaction.on_commit(lambda: TASKS[name](**kwargs), robust=True)
+
+
+def enqueue(func, *, priority=0, delay=0, max_attempts=None, unique=False, **kwargs):
+    """Queue ``func(**kwargs)``; ``kwargs`` must be JSON-serializable.
+
+    With ``unique=True`` nothing is queued if the same call is already
+    waiting, which debounces bursts (e.g. one sitemap rebuild per batch of
+    edits). Returns the Job, or None.
+    """
+    name = _task_name(func)
+    if getattr(settings, 'JOBS_RUN_INLINE', False):
+        _run_inline(name, kwargs)
+        return None
+    if unique and Job.objects.filter(task=name, kwargs=kwargs, status=Job.QUEUED).exists():
+        return None
+    return Job.objects.create(
+        task=name,
+        kwargs=kwargs,
+        priority=priority,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', 5),
+    )
+
+
+def enqueue_many(func, kwargs_list, *, priority=0, max_attempts=None):
+    """Queue one job per ``kwargs`` dict in a single insert."""
+    name = _task_name(func)
+    if getattr(settings, 'JOBS_RUN_INLINE', False):
+        for kwargs in kwargs_list:
+            _run_inline(name, kwargs)
+        return []
+    max_attempts = max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', 5)
+    return Job.objects.bulk_create([
+        Job(task=name, kwargs=kwargs, priority=priority, max_attempts=max_attempts)
+        for kwargs in kwargs_list
+    ])
+
+
+def claim(worker_id):
+    """Lock the next due job for ``worker_id``, or return None."""
+    now = timezone.now()
+    candidates = list(
+        Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+        .order_by('-priority', 'run_at', 'id')
+        .values_list('id', flat=True)[:CLAIM_CANDIDATES]
+    )
+    for pk in candidates:
+        # Only one worker can move a given job out of "queued"
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker_id, locked_at=now,
+            attempts=F('attempts') + 1, updated_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def retry_delay(attempts):
+    """Seconds before retry number ``attempts``: exponential, with jitter."""
+    base = getattr(settings, 'JOB_RETRY_DELAY', 10)
+    delay = min(base * 2 ** (attempts - 1), getattr(settings, 'JOB_MAX_RETRY_DELAY', 60 * 60))
+    return delay * random.uniform(1, 1.25)
+
+
+def run(job):
+    """Run a claimed job and record the outcome. Returns whether it succeeded."""
+    func = TASKS.get(job.task)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown task {job.task!r}')
+        func(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            run_at = now + timedelta(seconds=retry_delay(job.attempts))
+            logger.warning('Job %s (%s) failed, retrying at %s', job.pk, job.task, run_at, exc_info=True)
+            _finish(job, status=Job.QUEUED, run_at=run_at, last_error=error)
+        else:
+            logger.error('Job %s (%s) failed after %d attempts', job.pk, job.task, job.attempts, exc_info=True)
+            _finish(job, status=Job.FAILED, last_error=error)
+        return False
+    _finish(job, status=Job.DONE, last_error='')
+    return True
+
+
+def _finish(job, **fields):
+    Job.objects.filter(pk=job.pk).update(locked_by='', locked_at=None, updated_at=timezone.now(), **fields)
+
+
+def requeue_stale(timeout=None):
+    """Queue again jobs whose worker stopped without finishing them."""
+    timeout = timeout or getattr(settings, 'JOB_LOCK_TIMEOUT', 60 * 30)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_by='', locked_at=None, last_error='Worker stopped while running the job',
+    )
+    return failed + stale.update(status=Job.QUEUED, locked_by='', locked_at=None)
+
+
+def purge(days=None):
+    """Delete finished jobs older than ``JOB_KEEP_DAYS``."""
+    days = days or getattr(settings, 'JOB_KEEP_DAYS', 7)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(status=Job.DONE, updated_at__lt=cutoff).delete()
+    return deleted
+
+
+def work(worker_id, stop, poll_interval=1.0, burst=False):
+    """Run jobs until ``stop`` (a threading.Event) is set.
+
+    With ``burst`` return as soon as no job is due. Returns the number of
+    jobs run.
+    """
+    count = 0
+    while not stop.is_set():
+        close_old_connections()
+        try:
+            job = claim(worker_id)
+        except DatabaseError:
+            # Most likely "database is locked"; try again shortly
+            logger.warning('Worker %s could not claim a job', worker_id, exc_info=True)
+            stop.wait(poll_interval)
+            continue
+        if job is None:
+            if burst:
+                break
+            stop.wait(poll_interval)
+            continue
+        run(job)
+        count += 1
+    connection.close()
+    return count
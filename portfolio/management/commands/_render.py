@@ -0,0 +1,48 @@
+"""
+Base class for the commands that render batches of cards with
+portfolio.rendering: adds --jobs/--force and prints a timing report.
+Cards that fail are reported and the command exits with an error once the
+rest of the batch is done.
+"""
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.rendering import render_batch
+
+
+class RenderCommand(BaseCommand):
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker processes (default: all cores)')
+        parser.add_argument('--force', action='store_true',
+                            help='Re-render images even if their spec is unchanged')
+
+    def render(self, specs, jobs=1, force=False):
+        """Render ``{path relative to MEDIA_ROOT: card spec}`` and report timings."""
+        started = time.perf_counter()
+        results = render_batch(specs, Path(settings.MEDIA_ROOT), jobs=max(1, jobs), force=force)
+
+        rendered = unchanged = failed = 0
+        for name, seconds in results.items():
+            if seconds is None:
+                unchanged += 1
+                self.stdout.write(f'Unchanged: {name}')
+            elif isinstance(seconds, Exception):
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'Failed: {name} ({seconds})'))
+            else:
+                rendered += 1
+                self.stdout.write(self.style.SUCCESS(f'Created: {name} ({seconds * 1000:.0f} ms)'))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{rendered} rendered, {unchanged} unchanged, {failed} failed in {elapsed:.2f}s'
+        )
+        if failed:
+            raise CommandError(f'{failed} images failed to render.')
+        return results
@@ -0,0 +1,53 @@
+"""
+Fill in Blog.content_html, toc_html, summary, word_count and reading_time for
+posts that lack them. Migrations 0006 and 0010 fill them in for existing
+posts; use --all after changing the compiler in portfolio/content.py.
+Run: python manage.py backfill_blog_summaries [--all]
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from portfolio import search
+from portfolio.cache import bump_content_version
+from portfolio.models import Blog
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = 'Compile content and compute summary, word count and reading time for blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute every post, not only those without a summary or compiled content')
+
+    def handle(self, *args, **options):
+        posts = Blog.objects.only('id', 'slug', 'title', 'excerpt', 'content')
+        if not options['all']:
+            posts = posts.filter(Q(summary='') | Q(content_html=''))
+
+        batch, updated = [], 0
+        with transaction.atomic():
+            for post in posts.iterator(chunk_size=BATCH_SIZE):
+                post.update_derived_fields()
+                batch.append(post)
+                if len(batch) >= BATCH_SIZE:
+                    updated += self.flush(batch)
+            updated += self.flush(batch)
+
+        if updated:
+            bump_content_version()
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} blog posts.'))
+
+    def flush(self, batch):
+        # bulk_update skips save() and signals, and leaves updated_at alone
+        Blog.objects.bulk_update(
+            batch, ['content_html', 'toc_html', 'summary', 'word_count', 'reading_time'],
+        )
+        for post in batch:
+            # The search row is built from content_html
+            search.index(post)
+        count = len(batch)
+        batch.clear()
+        return count
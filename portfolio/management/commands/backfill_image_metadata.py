@@ -0,0 +1,58 @@
+"""
+Store the width, height and placeholder of Project, Blog and Profile images
+that lack them (new uploads get them on save, existing rows in migration 0011).
+Run: python manage.py backfill_image_metadata [--all]
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from portfolio.cache import bump_content_version
+from portfolio.images import IMAGE_FIELDS, metadata_columns, update_image_metadata
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = 'Store dimensions and placeholders for existing images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Read every image again, not only those without dimensions')
+
+    def handle(self, *args, **options):
+        updated = 0
+        for label, field_names in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            columns = [column for name in field_names for column in metadata_columns(name)]
+            rows = model.objects.only('id', *field_names, *columns)
+            if not options['all']:
+                missing = Q()
+                for name in field_names:
+                    # An image (neither NULL nor empty) without dimensions
+                    missing |= Q(**{f'{name}__gt': '', f'{name}_width__isnull': True})
+                rows = rows.filter(missing)
+
+            batch = []
+            with transaction.atomic():
+                for row in rows.iterator(chunk_size=BATCH_SIZE):
+                    update_image_metadata(row, force=options['all'])
+                    for name in field_names:
+                        if getattr(row, name) and getattr(row, f'{name}_width') is None:
+                            self.stdout.write(self.style.WARNING(f'Unreadable image: {getattr(row, name).name}'))
+                    batch.append(row)
+                    if len(batch) >= BATCH_SIZE:
+                        updated += self.flush(model, batch, columns)
+                updated += self.flush(model, batch, columns)
+
+        if updated:
+            bump_content_version()
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} rows.'))
+
+    def flush(self, model, batch, columns):
+        # bulk_update skips save() and signals, and leaves updated_at alone
+        model.objects.bulk_update(batch, columns)
+        count = len(batch)
+        batch.clear()
+        return count
@@ -0,0 +1,203 @@
+"""
+Benchmark every named route in portfolio/urls.py and the sitemap, in process,
+against a deterministic data set, and compare with a stored baseline.
+Run: python manage.py bench [-n 30] [--size 20] [--output results.json]
+                            [--baseline FILE] [--save-baseline] [--metric p50] [--threshold 0.25]
+
+A throwaway test database is created and filled by portfolio.sampledata, so
+the site database is never touched and every run sees the same rows. Each URL
+is requested through the test client (middleware included) ``--warmup`` times,
+then ``-n`` times while measuring wall time, queries and response bytes.
+Caches are replaced by a dummy backend unless ``--cache`` is given, so each
+request does the full work of a cache miss.
+
+With a baseline (BENCH_BASELINE, or ``--baseline``) the command exits with an
+error when a URL runs more queries than before, or when its latency
+(``--metric``, the median by default: the tail is noisier from run to run)
+grew by more than ``--threshold`` and by at least ``--min-delta`` ms, so
+noise on sub-millisecond routes is ignored. Latency is machine dependent:
+record the baseline on the machine that runs the comparison.
+"""
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+from django.urls import URLPattern, reverse
+
+from portfolio import urls as portfolio_urls
+from portfolio.models import Blog, Project
+from portfolio.nplusone import QueryRecorder
+from portfolio.sampledata import seed
+from portfolio.views.api import RESOURCES
+
+# Staff-only and internal routes
+SKIP = {'contact_queue_stats', 'metrics'}
+QUERY_STRINGS = {'search': '?q=python'}
+DUMMY_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def sample_objects():
+    return {
+        'project_id': Project.objects.order_by('pk').first().pk,
+        'slug': Blog.objects.order_by('pk').first().slug,
+    }
+
+
+def route_urls():
+    """``[(label, path)]`` for every named portfolio route, plus the sitemap."""
+    objects = sample_objects()
+    found = []
+    for pattern in portfolio_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name or pattern.name in SKIP:
+            continue
+        name = f'{portfolio_urls.app_name}:{pattern.name}'
+        params = set(pattern.pattern.converters)
+        query = QUERY_STRINGS.get(pattern.name, '')
+        if not params:
+            found.append((pattern.name, reverse(name) + query))
+        elif params <= set(objects):
+            found.append((pattern.name, reverse(name, kwargs={key: objects[key] for key in params}) + query))
+        elif params == {'resource'}:
+            found += [(f'{pattern.name} {resource}', reverse(name, args=[resource])) for resource in RESOURCES]
+        elif params == {'resource', 'lookup'}:
+            for resource, spec in RESOURCES.items():
+                obj = spec.model.objects.order_by('pk').first()
+                found.append((f'{pattern.name} {resource}', reverse(name, args=[resource, getattr(obj, spec.lookup)])))
+        else:
+            raise CommandError(f'bench does not know how to build a URL for {name} ({", ".join(sorted(params))})')
+    found.append(('sitemap', reverse('sitemap')))
+    return found
+
+
+def summarize(latencies, queries, size, status):
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'p50': round(cuts[49], 3),
+        'p95': round(cuts[94], 3),
+        'p99': round(cuts[98], 3),
+        'mean': round(statistics.fmean(latencies), 3),
+        'queries': queries,
+        'bytes': size,
+        'status': status,
+    }
+
+
+def regressions(results, baseline, metric, threshold, min_delta):
+    found = []
+    for label, now in results.items():
+        before = baseline.get(label)
+        if before is None:
+            continue
+        if now['queries'] > before['queries']:
+            found.append(f'{label}: {before["queries"]} -> {now["queries"]} queries')
+        limit = max(before[metric] * (1 + threshold), before[metric] + min_delta)
+        if now[metric] > limit:
+            found.append(f'{label}: {metric} {before[metric]:.2f} -> {now[metric]:.2f} ms')
+    return found
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the portfolio views against a seeded database and a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-n', '--iterations', type=int, default=30,
+                            help='Measured requests per URL (default: 30)')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per URL (default: 3)')
+        parser.add_argument('--size', type=int, default=20,
+                            help='Rows of each kind in the seeded database (default: 20)')
+        parser.add_argument('--cache', action='store_true', help='Keep the configured cache backend')
+        parser.add_argument('--accept-encoding', default='gzip, br',
+                            help='Accept-Encoding sent with each request (default: "gzip, br")')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', default=getattr(settings, 'BENCH_BASELINE', None),
+                            help='Baseline JSON file to compare against (default: BENCH_BASELINE)')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Write the results to the baseline file instead of comparing')
+        parser.add_argument('--metric', choices=['p50', 'p95', 'p99', 'mean'], default='p50',
+                            help='Latency compared with the baseline (default: p50)')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed latency growth, as a fraction (default: 0.25)')
+        parser.add_argument('--min-delta', type=float, default=1.0,
+                            help='Ignore latency growth smaller than this many ms (default: 1.0)')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 2:
+            raise CommandError('--iterations must be at least 2.')
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, aliases=set(settings.DATABASES))
+        try:
+            overrides = {} if options['cache'] else {'CACHES': DUMMY_CACHES}
+            with override_settings(
+                DEBUG=False, NPLUSONE_DETECTION=False, JOBS_RUN_INLINE=False, CONTACT_WRITE_BEHIND=False,
+                **overrides,
+            ):
+                seed(size=options['size'])
+                results = self.measure(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'iterations': options['iterations'],
+                'size': options['size'],
+                'cache': options['cache'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'machine': platform.node(),
+            },
+            'routes': results,
+        }
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+            self.stdout.write(f'Results written to {options["output"]}')
+
+        baseline_path = Path(options['baseline']) if options['baseline'] else None
+        if options['save_baseline']:
+            if baseline_path is None:
+                raise CommandError('No baseline file: set BENCH_BASELINE or pass --baseline.')
+            baseline_path.write_text(json.dumps(report, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline saved to {baseline_path}'))
+        elif baseline_path is not None and baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+            if baseline.get('meta', {}).get('size') != options['size']:
+                self.stdout.write(self.style.WARNING('The baseline was recorded with a different --size.'))
+            found = regressions(
+                results, baseline['routes'], options['metric'], options['threshold'], options['min_delta'],
+            )
+            if found:
+                raise CommandError('Performance regressions:\n  ' + '\n  '.join(found))
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline_path}'))
+
+    def measure(self, options):
+        client = Client(HTTP_ACCEPT_ENCODING=options['accept_encoding'])
+        results = {}
+        self.stdout.write(f'{"url":<34} {"status":>6} {"p50":>8} {"p95":>8} {"p99":>8} {"queries":>8} {"bytes":>8}')
+        for label, path in route_urls():
+            latencies = []
+            for i in range(options['warmup'] + options['iterations']):
+                with QueryRecorder() as recorder:
+                    started = time.perf_counter()
+                    response = client.get(path)
+                    body = b''.join(response.streaming_content) if response.streaming else response.content
+                    elapsed = (time.perf_counter() - started) * 1000
+                if i >= options['warmup']:
+                    latencies.append(elapsed)
+            results[label] = summarize(latencies, len(recorder.statements), len(body), response.status_code)
+            row = results[label]
+            style = self.style.WARNING if row['status'] != 200 else (lambda text: text)
+            self.stdout.write(style(
+                f'{label:<34} {row["status"]:>6} {row["p50"]:>8.2f} {row["p95"]:>8.2f} {row["p99"]:>8.2f} '
+                f'{row["queries"]:>8} {row["bytes"]:>8}'
+            ))
+        return results
@@ -0,0 +1,169 @@
+"""
+Compare the throughput of the site under a WSGI server (sync views) and under
+uvicorn (ASGI, async views from portfolio/views/main_async.py).
+Run: python manage.py bench_servers [--seconds 10] [--concurrency 16] [--path /] [--bust-cache]
+
+Each server is started in turn as a subprocess on a free local port, from the
+``--wsgi`` and ``--asgi`` command templates (``{port}`` is filled in; the
+defaults need gunicorn and uvicorn installed). When it answers, ``--concurrency``
+client threads send keep-alive GET requests for ``--seconds``, cycling through
+the ``--path`` URLs. Requests/s, latency percentiles and errors are reported
+for each, then the server is stopped.
+
+The servers use the site's own settings and database; only GET requests are
+sent. With ``--bust-cache`` every URL gets a unique query string, so the page
+cache misses and each request does the full work.
+"""
+import http.client
+import itertools
+import os
+import shlex
+import socket
+import statistics
+import subprocess
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_WSGI = 'gunicorn abid_portfolio.wsgi:application --bind 127.0.0.1:{port} --workers 1 --threads 16'
+DEFAULT_ASGI = 'uvicorn abid_portfolio.asgi:application --host 127.0.0.1 --port {port} --workers 1 --no-access-log'
+DEFAULT_PATHS = ['/', '/blogs/', '/projects/', '/skills/']
+STARTUP_TIMEOUT = 30
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port, process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f'The server exited with status {process.returncode}.')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/robots.txt')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f'The server did not answer on port {port} within {STARTUP_TIMEOUT}s.')
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput under a WSGI server and under uvicorn with async views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=10, help='Load duration per server (default: 10)')
+        parser.add_argument('--warmup', type=float, default=2, help='Unmeasured seconds first (default: 2)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Client threads (default: 16)')
+        parser.add_argument('--path', action='append', help=f'URL to request (repeatable, default: {DEFAULT_PATHS})')
+        parser.add_argument('--bust-cache', action='store_true',
+                            help='Add a unique query string to every request')
+        parser.add_argument('--wsgi', default=DEFAULT_WSGI, help='WSGI server command, with {port}')
+        parser.add_argument('--asgi', default=DEFAULT_ASGI, help='ASGI server command, with {port}')
+        parser.add_argument('--only', choices=['wsgi', 'asgi'], help='Run only one of the two servers')
+
+    def handle(self, *args, **options):
+        paths = options['path'] or DEFAULT_PATHS
+        results = {}
+        for name in ('wsgi', 'asgi'):
+            if options['only'] not in (None, name):
+                continue
+            env = dict(os.environ, PORTFOLIO_ASYNC_VIEWS='1' if name == 'asgi' else '0')
+            port = free_port()
+            command = shlex.split(options[name].format(port=port))
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{name}: {" ".join(command)}'))
+            try:
+                process = subprocess.Popen(
+                    command, cwd=settings.BASE_DIR, env=env,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+            except FileNotFoundError:
+                raise CommandError(f'{command[0]} is not installed (pip install {command[0]}).')
+            try:
+                wait_until_up(port, process)
+                self.load(port, paths, options['warmup'], options)
+                results[name] = self.load(port, paths, options['seconds'], options)
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+            self.report(name, results[name])
+
+        if len(results) == 2:
+            wsgi, asgi = results['wsgi'], results['asgi']
+            ratio = asgi['per_second'] / wsgi['per_second'] if wsgi['per_second'] else 0
+            self.stdout.write(self.style.SUCCESS(
+                f'\nasgi/wsgi: {ratio:.2f}x requests/s, p50 {wsgi["p50"]:.1f} -> {asgi["p50"]:.1f} ms, '
+                f'p99 {wsgi["p99"]:.1f} -> {asgi["p99"]:.1f} ms'
+            ))
+
+    def load(self, port, paths, seconds, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        counter = itertools.count()
+        latencies, errors = [], [0]
+
+        def client():
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            local, failed = [], 0
+            while not stop.is_set():
+                n = next(counter)
+                path = paths[n % len(paths)]
+                if options['bust_cache']:
+                    path += ('&' if '?' in path else '?') + f'bench={n}'
+                started = time.perf_counter()
+                try:
+                    conn.request('GET', path, headers={'Accept-Encoding': 'gzip, br'})
+                    response = conn.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        failed += 1
+                        continue
+                except (OSError, http.client.HTTPException):
+                    failed += 1
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                    continue
+                local.append((time.perf_counter() - started) * 1000)
+            conn.close()
+            with lock:
+                latencies.extend(local)
+                errors[0] += failed
+
+        threads = [threading.Thread(target=client) for _ in range(options['concurrency'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            'requests': len(latencies),
+            'per_second': len(latencies) / elapsed,
+            'errors': errors[0],
+            'p50': statistics.median(latencies) if latencies else 0.0,
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name:>5}: {result["requests"]} requests ({result["per_second"]:.0f}/s), {result["errors"]} errors | '
+            f'ms p50 {result["p50"]:.1f}  p95 {result["p95"]:.1f}  p99 {result["p99"]:.1f}'
+        )
@@ -0,0 +1,98 @@
+"""
+Vendor, bundle and minify the front-end assets (see portfolio/assets.py).
+Run: python manage.py build_assets [--refresh] [--all-icons]
+
+Then run collectstatic as usual. With DEBUG off, ManifestStaticFilesStorage
+writes content-hashed copies and staticfiles.json, so /static/ can be served
+with a far-future Cache-Control header.
+
+Vendored files are checked against assets/vendor.lock.json. After adding or
+upgrading an entry in portfolio/assets.py VENDOR, check the downloaded file
+and run with --pin to record its hash, then commit the lock file.
+
+Icon fonts are only subset when fontTools and brotli are installed
+(pip install -r requirements-optional.txt); otherwise they are copied whole. Re-run this
+command after using a new Font Awesome icon in a template or an icon field.
+"""
+import shutil
+import time
+from urllib.error import URLError
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.assets import (
+    BUNDLES, ICON_CSS, VENDOR, IntegrityError, dist_root, fetch, load_lock, minify_css, minify_js,
+    prune_icons, read_source, rewrite_urls, save_lock, subset_font, used_icons,
+)
+from portfolio.templatetags.asset_extras import clear_bundle_cache
+
+ICON_FONT_PREFIX = 'fa-'
+
+
+class Command(BaseCommand):
+    help = 'Build the minified, self-hosted CSS/JS bundles in static/dist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--refresh', action='store_true',
+                            help='Download the vendored files again')
+        parser.add_argument('--pin', action='store_true',
+                            help='Record the hash of vendored files that have none in the lock file')
+        parser.add_argument('--all-icons', action='store_true',
+                            help='Keep every Font Awesome icon instead of only the ones in use')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        lock = load_lock()
+        pinned = len(lock)
+        for source in VENDOR:
+            try:
+                if fetch(source, lock, refresh=options['refresh'], pin=options['pin']):
+                    self.stdout.write(f'Downloaded: {source.path}')
+            except IntegrityError as e:
+                raise CommandError(str(e))
+            except (URLError, OSError) as e:
+                raise CommandError(f'Could not download {source.url}: {e}')
+        if len(lock) > pinned:
+            save_lock(lock)
+            self.stdout.write(self.style.WARNING(f'Pinned {len(lock) - pinned} new hashes; review and commit the lock file.'))
+
+        dist = dist_root()
+        if dist.exists():
+            shutil.rmtree(dist)
+        (dist / 'fonts').mkdir(parents=True)
+
+        fonts, codepoints = {}, None
+        for name, sources in BUNDLES.items():
+            parts = []
+            for source in sources:
+                text = read_source(source)
+                if name.endswith('.css'):
+                    if source.path.startswith('src/'):
+                        text = minify_css(text)
+                    if source.path == ICON_CSS and not options['all_icons']:
+                        text, codepoints = prune_icons(text, used_icons())
+                    text = rewrite_urls(text, source, fonts)
+                elif source.path.startswith('src/'):
+                    text = minify_js(text)
+                parts.append(text.strip())
+            # Newline-separated, so a trailing `//` comment cannot swallow the next file
+            content = '\n'.join(parts) + '\n'
+            (dist / name).write_text(content, encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Built: {name} ({len(content.encode()) / 1024:.1f} KB)'))
+
+        for font_name, path in sorted(fonts.items()):
+            target = dist / 'fonts' / font_name
+            if codepoints is not None and font_name.startswith(ICON_FONT_PREFIX):
+                if not subset_font(path, target, codepoints):
+                    self.stdout.write(self.style.WARNING(
+                        f'fontTools/brotli not installed, copied {font_name} without subsetting'
+                    ))
+            else:
+                shutil.copyfile(path, target)
+            self.stdout.write(
+                f'Font: {font_name} ({path.stat().st_size / 1024:.1f} KB -> {target.stat().st_size / 1024:.1f} KB)'
+            )
+
+        clear_bundle_cache()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'\nAssets built in {elapsed:.2f}s -> {dist}'))
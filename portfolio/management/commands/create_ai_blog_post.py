@@ -3,17 +3,13 @@ Create a professional AI blog post with header image.
 Run: python manage.py create_ai_blog_post
 """
 from datetime import date
-from io import BytesIO
-from pathlib import Path
 
 from django.core.files import File
 from django.core.management.base import BaseCommand
-from django.conf import settings
 from django.utils.text import slugify
 
-from PIL import Image, ImageDraw, ImageFont
-
 from portfolio.models import Blog
+from portfolio.rendering import Text, render_card, to_png_bytes
 
 
 class Command(BaseCommand):
@@ -21,45 +17,13 @@ class Command(BaseCommand):
 
     def create_ai_blog_image(self):
         """Create a professional AI blog header image with gradient and text"""
-        img = Image.new('RGB', (1400, 700), color='white')
-        
-        # Draw gradient background (navy to teal to cyan)
-        draw = ImageDraw.Draw(img)
-        for x in range(1400):
-            ratio = x / 1400
-            r = int(26 * (1 - ratio) + 0 * ratio)
-            g = int(54 * (1 - ratio) + 150 * ratio)
-            b = int(93 * (1 - ratio) + 200 * ratio)
-            draw.line([(x, 0), (x, 700)], fill=(r, g, b))
-
-        # Draw semi-transparent overlay for text contrast
-        overlay = Image.new('RGBA', (1400, 700), (0, 0, 0, 40))
-        img.paste(overlay, (0, 0), overlay)
-
-        try:
-            title_font = ImageFont.truetype("arial.ttf", 96)
-            subtitle_font = ImageFont.truetype("arial.ttf", 48)
-        except OSError:
-            title_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
-
-        # Draw brain/AI icon representation
-        draw.text((100, 250), "🧠", fill='white', font=ImageFont.truetype("arial.ttf", 200) if 'arial.ttf' else ImageFont.load_default())
-
-        # Draw title
-        title = "AI and Its Features"
-        draw.text((450, 150), title, fill='white', font=title_font)
-
-        # Draw subtitle
-        subtitle = "In Comprehensive Detail"
-        draw.text((450, 300), subtitle, fill='#e0f2fe', font=subtitle_font)
-
-        # Draw description
-        desc_font = ImageFont.truetype("arial.ttf", 28) if 'arial.ttf' else ImageFont.load_default()
-        description = "Explore Machine Learning, Deep Learning, NLP, Computer Vision & More"
-        draw.text((100, 550), description, fill='#cbd5e1', font=desc_font)
-
-        return img
+        # Gradient background (navy to teal to cyan) with an overlay for text contrast
+        return render_card((1400, 700), ((26, 54, 93), (0, 150, 200)), [
+            Text("🧠", 200, x=100, y=250),
+            Text("AI and Its Features", 96, x=450, y=150),
+            Text("In Comprehensive Detail", 48, fill='#e0f2fe', x=450, y=300),
+            Text("Explore Machine Learning, Deep Learning, NLP, Computer Vision & More", 28, fill='#cbd5e1', x=100, y=550),
+        ], overlay=40)
 
     def handle(self, *args, **options):
         # Check if blog post already exists
@@ -73,9 +37,7 @@ class Command(BaseCommand):
         img = self.create_ai_blog_image()
         
         # Save to BytesIO
-        bio = BytesIO()
-        img.save(bio, format='PNG', optimize=True)
-        bio.seek(0)
+        bio = to_png_bytes(img)
 
         # Blog content
         blog_title = "AI and Its Features in Detail"
@@ -3,17 +3,13 @@ Create a professional 'Human and AI' blog post with header image.
 Run: python manage.py create_human_ai_blog
 """
 from datetime import date
-from io import BytesIO
-from pathlib import Path
 
 from django.core.files import File
 from django.core.management.base import BaseCommand
-from django.conf import settings
 from django.utils.text import slugify
 
-from PIL import Image, ImageDraw, ImageFont
-
 from portfolio.models import Blog
+from portfolio.rendering import Text, render_card, to_png_bytes
 
 
 class Command(BaseCommand):
@@ -21,46 +17,14 @@ class Command(BaseCommand):
 
     def create_human_ai_blog_image(self):
         """Create a professional Human and AI blog header image"""
-        img = Image.new('RGB', (1400, 700), color='white')
-        
-        # Draw gradient background (purple to indigo to blue)
-        draw = ImageDraw.Draw(img)
-        for x in range(1400):
-            ratio = x / 1400
-            r = int(102 * (1 - ratio) + 59 * ratio)
-            g = int(51 * (1 - ratio) + 130 * ratio)
-            b = int(153 * (1 - ratio) + 246 * ratio)
-            draw.line([(x, 0), (x, 700)], fill=(r, g, b))
-
-        # Draw semi-transparent overlay for text contrast
-        overlay = Image.new('RGBA', (1400, 700), (0, 0, 0, 50))
-        img.paste(overlay, (0, 0), overlay)
-
-        try:
-            title_font = ImageFont.truetype("arial.ttf", 96)
-            subtitle_font = ImageFont.truetype("arial.ttf", 48)
-        except OSError:
-            title_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
-
-        # Draw human and AI icons
-        draw.text((80, 220), "👤", fill='white', font=ImageFont.truetype("arial.ttf", 160) if 'arial.ttf' else ImageFont.load_default())
-        draw.text((250, 220), "🤖", fill='white', font=ImageFont.truetype("arial.ttf", 160) if 'arial.ttf' else ImageFont.load_default())
-
-        # Draw title
-        title = "Humans and AI"
-        draw.text((480, 150), title, fill='white', font=title_font)
-
-        # Draw subtitle
-        subtitle = "Building a Collaborative Future"
-        draw.text((480, 300), subtitle, fill='#e0f2fe', font=subtitle_font)
-
-        # Draw description
-        desc_font = ImageFont.truetype("arial.ttf", 28) if 'arial.ttf' else ImageFont.load_default()
-        description = "Understanding Human-AI Collaboration, Opportunities & Challenges"
-        draw.text((100, 550), description, fill='#cbd5e1', font=desc_font)
-
-        return img
+        # Gradient background (purple to indigo to blue) with an overlay for text contrast
+        return render_card((1400, 700), ((102, 51, 153), (59, 130, 246)), [
+            Text("👤", 160, x=80, y=220),
+            Text("🤖", 160, x=250, y=220),
+            Text("Humans and AI", 96, x=480, y=150),
+            Text("Building a Collaborative Future", 48, fill='#e0f2fe', x=480, y=300),
+            Text("Understanding Human-AI Collaboration, Opportunities & Challenges", 28, fill='#cbd5e1', x=100, y=550),
+        ], overlay=50)
 
     def handle(self, *args, **options):
         # Check if blog post already exists
@@ -74,9 +38,7 @@ class Command(BaseCommand):
         img = self.create_human_ai_blog_image()
         
         # Save to BytesIO
-        bio = BytesIO()
-        img.save(bio, format='PNG', optimize=True)
-        bio.seek(0)
+        bio = to_png_bytes(img)
 
         # Blog content - Professional, detailed, human-written style
         blog_title = "Humans and AI: Building a Collaborative Future"
@@ -0,0 +1,86 @@
+"""
+Collapse byte-identical files in MEDIA_ROOT into a single copy.
+Run: python manage.py dedupe_media [--dry-run]
+
+Within each group of identical files the shortest name is kept (so
+``ai-blog-header.png`` wins over ``ai-blog-header_Ip7E7Sk.png``). Image fields
+pointing at a duplicate are rewritten to the kept file, then the duplicates and
+their responsive derivatives (at any width) are deleted and their cached
+variant lists dropped.
+"""
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from portfolio.images import FORMATS, IMAGE_FIELDS, existing_derivatives, forget_variants
+from portfolio.storage import content_hash
+
+DERIVATIVE_RE = re.compile(r'-\d+w\.(%s)$' % '|'.join(ext for ext, _ in FORMATS.values()))
+
+
+class Command(BaseCommand):
+    help = 'Deduplicate identical media files and rewrite model references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report duplicates without changing anything')
+
+    def find_duplicates(self, media_root):
+        groups = defaultdict(list)
+        for path in media_root.rglob('*'):
+            if not path.is_file() or path.name.startswith('.') or DERIVATIVE_RE.search(path.name):
+                continue
+            with path.open('rb') as f:
+                digest = content_hash(File(f))
+            groups[digest].append(path.relative_to(media_root).as_posix())
+        return [sorted(names, key=lambda n: (len(n), n)) for names in groups.values() if len(names) > 1]
+
+    def handle(self, *args, **options):
+        media_root = Path(settings.MEDIA_ROOT)
+        dry_run = options['dry_run']
+        groups = self.find_duplicates(media_root)
+        if not groups:
+            self.stdout.write(self.style.SUCCESS('No duplicate media files found.'))
+            return
+
+        replacements = {}
+        for keep, *duplicates in groups:
+            for name in duplicates:
+                replacements[name] = keep
+                self.stdout.write(f'{name} -> {keep}')
+
+        rewritten = 0
+        for label, field_names in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for field_name in field_names:
+                for instance in model.objects.filter(**{f'{field_name}__in': list(replacements)}):
+                    old = getattr(instance, field_name).name
+                    self.stdout.write(f'  {label} #{instance.pk}.{field_name}: {old} -> {replacements[old]}')
+                    rewritten += 1
+                    if not dry_run:
+                        setattr(instance, field_name, replacements[old])
+                        instance.save(update_fields=[field_name, 'updated_at'])
+
+        freed = 0
+        for name in replacements:
+            # By name rather than the configured widths, so narrow images'
+            # own-width derivatives (and ones from old settings) go too
+            for candidate in [name] + existing_derivatives(name):
+                path = media_root / candidate
+                if path.exists():
+                    freed += path.stat().st_size
+                    if not dry_run:
+                        path.unlink()
+            if not dry_run:
+                forget_variants(name)
+
+        prefix = 'Would remove' if dry_run else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{prefix} {len(replacements)} duplicate files ({freed / 1024 / 1024:.1f} MB), '
+            f'{rewritten} model references rewritten.'
+        ))
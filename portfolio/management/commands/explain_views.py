@@ -0,0 +1,137 @@
+"""
+Print the SQLite query plan of every query the public views issue, and flag
+full table scans and temporary sort B-trees.
+Run: python manage.py explain_views [--all] [--fail]
+
+Each page is requested through the test client with the caches swapped for a
+dummy backend, so every query actually runs. Each distinct statement is then
+passed to ``EXPLAIN QUERY PLAN`` on the connection that ran it:
+
+    SCAN <table>              full table scan (no index used)
+    USE TEMP B-TREE FOR ...   rows sorted after the fact (ORDER BY/GROUP BY)
+
+Only the site's own tables are checked. Scans that walk an index or the
+rowid (``SCAN t USING [COVERING] INDEX``, ``USING INTEGER PRIMARY KEY``) are
+not flagged, nor are scans in a query with a ``LIMIT`` and no temp B-tree,
+which stop after that many rows (``Profile.objects.first()``). Queries that
+have to read every row (COUNT/MAX fingerprints, sitemap, full listings) are
+expected to scan; sorts should not need a temp B-tree.
+"""
+import re
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from portfolio.models import Blog, Project, Service
+
+# A plain SCAN reads every row; SCAN ... USING [COVERING] INDEX or INTEGER
+# PRIMARY KEY walks an index or the rowid in order
+SCAN_RE = re.compile(r'\bSCAN (\w+)(?!\w| USING (?:COVERING INDEX|INDEX|INTEGER PRIMARY KEY)\b)')
+# LIMIT of the outermost query
+LIMIT_RE = re.compile(r'\bLIMIT \d+(?: OFFSET \d+)?\s*$')
+TEMP_RE = re.compile(r'USE TEMP B-TREE FOR (.+)')
+TABLE_PREFIX = 'portfolio_'
+DUMMY_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def sample_paths():
+    """One URL for every public view, with real objects where one is needed."""
+    paths = [reverse(f'portfolio:{name}') for name in (
+        'home', 'about', 'skills', 'projects', 'services', 'contact', 'blogs', 'robots_txt', 'api_skills',
+    )]
+    paths.append(reverse('portfolio:search') + '?q=python')
+    paths.append(reverse('sitemap'))
+
+    project = Project.objects.order_by('pk').first()
+    blog = Blog.objects.order_by('pk').first()
+    service = Service.objects.order_by('pk').first()
+    if project:
+        paths.append(reverse('portfolio:project_detail', args=[project.pk]))
+    if blog:
+        paths.append(reverse('portfolio:blog_detail', args=[blog.slug]))
+    for resource, obj, lookup in (('projects', project, 'pk'), ('blogs', blog, 'slug'), ('services', service, 'pk')):
+        paths.append(reverse('portfolio:api_list', args=[resource]))
+        if obj:
+            paths.append(reverse('portfolio:api_detail', args=[resource, getattr(obj, lookup)]))
+    return paths
+
+
+def explain(connection, sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def problems(plan, sql=''):
+    found = []
+    limited = LIMIT_RE.search(sql) and not any(TEMP_RE.search(line) for line in plan)
+    for line in plan:
+        scan = SCAN_RE.search(line)
+        if scan and scan.group(1).startswith(TABLE_PREFIX) and not limited:
+            found.append(f'full scan of {scan.group(1)}')
+        temp = TEMP_RE.search(line)
+        if temp:
+            found.append(f'temp B-tree for {temp.group(1)}')
+    return found
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN QUERY PLAN every query issued by the public views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Print the plan of every query, not only flagged ones')
+        parser.add_argument('--fail', action='store_true',
+                            help='Exit with an error if any temp B-tree sort is found')
+
+    def handle(self, *args, **options):
+        aliases = [alias for alias in connections if connections[alias].vendor == 'sqlite']
+        if not aliases:
+            raise CommandError('explain_views only supports SQLite databases.')
+
+        host = urlsplit(settings.SITE_URL).netloc
+        client = Client(HTTP_HOST=host, raise_request_exception=False)
+        seen = set()
+        flagged = defaultdict(int)
+
+        with override_settings(CACHES=DUMMY_CACHES):
+            for path in sample_paths():
+                contexts = [CaptureQueriesContext(connections[alias]) for alias in aliases]
+                for context in contexts:
+                    context.__enter__()
+                try:
+                    response = client.get(path)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                finally:
+                    for context in contexts:
+                        context.__exit__(None, None, None)
+
+                queries = [(alias, q['sql']) for alias, context in zip(aliases, contexts) for q in context]
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'{path} [{response.status_code}]: {len(queries)} queries'
+                ))
+                for alias, sql in queries:
+                    if (alias, sql) in seen or not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                        continue
+                    seen.add((alias, sql))
+                    plan = explain(connections[alias], sql)
+                    issues = problems(plan, sql)
+                    for issue in issues:
+                        flagged[issue.split(' ', 2)[0]] += 1
+                    if issues or options['all']:
+                        style = self.style.WARNING if issues else (lambda text: text)
+                        self.stdout.write(f'  {sql[:200]}')
+                        for line in plan:
+                            self.stdout.write(style(f'    {line}'))
+
+        summary = f'\n{len(seen)} distinct queries: {flagged["full"]} full scans, {flagged["temp"]} temp B-tree sorts'
+        if flagged['temp'] and options['fail']:
+            raise CommandError(summary.strip())
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,167 @@
+"""
+Render the public site into plain files that nginx can serve directly.
+Run: python manage.py export_static [--output DIR] [--base-url URL] [--force]
+
+Every page in portfolio/urls.py is rendered through the normal request stack:
+home, about, skills, projects and each project, services, the first page of
+blogs and each post, robots.txt, and sitemap.xml with its shards. Each page is
+written next to ``.gz`` and, when the ``brotli`` package is installed, ``.br``
+siblings for ``gzip_static``/``brotli_static``.
+
+Rebuilds are incremental. The ETag of every exported page is kept in a
+manifest and sent back as ``If-None-Match``. Views answer that from the
+``updated_at``/count fingerprint of the rows they depend on (see
+portfolio/conditional.py), so only pages whose rows, templates or built
+static files changed are rendered again. Pages of deleted objects are removed; a page that fails to
+render keeps its last exported files.
+
+The contact form, search and paginated blog pages (``?cursor=``) stay dynamic;
+proxy those, and any request with a query string, to Django.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from portfolio.models import Blog, Project
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_NAME = '.export-manifest.json'
+STATIC_PAGES = ('home', 'about', 'skills', 'projects', 'services', 'blogs', 'robots_txt')
+SITEMAP_LOC_RE = re.compile(rb'<sitemap><loc>[^<]*?(/sitemap-[^<]+\.xml)</loc>')
+
+
+def output_path(root, url_path):
+    """``/`` -> ``index.html``, ``/about/`` -> ``about/index.html``, files as-is."""
+    relative = url_path.lstrip('/')
+    if not relative or relative.endswith('/'):
+        relative += 'index.html'
+    return root / relative
+
+
+def write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class Command(BaseCommand):
+    help = 'Export the public pages as static, precompressed files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=getattr(settings, 'STATIC_EXPORT_ROOT', None),
+                            help='Output directory (default: STATIC_EXPORT_ROOT)')
+        parser.add_argument('--base-url', default=settings.SITE_URL,
+                            help='Public site URL used for absolute links (default: SITE_URL)')
+        parser.add_argument('--force', action='store_true',
+                            help='Re-render every page, ignoring the manifest')
+
+    def page_paths(self):
+        paths = [reverse(f'portfolio:{name}') for name in STATIC_PAGES]
+        paths += [reverse('portfolio:project_detail', args=[pk])
+                  for pk in Project.objects.order_by('pk').values_list('pk', flat=True)]
+        paths += [reverse('portfolio:blog_detail', args=[slug])
+                  for slug in Blog.objects.order_by('pk').values_list('slug', flat=True)]
+        paths.append(reverse('sitemap'))
+        return paths
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            raise CommandError('Pass --output or set STATIC_EXPORT_ROOT.')
+        root = Path(options['output'])
+        base = urlsplit(options['base_url'])
+        secure = base.scheme == 'https'
+        client = Client(HTTP_HOST=base.netloc, raise_request_exception=False)
+
+        manifest_path = root / MANIFEST_NAME
+        try:
+            manifest = {} if options['force'] else json.loads(manifest_path.read_text())
+        except (FileNotFoundError, ValueError):
+            manifest = {}
+
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('brotli is not installed; writing .gz files only.'))
+
+        started = time.perf_counter()
+        pending = self.page_paths()
+        exported, written, unchanged, failed = {}, 0, 0, 0
+        seen = set()
+        while pending:
+            url_path = pending.pop(0)
+            seen.add(url_path)
+            previous = manifest.get(url_path, {})
+            headers = {'if-none-match': previous['etag']} if previous.get('etag') else {}
+            response = client.get(url_path, secure=secure, headers=headers)
+
+            if response.status_code == 304:
+                exported[url_path] = previous
+                unchanged += 1
+                self.stdout.write(f'Unchanged: {url_path}')
+                if url_path == reverse('sitemap'):
+                    # An unchanged index still lists its shards
+                    pending += [p for p in previous.get('shards', []) if p not in exported]
+                continue
+            if response.status_code != 200:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'Failed: {url_path} ({response.status_code})'))
+                if previous:
+                    # Keep serving the last good export until the page renders again
+                    exported[url_path] = previous
+                    pending += [p for p in previous.get('shards', []) if p not in exported]
+                continue
+
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+            entry = {'etag': response.get('ETag'), 'sha256': hashlib.sha256(content).hexdigest()}
+            if url_path == reverse('sitemap'):
+                entry['shards'] = [m.decode() for m in SITEMAP_LOC_RE.findall(content)]
+                pending += [p for p in entry['shards'] if p not in exported]
+            exported[url_path] = entry
+
+            path = output_path(root, url_path)
+            if previous.get('sha256') == entry['sha256'] and path.exists():
+                unchanged += 1
+                self.stdout.write(f'Unchanged: {url_path}')
+                continue
+            self.write_page(path, content)
+            written += 1
+            self.stdout.write(self.style.SUCCESS(f'Exported: {url_path}'))
+
+        removed = 0
+        # Only pages that are no longer listed; failed pages were carried forward
+        for url_path in set(manifest) - seen - set(exported):
+            path = output_path(root, url_path)
+            for candidate in (path, path.with_name(path.name + '.gz'), path.with_name(path.name + '.br')):
+                if candidate.exists():
+                    candidate.unlink()
+            removed += 1
+            self.stdout.write(self.style.WARNING(f'Removed: {url_path}'))
+
+        write_atomic(manifest_path, json.dumps(exported, indent=2, sort_keys=True).encode('utf-8'))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{written} exported, {unchanged} unchanged, {removed} removed, {failed} failed '
+            f'in {elapsed:.2f}s -> {root}'
+        ))
+        if failed:
+            raise CommandError(f'{failed} pages failed to render.')
+
+    def write_page(self, path, content):
+        write_atomic(path, content)
+        # mtime=0 keeps the .gz byte-identical across runs
+        write_atomic(path.with_name(path.name + '.gz'), gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            write_atomic(path.with_name(path.name + '.br'), brotli.compress(content))
@@ -8,17 +8,16 @@ images from an external service (Midjourney, DALL·E, etc.) we can add integrati
 when you provide API keys.
 """
 import hashlib
-import os
 from pathlib import Path
-from io import BytesIO
 
 from django.core.files import File
 from django.core.management.base import BaseCommand
 from django.conf import settings
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 
 from portfolio.models import Project
+from portfolio.rendering import Text, render_card, text_size, to_png_bytes
 
 
 def _slugify(name: str) -> str:
@@ -41,52 +40,21 @@ def _choose_gradient(title: str):
     return palettes[idx]
 
 
-def _draw_gradient(img: Image.Image, c1, c2):
-    w, h = img.size
-    draw = ImageDraw.Draw(img)
-    for x in range(w):
-        ratio = x / max(1, w - 1)
-        r = int(c1[0] * (1 - ratio) + c2[0] * ratio)
-        g = int(c1[1] * (1 - ratio) + c2[1] * ratio)
-        b = int(c1[2] * (1 - ratio) + c2[2] * ratio)
-        draw.line([(x, 0), (x, h)], fill=(r, g, b))
-
-
 def _create_project_image(title: str, subtitle: str, size=(1200, 675)) -> Image.Image:
-    img = Image.new("RGB", size, color=(255, 255, 255))
-    c1, c2 = _choose_gradient(title)
-    _draw_gradient(img, c1, c2)
-
-    draw = ImageDraw.Draw(img)
-    try:
-        title_font = ImageFont.truetype("arial.ttf", 72)
-        subtitle_font = ImageFont.truetype("arial.ttf", 36)
-    except OSError:
-        title_font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
-
-    w, h = img.size
-    # draw translucent rectangle behind text for contrast
+    w, h = size
+    # translucent rectangle behind text for contrast
     rect_h = 180
     rect_w = int(w * 0.8)
     rect_x = (w - rect_w) // 2
     rect_y = int(h * 0.45) - rect_h // 2
-    overlay = Image.new("RGBA", (rect_w, rect_h), (0, 0, 0, 80))
-    img.paste(overlay, (rect_x, rect_y), overlay)
-
-    # draw title centered
-    title_w, title_h = draw.textsize(title, font=title_font)
-    t_x = (w - title_w) // 2
-    t_y = rect_y + 18
-    draw.text((t_x, t_y), title, fill=(255, 255, 255), font=title_font)
-
-    # subtitle
-    sub_w, sub_h = draw.textsize(subtitle, font=subtitle_font)
-    s_x = (w - sub_w) // 2
-    s_y = t_y + title_h + 12
-    draw.text((s_x, s_y), subtitle, fill=(230, 230, 230), font=subtitle_font)
 
-    return img
+    # title and subtitle centred inside the rectangle
+    title_y = rect_y + 18
+    subtitle_y = title_y + text_size(title, 72)[1] + 12
+    return render_card(size, _choose_gradient(title), [
+        Text(title, 72, fill=(255, 255, 255), y=title_y),
+        Text(subtitle, 36, fill=(230, 230, 230), y=subtitle_y),
+    ], panel=(80, (rect_x, rect_y, rect_x + rect_w, rect_y + rect_h)))
 
 
 class Command(BaseCommand):
@@ -121,9 +89,7 @@ class Command(BaseCommand):
                 # Create image
                 img = _create_project_image(title, subtitle)
                 # Save to BytesIO
-                bio = BytesIO()
-                img.save(bio, format="PNG", optimize=True)
-                bio.seek(0)
+                bio = to_png_bytes(img)
 
                 # Attach to project.image
                 django_file = File(bio, name=filename)
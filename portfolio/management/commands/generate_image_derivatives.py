@@ -0,0 +1,66 @@
+"""
+Backfill responsive image derivatives (AVIF/WebP/JPEG at several widths) for
+every image referenced by Project, Blog and Profile.
+Run: python manage.py generate_image_derivatives [--jobs N] [--force]
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from portfolio.cache import bump_content_version
+from portfolio.images import IMAGE_FIELDS, get_widths, image_names_for, remember_variants, render_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive image derivatives for existing media'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker processes (default: all cores)')
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate derivatives that already exist')
+
+    def collect_names(self):
+        names = set()
+        for label in IMAGE_FIELDS:
+            for instance in apps.get_model(label).objects.all():
+                names.update(image_names_for(instance))
+        return sorted(names)
+
+    def handle(self, *args, **options):
+        names = []
+        for name in self.collect_names():
+            if default_storage.exists(name):
+                names.append(name)
+            else:
+                self.stdout.write(self.style.WARNING(f'Missing file, skipping: {name}'))
+
+        if not names:
+            self.stdout.write(self.style.WARNING('No images found.'))
+            return
+
+        started = time.perf_counter()
+        widths = get_widths()
+        with ProcessPoolExecutor(max_workers=max(1, options['jobs'])) as executor:
+            futures = {
+                executor.submit(render_derivatives, default_storage.path(name), widths, options['force']): name
+                for name in names
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'Failed for {name}: {e}'))
+                    continue
+                remember_variants(name, results)
+                self.stdout.write(self.style.SUCCESS(f'Created {len(results)} derivatives for: {name}'))
+
+        # Cached pages were rendered without the new srcsets.
+        bump_content_version()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'\nProcessed {len(names)} images in {elapsed:.1f}s.'))
@@ -1,56 +1,24 @@
 """
 Generate professional section images using PIL with gradients and icons.
-Run: python manage.py generate_section_images
+Run: python manage.py generate_section_images [--jobs N] [--force]
 """
-from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
-from django.core.management.base import BaseCommand
-from django.conf import settings
+from portfolio.rendering import Text, card_spec
 
+from ._render import RenderCommand
 
-class Command(BaseCommand):
-    help = 'Generate professional images for all page sections'
-
-    def create_gradient_image(self, filename, title, subtitle, bg_gradient, icon, emoji=True):
-        """Create a professional gradient image with text"""
-        img = Image.new('RGB', (1200, 600), color='white')
-        draw = ImageDraw.Draw(img)
-
-        # Draw gradient background
-        for i in range(0, 1200, 20):
-            # Calculate gradient color
-            ratio = i / 1200
-            r = int(bg_gradient[0][0] * (1 - ratio) + bg_gradient[1][0] * ratio)
-            g = int(bg_gradient[0][1] * (1 - ratio) + bg_gradient[1][1] * ratio)
-            b = int(bg_gradient[0][2] * (1 - ratio) + bg_gradient[1][2] * ratio)
-            draw.rectangle([(i, 0), (i + 20, 600)], fill=(r, g, b))
-
-
-        try:
-            title_font = ImageFont.truetype("arial.ttf", 80)
-            subtitle_font = ImageFont.truetype("arial.ttf", 40)
-            emoji_font = ImageFont.truetype("arial.ttf", 120)
-        except OSError:
-            title_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
-            emoji_font = ImageFont.load_default()
 
-        # Draw emoji/icon
-        draw.text((150, 180), icon, fill='white', font=emoji_font)
-
-        # Draw title
-        draw.text((400, 150), title, fill='white', font=title_font)
-
-        # Draw subtitle
-        draw.text((400, 280), subtitle, fill='white', font=subtitle_font)
+class Command(RenderCommand):
+    help = 'Generate professional images for all page sections'
 
-        return img
+    def gradient_image_spec(self, title, subtitle, bg_gradient, icon):
+        """Spec for a professional gradient image with text"""
+        return card_spec((1200, 600), bg_gradient, [
+            Text(icon, 120, x=150, y=180),
+            Text(title, 80, x=400, y=150),
+            Text(subtitle, 40, x=400, y=280),
+        ])
 
     def handle(self, *args, **options):
-        # Create sections directory
-        sections_dir = Path(settings.MEDIA_ROOT) / 'sections'
-        sections_dir.mkdir(parents=True, exist_ok=True)
-
         sections = [
             {
                 'filename': 'hero-section.png',
@@ -110,17 +78,15 @@ class Command(BaseCommand):
             },
         ]
 
-        for section in sections:
-            self.stdout.write(f'Creating {section["filename"]}...')
-            img = self.create_gradient_image(
-                section['filename'],
+        specs = {
+            f'sections/{section["filename"]}': self.gradient_image_spec(
                 section['title'],
                 section['subtitle'],
                 section['bg_gradient'],
                 section['icon']
             )
-            filepath = sections_dir / section['filename']
-            img.save(filepath, 'PNG')
-            self.stdout.write(self.style.SUCCESS(f'✅ Created: {filepath}'))
+            for section in sections
+        }
+        self.render(specs, jobs=options['jobs'], force=options['force'])
 
         self.stdout.write(self.style.SUCCESS('\n✨ All section images generated successfully!'))
@@ -0,0 +1,23 @@
+"""
+Rebuild the full-text search index from scratch.
+Run: python manage.py rebuild_search_index
+"""
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the FTS5 search index for blogs, projects and services'
+
+    def handle(self, *args, **options):
+        if not search.is_available() and not search.create_table():
+            raise CommandError('Full-text search needs SQLite with the FTS5 extension.')
+
+        started = time.perf_counter()
+        count = search.rebuild([apps.get_model(label) for label in search.MODELS])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} documents in {elapsed * 1000:.0f} ms.'))
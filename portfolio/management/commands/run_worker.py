@@ -0,0 +1,113 @@
+"""
+Run queued background jobs (see portfolio/jobs.py and portfolio/tasks.py).
+Run: python manage.py run_worker [--threads N] [--processes N] [--burst]
+
+Each process runs ``--threads`` worker threads. Threads suit the I/O-bound
+tasks (mail, sitemap); use ``--processes`` to spread CPU-bound image resizing
+over several cores. Every minute the first process also re-queues jobs left
+``running`` by a worker that died and deletes old finished jobs.
+
+SIGTERM/SIGINT stop the worker gracefully: running jobs finish and nothing new
+is claimed. Keep one running next to the web server, e.g. under systemd.
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, connections
+
+from portfolio import jobs
+
+HOUSEKEEPING_INTERVAL = 60
+
+
+def housekeeping():
+    try:
+        jobs.requeue_stale()
+        jobs.purge()
+    except DatabaseError:
+        pass
+    finally:
+        connection.close()
+
+
+def run_threads(threads, poll_interval, burst, keep_house):
+    """Run ``threads`` workers in this process until stopped; return jobs run."""
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: stop.set())
+
+    prefix = f'{socket.gethostname()}:{os.getpid()}'
+    counts = []
+    workers = [
+        threading.Thread(
+            target=lambda i=i: counts.append(jobs.work(f'{prefix}:{i}', stop, poll_interval, burst)),
+            name=f'job-worker-{i}',
+        )
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+
+    last_housekeeping = 0
+    while any(worker.is_alive() for worker in workers):
+        if keep_house and time.monotonic() - last_housekeeping > HOUSEKEEPING_INTERVAL:
+            housekeeping()
+            last_housekeeping = time.monotonic()
+        stop.wait(1)
+        if stop.is_set():
+            break
+    for worker in workers:
+        worker.join()
+    return sum(counts)
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2,
+                            help='Worker threads per process (default: 2)')
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Worker processes (default: 1)')
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help='Seconds to wait when no job is due (default: 1)')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no job is due instead of waiting for more')
+
+    def handle(self, *args, **options):
+        threads, processes = max(1, options['threads']), max(1, options['processes'])
+        self.stdout.write(f'Worker started: {processes} process(es) x {threads} thread(s)')
+        started = time.perf_counter()
+
+        if processes == 1:
+            count = run_threads(threads, options['poll'], options['burst'], keep_house=True)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(f'Worker stopped: {count} jobs in {elapsed:.2f}s'))
+            return
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [
+            context.Process(target=run_threads, args=(threads, options['poll'], options['burst'], i == 0))
+            for i in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def stop_children(*args):
+            for child in children:
+                if child.is_alive():
+                    os.kill(child.pid, signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, stop_children)
+        signal.signal(signal.SIGINT, stop_children)
+        for child in children:
+            child.join()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Worker stopped after {elapsed:.2f}s'))
@@ -0,0 +1,160 @@
+"""
+Measure SQLite read latency while writes are in progress, with the old
+rollback-journal configuration and with the WAL profile from
+abid_portfolio/database.py.
+Run: python manage.py stress_sqlite [--seconds 5] [--readers 4] [--writers 1]
+
+Each mode gets a scratch database in a temporary directory (the site database
+is not touched) seeded with ``--rows`` rows shaped like blog posts. Readers run
+the kind of query a page does; writers insert batches in ``BEGIN IMMEDIATE``
+transactions, like the admin and the contact queue. In rollback-journal mode
+every commit locks readers out; in WAL mode reads should stay flat.
+"""
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from abid_portfolio.database import BUSY_TIMEOUT, PRAGMAS
+
+MODES = {
+    # Django's previous default: rollback journal, synchronous=FULL
+    'rollback': ('journal_mode=DELETE',),
+    'wal': PRAGMAS,
+}
+PAYLOAD = 'lorem ipsum dolor sit amet ' * 40
+
+
+def connect(path, pragmas):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+    for pragma in pragmas:
+        conn.execute(f'PRAGMA {pragma}')
+    return conn
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Compare read latency during writes: rollback journal vs WAL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5, help='Duration per mode (default: 5)')
+        parser.add_argument('--readers', type=int, default=4, help='Reader threads (default: 4)')
+        parser.add_argument('--writers', type=int, default=1, help='Writer threads (default: 1)')
+        parser.add_argument('--rows', type=int, default=20000, help='Rows to seed (default: 20000)')
+        parser.add_argument('--batch', type=int, default=200, help='Rows per write transaction (default: 200)')
+        parser.add_argument('--mode', choices=sorted(MODES), action='append',
+                            help='Only run this mode (repeatable)')
+
+    def handle(self, *args, **options):
+        results = {}
+        for mode in options['mode'] or ['rollback', 'wal']:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = str(Path(tmp) / 'stress.sqlite3')
+                self.seed(path, MODES[mode], options['rows'])
+                results[mode] = self.run(path, MODES[mode], options)
+            self.report(mode, results[mode])
+
+        if len(results) == 2:
+            before, after = results['rollback'], results['wal']
+            self.stdout.write(self.style.SUCCESS(
+                f'\nWAL: read p99 {before["p99"]:.1f} -> {after["p99"]:.1f} ms, '
+                f'max {before["max"]:.1f} -> {after["max"]:.1f} ms, '
+                f'reads/s {before["reads_per_s"]:.0f} -> {after["reads_per_s"]:.0f}, '
+                f'writes/s {before["writes_per_s"]:.1f} -> {after["writes_per_s"]:.1f}'
+            ))
+
+    def seed(self, path, pragmas, rows):
+        conn = connect(path, pragmas)
+        conn.execute('CREATE TABLE post (id INTEGER PRIMARY KEY, title TEXT, body TEXT, published REAL)')
+        conn.execute('CREATE INDEX post_published ON post (published)')
+        conn.execute('BEGIN')
+        conn.executemany(
+            'INSERT INTO post (title, body, published) VALUES (?, ?, ?)',
+            ((f'Post {i}', PAYLOAD, random.random()) for i in range(rows)),
+        )
+        conn.execute('COMMIT')
+        conn.close()
+
+    def run(self, path, pragmas, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        latencies, writes, errors = [], [0], [0]
+
+        def reader():
+            conn = connect(path, pragmas)
+            local = []
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    conn.execute(
+                        'SELECT id, title, substr(body, 1, 100) FROM post ORDER BY published DESC LIMIT 10'
+                    ).fetchall()
+                    conn.execute('SELECT count(*) FROM post').fetchone()
+                except sqlite3.OperationalError:
+                    with lock:
+                        errors[0] += 1
+                    continue
+                local.append((time.perf_counter() - started) * 1000)
+            conn.close()
+            with lock:
+                latencies.extend(local)
+
+        def writer():
+            conn = connect(path, pragmas)
+            while not stop.is_set():
+                try:
+                    conn.execute('BEGIN IMMEDIATE')
+                    conn.executemany(
+                        'INSERT INTO post (title, body, published) VALUES (?, ?, ?)',
+                        (('New post', PAYLOAD, random.random()) for _ in range(options['batch'])),
+                    )
+                    conn.execute('COMMIT')
+                except sqlite3.OperationalError:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                    with lock:
+                        errors[0] += 1
+                    continue
+                with lock:
+                    writes[0] += 1
+            conn.close()
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer) for _ in range(options['writers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            'reads': len(latencies),
+            'reads_per_s': len(latencies) / elapsed,
+            'writes_per_s': writes[0] / elapsed,
+            'errors': errors[0],
+            'p50': statistics.median(latencies) if latencies else 0.0,
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+            'max': max(latencies, default=0.0),
+        }
+
+    def report(self, mode, result):
+        self.stdout.write(
+            f'{mode:>8}: {result["reads"]} reads ({result["reads_per_s"]:.0f}/s), '
+            f'{result["writes_per_s"]:.1f} write txns/s, {result["errors"]} errors | read ms '
+            f'p50 {result["p50"]:.2f}  p95 {result["p95"]:.2f}  p99 {result["p99"]:.2f}  max {result["max"]:.2f}'
+        )
@@ -0,0 +1,243 @@
+"""
+Per-request timing: Server-Timing headers and Prometheus-style histograms.
+
+``TimingMiddleware`` measures every request routed to a ``portfolio:`` view:
+
+    db     queries run and their time, on every database alias
+           (through ``connection.execute_wrapper``)
+    tpl    template rendering (``TimedDjangoTemplates`` backend), which
+           includes the context processors and any queries run from templates
+    ctx    the ``site_profile`` context processor (``timed('ctx')``)
+    total  the whole request, middleware below this one included
+
+and sends them in a ``Server-Timing`` header. The numbers also go into
+``registry``, per route, exposed in Prometheus text format by the
+``metrics`` view (/metrics/). The registry lives in process memory: every
+worker process reports its own numbers, and the scraper sums them.
+
+The cost per request is a few ``perf_counter`` calls, one wrapper per
+database connection and a lock around a handful of additions.
+"""
+import bisect
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+
+# Upper bounds (seconds) of the request duration histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+current = ContextVar('portfolio_request_timings', default=None)
+
+
+class Timings:
+    """Durations (seconds) collected while one request is served."""
+
+    __slots__ = ('queries', 'db', 'tpl', 'ctx')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = self.tpl = self.ctx = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+
+def timed(phase):
+    """Add the duration of the decorated function to the current request's ``phase``."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = current.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                setattr(timings, phase, getattr(timings, phase) + time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+        self.origin = template.origin
+
+    def render(self, context=None, request=None):
+        return timed('tpl')(self.template.render)(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with rendering time added to ``tpl``."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class RouteStats:
+    __slots__ = ('buckets', 'count', 'sum', 'queries', 'db', 'tpl', 'ctx', 'statuses')
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = self.queries = 0
+        self.sum = self.db = self.tpl = self.ctx = 0.0
+        self.statuses = {}
+
+
+class Registry:
+    """Request counts and latency histograms per (route, method)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, method, status, total, timings):
+        index = bisect.bisect_left(BUCKETS, total)
+        with self._lock:
+            stats = self._routes.get((route, method))
+            if stats is None:
+                stats = self._routes[(route, method)] = RouteStats()
+            if index < len(BUCKETS):
+                stats.buckets[index] += 1
+            stats.count += 1
+            stats.sum += total
+            stats.queries += timings.queries
+            stats.db += timings.db
+            stats.tpl += timings.tpl
+            stats.ctx += timings.ctx
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def exposition(self):
+        """The collected numbers in Prometheus text exposition format."""
+        with self._lock:
+            routes = sorted(
+                (key, (list(s.buckets), s.count, s.sum, s.queries, s.db, s.tpl, s.ctx, dict(s.statuses)))
+                for key, s in self._routes.items()
+            )
+        lines = [
+            '# HELP portfolio_request_duration_seconds Time to serve a request, by route.',
+            '# TYPE portfolio_request_duration_seconds histogram',
+        ]
+        for (route, method), (buckets, count, total, *_) in routes:
+            labels = f'route="{route}",method="{method}"'
+            cumulative = 0
+            for bound, hits in zip(BUCKETS, buckets):
+                cumulative += hits
+                lines.append(f'portfolio_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'portfolio_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'portfolio_request_duration_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'portfolio_request_duration_seconds_count{{{labels}}} {count}')
+
+        lines += [
+            '# HELP portfolio_requests_total Requests served, by route and status code.',
+            '# TYPE portfolio_requests_total counter',
+        ]
+        for (route, method), (*_, statuses) in routes:
+            for status, hits in sorted(statuses.items()):
+                lines.append(
+                    f'portfolio_requests_total{{route="{route}",method="{method}",status="{status}"}} {hits}'
+                )
+
+        for name, position, help_text in (
+            ('portfolio_db_queries_total', 3, 'Database queries run, by route.'),
+            ('portfolio_db_seconds_total', 4, 'Time spent in database queries, by route.'),
+            ('portfolio_template_seconds_total', 5, 'Time spent rendering templates, by route.'),
+            ('portfolio_context_processor_seconds_total', 6, 'Time spent in site_profile, by route.'),
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            for (route, method), values in routes:
+                value = values[position]
+                value = value if isinstance(value, int) else f'{value:.6f}'
+                lines.append(f'{name}{{route="{route}",method="{method}"}} {value}')
+        return lines
+
+
+registry = Registry()
+
+
+def server_timing(timings, total):
+    return ', '.join((
+        f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries"',
+        f'tpl;dur={timings.tpl * 1000:.1f}',
+        f'ctx;dur={timings.ctx * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ))
+
+
+def install(timings):
+    """Route the queries of this thread's connections through ``timings``."""
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(timings))
+    return stack
+
+
+class TimingMiddleware:
+    """Time ``portfolio:`` views; see the module docstring.
+
+    Under ASGI the query wrapper is installed in the request's worker thread,
+    which runs the async ORM's queries.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = getattr(settings, 'SERVER_TIMING', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = Timings()
+        token = current.set(timings)
+        started = time.perf_counter()
+        try:
+            with install(timings):
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.record(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings = Timings()
+        token = current.set(timings)
+        started = time.perf_counter()
+        try:
+            stack = await sync_to_async(install)(timings)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            current.reset(token)
+        return self.record(request, response, timings, time.perf_counter() - started)
+
+    def record(self, request, response, timings, total):
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.app_name == 'portfolio':
+            registry.observe(match.view_name, request.method, response.status_code, total, timings)
+            if self.header:
+                response.headers['Server-Timing'] = server_timing(timings, total)
+        return response
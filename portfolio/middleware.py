@@ -0,0 +1,155 @@
+"""
+Response middleware for the portfolio site.
+"""
+import hashlib
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from .assets import minify_css
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_LENGTH = 200
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/xml', 'application/javascript')
+BROTLI_QUALITY = 11
+GZIP_RANDOM_BYTES = 100
+
+# Blocks whose whitespace is significant, or that are not HTML
+PRESERVE_RE = re.compile(r'<(pre|textarea|script)\b.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+STYLE_RE = re.compile(r'(<style\b[^>]*>)(.*?)(</style\s*>)', re.DOTALL | re.IGNORECASE)
+# Conditional comments (<!--[if ...]>) are kept
+COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+ENCODING_RE = re.compile(r'\s*([a-z0-9*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?', re.IGNORECASE)
+
+
+def _minify_markup(html):
+    html = COMMENT_RE.sub('', html)
+    html = STYLE_RE.sub(lambda m: m.group(1) + minify_css(m.group(2)) + m.group(3), html)
+    # Whitespace between inline elements is significant, so runs are reduced
+    # to a single newline or space rather than removed.
+    html = re.sub(r'\s*\n\s*', '\n', html)
+    return re.sub(r'[ \t]{2,}', ' ', html)
+
+
+def minify_html(html):
+    """Strip comments and indentation; leave pre, textarea and script alone."""
+    parts = []
+    position = 0
+    for match in PRESERVE_RE.finditer(html):
+        parts.append(_minify_markup(html[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(_minify_markup(html[position:]))
+    return ''.join(parts).strip()
+
+
+def accepted_encoding(accept_encoding):
+    """Pick ``br`` or ``gzip`` from an Accept-Encoding header, or None."""
+    accepted = {}
+    for item in accept_encoding.split(','):
+        match = ENCODING_RE.match(item)
+        if match:
+            try:
+                accepted[match.group(1).lower()] = float(match.group(2) or 1)
+            except ValueError:
+                continue
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    candidates = [name for name in candidates if accepted.get(name, accepted.get('*', 0)) > 0]
+    return max(candidates, key=lambda name: accepted.get(name, 0), default=None)
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return compress_string(content, max_random_bytes=GZIP_RANDOM_BYTES)
+
+
+class CompressionMiddleware:
+    """Minify HTML and compress responses with Brotli or gzip.
+
+    Responses with an ETag (the ``conditional_on`` views) are public and
+    deterministic, so their minified, compressed bytes are cached under the
+    URL, ETag and encoding, and a popular page is compressed once per change.
+    Other responses, such as forms carrying CSRF tokens, are minified and
+    gzipped per request with the same random padding as Django's
+    GZipMiddleware (BREACH mitigation).
+
+    Place it directly after SecurityMiddleware. Under ASGI, minifying and
+    compressing run in a worker thread rather than on the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.timeout = getattr(settings, 'COMPRESSION_CACHE_TIMEOUT', 60 * 60 * 24)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return await sync_to_async(self.process, thread_sensitive=False)(request, response)
+
+    def process(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if (
+            response.streaming
+            or response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+            or len(response.content) < MIN_LENGTH
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = accepted_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        etag = response.get('ETag')
+
+        if etag:
+            key = self.cache_key(request, etag, encoding)
+            entry = cache.get(key)
+            if entry is None:
+                entry = self.encode(response, content_type, encoding)
+                cache.set(key, entry, self.timeout)
+        else:
+            entry = self.encode(response, content_type, 'gzip' if encoding == 'br' else encoding)
+        content, encoding = entry
+
+        response.content = content
+        response.headers['Content-Length'] = str(len(content))
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+            if etag and etag.startswith('"'):
+                # The compressed body differs from the identity one (RFC 9110 8.8.1)
+                response.headers['ETag'] = 'W/' + etag
+        return response
+
+    def cache_key(self, request, etag, encoding):
+        # The URL is part of the key: paginated pages share their ETag.
+        url = request.build_absolute_uri()
+        digest = hashlib.md5(f'{url}|{etag}'.encode('utf-8')).hexdigest()
+        return f'portfolio:compressed:{encoding or "identity"}:{digest}'
+
+    def encode(self, response, content_type, encoding):
+        """Return ``(body, content encoding or None)``."""
+        content = response.content
+        if content_type.startswith('text/html'):
+            content = minify_html(content.decode(response.charset)).encode(response.charset)
+        if encoding:
+            compressed = compress(content, encoding)
+            if len(compressed) < len(content):
+                return compressed, encoding
+        return content, None
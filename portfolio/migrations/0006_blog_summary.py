@@ -0,0 +1,57 @@
+# Generated migration adding precomputed summary fields to Blog.
+# Existing posts are filled in here, as Blog.update_derived_fields computes them.
+
+import math
+from html import unescape
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from portfolio.content import compile_content
+
+SUMMARY_WORDS = 20
+WORDS_PER_MINUTE = 200
+BATCH_SIZE = 200
+
+
+def summarize_posts(apps, schema_editor):
+    Blog = apps.get_model('portfolio', 'Blog')
+    posts = Blog.objects.using(schema_editor.connection.alias).only('id', 'excerpt', 'content')
+    batch = []
+    for post in posts.iterator(chunk_size=BATCH_SIZE):
+        text = ' '.join(unescape(strip_tags(compile_content(post.content)[0])).split())
+        post.word_count = len(text.split())
+        post.reading_time = max(1, math.ceil(post.word_count / WORDS_PER_MINUTE)) if post.word_count else 0
+        post.summary = Truncator(post.excerpt.strip() or text).words(SUMMARY_WORDS)
+        batch.append(post)
+    # bulk_update leaves updated_at alone
+    Blog.objects.using(schema_editor.connection.alias).bulk_update(
+        batch, ['summary', 'word_count', 'reading_time'], batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0005_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='summary',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Minutes'),
+        ),
+        migrations.RunPython(summarize_posts, migrations.RunPython.noop),
+    ]
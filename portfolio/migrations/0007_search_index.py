@@ -0,0 +1,48 @@
+# Creates the FTS5 full-text search table (SQLite only) and fills it from the
+# existing blogs, projects and services. See portfolio/search.py.
+
+from django.db import migrations
+from django.urls import reverse
+
+from portfolio import search
+
+
+def document(instance):
+    """search.document_for for the models as of this migration.
+
+    Blog.content_html only exists from 0010, so blogs are indexed from
+    their content column here.
+    """
+    kind = search.MODELS[instance._meta.label_lower]
+    if kind == 'blog':
+        url = reverse('portfolio:blog_detail', args=[instance.slug])
+        body = f'{search._plain(instance.excerpt)} {search._plain(instance.content)}'
+    elif kind == 'project':
+        url = reverse('portfolio:project_detail', args=[instance.pk])
+        body = f'{search._plain(instance.description)} {instance.technologies.replace(",", " ")}'
+    else:
+        url = reverse('portfolio:services')
+        body = search._plain(instance.description)
+    return kind, url, instance.title, body.strip()
+
+
+def create_index(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    if search.create_table(alias):
+        models = [apps.get_model(label) for label in search.MODELS]
+        search.rebuild(models, using=alias, document=document)
+
+
+def drop_index(apps, schema_editor):
+    search.drop_table(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0006_blog_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
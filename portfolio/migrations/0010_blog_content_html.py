@@ -0,0 +1,48 @@
+# Generated migration adding the compiled body to Blog (see portfolio/content.py).
+# Existing posts are compiled here; compile_content only needs the source text,
+# so it does not depend on the model as of this migration.
+
+from django.db import migrations, models
+
+from portfolio.content import compile_content
+
+BATCH_SIZE = 200
+
+
+def compile_posts(apps, schema_editor):
+    Blog = apps.get_model('portfolio', 'Blog')
+    posts = Blog.objects.using(schema_editor.connection.alias).only('id', 'content')
+    batch = []
+    for post in posts.iterator(chunk_size=BATCH_SIZE):
+        post.content_html, post.toc_html = compile_content(post.content)
+        batch.append(post)
+    # bulk_update leaves updated_at alone
+    Blog.objects.using(schema_editor.connection.alias).bulk_update(
+        batch, ['content_html', 'toc_html'], batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0009_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blog',
+            name='content',
+            field=models.TextField(help_text='Markdown; HTML is allowed'),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='toc_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(compile_posts, migrations.RunPython.noop),
+    ]
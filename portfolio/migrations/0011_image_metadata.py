@@ -0,0 +1,88 @@
+# Generated migration adding stored image dimensions and placeholders.
+# Existing rows are filled in here from their image files.
+
+from django.db import migrations, models
+
+from portfolio.images import read_image_metadata
+
+# images.IMAGE_FIELDS as of this migration
+IMAGE_FIELDS = {
+    'portfolio.project': ('image',),
+    'portfolio.blog': ('image',),
+    'portfolio.profile': ('profile_image',),
+}
+BATCH_SIZE = 200
+
+
+def fill_metadata(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    for label, field_names in IMAGE_FIELDS.items():
+        model = apps.get_model(label)
+        columns = [f'{name}_{suffix}' for name in field_names for suffix in ('width', 'height', 'placeholder')]
+        batch = []
+        for row in model.objects.using(alias).only('id', *field_names).iterator(chunk_size=BATCH_SIZE):
+            for name in field_names:
+                file = getattr(row, name)
+                if file:
+                    values = read_image_metadata(file)
+                    for suffix, value in zip(('width', 'height', 'placeholder'), values):
+                        setattr(row, f'{name}_{suffix}', value)
+            batch.append(row)
+        # bulk_update leaves updated_at alone
+        model.objects.using(alias).bulk_update(batch, columns, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0010_blog_content_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='profile_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='profile_image_placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='profile_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_metadata, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,31 @@
+import math
+from html import unescape
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from .content import compile_content
+from .images import update_image_metadata
+
+SUMMARY_WORDS = 20
+WORDS_PER_MINUTE = 200
+
+
+class ImageMetadataMixin:
+    """Store the dimensions and placeholder of new uploads on save (see images.py)."""
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        columns = update_image_metadata(self)
+        if update_fields is not None and columns:
+            kwargs['update_fields'] = set(update_fields) | set(columns)
+        super().save(*args, **kwargs)
 
-class Profile(models.Model):
+
+class Profile(ImageMetadataMixin, models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField()
     phone = models.CharField(max_length=20)
@@ -15,6 +39,9 @@ class Profile(models.Model):
     religion = models.CharField(max_length=50, blank=True)
     height = models.CharField(max_length=50, blank=True)
     profile_image = models.ImageField(upload_to='profile/', blank=True, null=True)
+    profile_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_image_placeholder = models.TextField(blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -26,6 +53,7 @@ class SkillCategory(models.Model):
     description = models.TextField(blank=True)
     icon = models.CharField(max_length=50, blank=True)  # For icon class names
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -38,6 +66,7 @@ class Skill(models.Model):
     name = models.CharField(max_length=100)
     proficiency = models.IntegerField(default=80)  # Percentage out of 100
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} ({self.category.name})"
@@ -48,52 +77,97 @@ class Education(models.Model):
     year = models.CharField(max_length=50)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.degree} - {self.institution}"
 
-class Project(models.Model):
+    class Meta:
+        indexes = [models.Index(fields=['-year'], name='portfolio_education_year_idx')]
+
+class Project(ImageMetadataMixin, models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     technologies = models.CharField(max_length=500)  # Comma-separated
     github_url = models.URLField(blank=True)
     live_url = models.URLField(blank=True)
     image = models.ImageField(upload_to='projects/', blank=True, null=True)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)
     featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ['-featured', '-created_at']
+        indexes = [
+            # The ordering plus the keyset tiebreaker; also serves featured=True
+            models.Index(fields=['-featured', '-created_at', '-id'], name='portfolio_project_order_idx'),
+        ]
 
 class Service(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     icon = models.CharField(max_length=50, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
 
 
-class Blog(models.Model):
+class Blog(ImageMetadataMixin, models.Model):
     title = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blog_posts', null=True, blank=True)
     excerpt = models.TextField(blank=True)
-    content = models.TextField()
+    content = models.TextField(help_text='Markdown; HTML is allowed')
     published_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     image = models.ImageField(upload_to='blog/', blank=True, null=True)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)
+    # Derived from excerpt/content on save, so listings never read the body
+    summary = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False, help_text='Minutes')
+    # content compiled on save (see content.py); the detail page emits these as they are
+    content_html = models.TextField(blank=True, editable=False)
+    toc_html = models.TextField(blank=True, editable=False)
 
     def __str__(self):
         return self.title
 
+    def update_derived_fields(self):
+        """Compile the content and recompute summary, word_count and reading_time"""
+        self.content_html, self.toc_html = compile_content(self.content)
+        text = ' '.join(unescape(strip_tags(self.content_html)).split())
+        self.word_count = len(text.split())
+        self.reading_time = max(1, math.ceil(self.word_count / WORDS_PER_MINUTE)) if self.word_count else 0
+        self.summary = Truncator(self.excerpt.strip() or text).words(SUMMARY_WORDS)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'content', 'excerpt'} & set(update_fields):
+            self.update_derived_fields()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {
+                    'summary', 'word_count', 'reading_time', 'content_html', 'toc_html',
+                }
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-published_date', '-created_at']
+        indexes = [
+            # The ordering plus the keyset tiebreaker (see views.main.BLOG_ORDERING)
+            models.Index(fields=['-published_date', '-created_at', '-id'], name='portfolio_blog_order_idx'),
+        ]
 
 class Contact(models.Model):
     name = models.CharField(max_length=100)
@@ -108,3 +182,41 @@ class Contact(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['-created_at'], name='portfolio_contact_created_idx')]
+
+
+class Job(models.Model):
+    """A unit of background work, run by ``manage.py run_worker`` (see jobs.py)."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0, help_text='Higher runs first')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
+
+    class Meta:
+        ordering = ['-priority', 'run_at', 'id']
+        indexes = [
+            # The worker's "next due job" query
+            models.Index(fields=['status', '-priority', 'run_at', 'id'], name='portfolio_job_due_idx'),
+        ]
@@ -0,0 +1,116 @@
+"""
+N+1 query detection.
+
+``normalize_sql`` reduces a statement to its shape (literals and parameter
+lists replaced by ``?``), so the same query issued once per row of a listing
+shows up as one statement repeated N times. ``repeated_queries`` finds those.
+
+``NPlusOneMiddleware`` logs them to the ``portfolio.nplusone`` logger while a
+request is served. It is only active when ``NPLUSONE_DETECTION`` is true
+(default: ``DEBUG``). The query-budget tests in portfolio/tests.py use the
+same helpers.
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('portfolio.nplusone')
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN \((?:\?(?:, )?)+\)', re.IGNORECASE)
+PLACEHOLDER_RE = re.compile(r'%s')
+
+# A statement run at least this many times in one request is reported
+DEFAULT_THRESHOLD = 3
+
+
+def normalize_sql(sql):
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = PLACEHOLDER_RE.sub('?', sql)
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+def repeated_queries(statements, threshold=DEFAULT_THRESHOLD):
+    """``[(normalized sql, count)]`` run ``threshold`` times or more, most first."""
+    counts = Counter(normalize_sql(sql) for sql in statements)
+    return [(sql, count) for sql, count in counts.most_common() if count >= threshold]
+
+
+def describe(repeated, width=300):
+    return '\n'.join(f'  {count}x {sql[:width]}' for sql, count in repeated)
+
+
+class QueryRecorder:
+    """Record the SQL run on every database alias while active.
+
+    Database connections belong to a thread. In async code, ``async with``
+    installs the recorder in the request's worker thread, where the async ORM
+    and ``sync_to_async`` run the queries.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    async def __aenter__(self):
+        return await sync_to_async(self.__enter__)()
+
+    async def __aexit__(self, *exc_info):
+        await sync_to_async(self.__exit__)(*exc_info)
+
+
+class NPlusOneMiddleware:
+    """Log statements repeated ``NPLUSONE_THRESHOLD`` times in one request."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'NPLUSONE_DETECTION', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'NPLUSONE_THRESHOLD', DEFAULT_THRESHOLD)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        self.report(request, recorder)
+        return response
+
+    async def __acall__(self, request):
+        async with QueryRecorder() as recorder:
+            response = await self.get_response(request)
+        self.report(request, recorder)
+        return response
+
+    def report(self, request, recorder):
+        repeated = repeated_queries(recorder.statements, self.threshold)
+        if repeated:
+            logger.warning(
+                'Possible N+1 on %s %s (%d queries):\n%s',
+                request.method, request.path, len(recorder.statements), describe(repeated),
+            )
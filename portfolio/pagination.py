@@ -0,0 +1,133 @@
+"""
+Keyset (seek) pagination.
+
+Instead of ``OFFSET``, each page is fetched with a ``WHERE`` clause that
+continues after the last row of the previous page, so page N costs the same
+as page 1. Cursors are opaque URL-safe strings encoding that row's sort key.
+
+NULLs sort as the smallest value: last in descending order, first in
+ascending order.
+"""
+import base64
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Paginate ``queryset`` by ``ordering``, which must end in a unique field.
+
+    Usage::
+
+        paginator = KeysetPaginator(Blog.objects.all(), ('-published_date', '-created_at', '-id'), 10)
+        page = paginator.page(request.GET.get('cursor'))
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self.fields = {name: queryset.model._meta.get_field(name) for name, _ in self.keys}
+
+    def page(self, cursor=None):
+        if not cursor:
+            rows = list(self._ordered(self.queryset)[:self.per_page + 1])
+            return self._page(rows, has_more=len(rows) > self.per_page, has_before=False)
+
+        values, backwards = self.decode(cursor)
+        if backwards:
+            queryset = self.queryset.filter(self._seek(values, forwards=False))
+            rows = list(self._ordered(queryset, reverse=True)[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return self._page(rows, has_more=True, has_before=has_more)
+
+        queryset = self.queryset.filter(self._seek(values, forwards=True))
+        rows = list(self._ordered(queryset)[:self.per_page + 1])
+        return self._page(rows, has_more=len(rows) > self.per_page, has_before=True)
+
+    def _page(self, rows, has_more, has_before):
+        rows = rows[:self.per_page]
+        next_cursor = self.encode(rows[-1], backwards=False) if rows and has_more else None
+        previous_cursor = self.encode(rows[0], backwards=True) if rows and has_before else None
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+    def _ordered(self, queryset, reverse=False):
+        order_by = []
+        for name, descending in self.keys:
+            if descending != reverse:
+                order_by.append(F(name).desc(nulls_last=True))
+            else:
+                order_by.append(F(name).asc(nulls_first=True))
+        return queryset.order_by(*order_by)
+
+    def _seek(self, values, forwards):
+        """Rows strictly after (``forwards``) or before the key ``values``."""
+        clauses = []
+        for i, ((name, descending), value) in enumerate(zip(self.keys, values)):
+            equal = [self._equal(n, v) for (n, _), v in zip(self.keys[:i], values[:i])]
+            smaller = descending == forwards
+            clauses.append(reduce(and_, equal + [self._beyond(name, value, smaller)]))
+        return reduce(or_, clauses)
+
+    def _equal(self, name, value):
+        return Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+
+    def _beyond(self, name, value, smaller):
+        if smaller:
+            if value is None:
+                return Q(pk__in=[])
+            if self.fields[name].null:
+                return Q(**{f'{name}__lt': value}) | Q(**{f'{name}__isnull': True})
+            return Q(**{f'{name}__lt': value})
+        if value is None:
+            return Q(**{f'{name}__isnull': False})
+        return Q(**{f'{name}__gt': value})
+
+    def encode(self, obj, backwards):
+        values = [self.fields[name].value_to_string(obj) or None for name, _ in self.keys]
+        payload = json.dumps([values, int(backwards)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw, backwards = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if len(raw) != len(self.keys):
+                raise InvalidCursor(cursor)
+            values = [
+                None if value is None else self.fields[name].to_python(value)
+                for (name, _), value in zip(self.keys, raw)
+            ]
+        except (ValueError, TypeError, ValidationError) as e:
+            raise InvalidCursor(cursor) from e
+        return values, bool(backwards)
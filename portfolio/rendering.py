@@ -0,0 +1,230 @@
+"""
+Shared image rendering toolkit for the image-generation management commands.
+
+Gradients are built from a single 256-step ramp that Pillow colourises and
+stretches in C, instead of one ``draw.line`` call per column. Fonts and text
+measurements are memoised, so a batch of images loads each font size once.
+
+Every card is described by a size, a background and a list of ``Text`` lines::
+
+    img = render_card((1200, 600), ((30, 60, 120), (80, 130, 200)), [
+        Text('🚀', 120, x=150, y=180),
+        Text('AI & Data Science', 80, x=400, y=150),
+        Text('Building Intelligent Solutions', 40, x=400, y=280),
+    ])
+
+Lines without ``x`` are centred horizontally; lines without ``y`` are stacked
+and the stack is centred vertically.
+
+``render_batch`` renders many such cards to files in a process pool and keeps
+a manifest of spec hashes, so cards whose spec did not change are skipped.
+The manifest lives at ``RENDER_MANIFEST``, outside the public MEDIA_ROOT.
+"""
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from PIL import Image, ImageColor, ImageDraw, ImageFont, ImageOps
+
+FONT_CANDIDATES = ('arial.ttf', 'DejaVuSans.ttf')
+MANIFEST_NAME = '.render-manifest.json'
+
+# Bump when rendering changes in a way the card specs do not capture.
+RENDER_VERSION = 1
+
+
+class Text(NamedTuple):
+    text: str
+    size: int
+    fill: object = 'white'
+    x: Optional[int] = None
+    y: Optional[int] = None
+
+
+@lru_cache(maxsize=None)
+def font_name():
+    """Name of the first usable font: ``RENDER_FONT``, then the fallbacks."""
+    candidates = (getattr(settings, 'RENDER_FONT', None),) + FONT_CANDIDATES
+    for name in filter(None, candidates):
+        try:
+            ImageFont.truetype(name, 10)
+        except OSError:
+            continue
+        return name
+    return None
+
+
+@lru_cache(maxsize=None)
+def load_font(size, name=None):
+    """Return font ``name`` (default: ``font_name()``) at ``size``, loaded once."""
+    name = name or font_name()
+    if name is None:
+        return ImageFont.load_default(size)
+    return ImageFont.truetype(name, size)
+
+
+@lru_cache(maxsize=4096)
+def text_bbox(text, size, font=None):
+    """Bounding box of ``text`` at ``size`` relative to its drawing origin."""
+    return load_font(size, font).getbbox(text)
+
+
+def text_size(text, size, font=None):
+    left, top, right, bottom = text_bbox(text, size, font)
+    return right - left, bottom - top
+
+
+@lru_cache(maxsize=1)
+def _ramp():
+    # 256-step horizontal ramp from black to white, one pixel high.
+    return Image.linear_gradient('L').rotate(90, expand=True).crop((0, 0, 256, 1))
+
+
+def gradient(size, start, end):
+    """Horizontal linear gradient from ``start`` to ``end`` covering ``size``."""
+    strip = ImageOps.colorize(_ramp(), _rgb(start), _rgb(end)).resize((size[0], 1), Image.BILINEAR)
+    return strip.resize(size, Image.NEAREST)
+
+
+def _rgb(color):
+    return ImageColor.getrgb(color) if isinstance(color, str) else tuple(color)
+
+
+def darken(img, alpha, box=None):
+    """Blend black over ``box`` (the whole image by default) at ``alpha``/255."""
+    box = box or (0, 0) + img.size
+    region = (box[2] - box[0], box[3] - box[1])
+    img.paste((0, 0, 0), box, Image.new('L', region, alpha))
+    return img
+
+
+def render_card(size, background, lines, overlay=0, panel=None, line_spacing=20, font=None):
+    """Render a title/subtitle/icon card.
+
+    ``background`` is a colour or a ``(start, end)`` gradient pair. ``overlay``
+    darkens the whole card and ``panel`` is an ``(alpha, box)`` pair that
+    darkens one region, both for text contrast. ``font`` defaults to
+    ``font_name()``.
+    """
+    if isinstance(background, tuple) and len(background) == 2 and not isinstance(background[0], int):
+        img = gradient(size, *background)
+    else:
+        img = Image.new('RGB', size, _rgb(background))
+    if overlay:
+        darken(img, overlay)
+    if panel:
+        darken(img, panel[0], panel[1])
+
+    width, height = size
+    stacked = [line for line in lines if line.y is None]
+    stack_height = sum(text_size(line.text, line.size, font)[1] for line in stacked)
+    stack_height += line_spacing * max(0, len(stacked) - 1)
+    next_y = (height - stack_height) // 2
+
+    draw = ImageDraw.Draw(img)
+    for line in lines:
+        left, top, right, bottom = text_bbox(line.text, line.size, font)
+        x = line.x if line.x is not None else (width - (right - left)) // 2 - left
+        if line.y is not None:
+            y = line.y
+        else:
+            y = next_y - top
+            next_y += (bottom - top) + line_spacing
+        draw.text((x, y), line.text, fill=line.fill, font=load_font(line.size, font))
+    return img
+
+
+def to_png_bytes(img):
+    """Encode ``img`` as an optimised PNG in a rewound ``BytesIO``."""
+    bio = BytesIO()
+    img.save(bio, format='PNG', optimize=True)
+    bio.seek(0)
+    return bio
+
+
+def card_spec(size, background, lines, **options):
+    """Describe a ``render_card`` call as plain data for ``render_batch``.
+
+    The resolved font is part of the spec, so changing fonts re-renders.
+    """
+    options.setdefault('font', font_name())
+    return dict(size=size, background=background, lines=[Text(*line) for line in lines], **options)
+
+
+def spec_hash(spec):
+    payload = json.dumps([RENDER_VERSION, spec], sort_keys=True, default=list)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_to_file(path, spec):
+    """Render ``spec`` to a PNG at ``path``; return the seconds it took."""
+    started = time.perf_counter()
+    spec = dict(spec, lines=[Text(*line) for line in spec['lines']])
+    render_card(**spec).save(path, 'PNG')
+    return time.perf_counter() - started
+
+
+def manifest_path():
+    return Path(getattr(settings, 'RENDER_MANIFEST', settings.BASE_DIR / MANIFEST_NAME))
+
+
+def render_batch(specs, root, jobs=1, force=False, manifest_file=None):
+    """Render ``{relative path: spec}`` under ``root``.
+
+    Cards whose spec hash matches the ``manifest_file`` (default:
+    ``manifest_path()``) and whose file exists are skipped unless ``force``
+    is set. Returns ``{path: seconds}`` with ``None`` for skipped cards and
+    the exception for cards that failed; the manifest is written either way.
+    """
+    root = Path(root)
+    manifest_file = Path(manifest_file) if manifest_file else manifest_path()
+    try:
+        manifest = json.loads(manifest_file.read_text())
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+
+    hashes = {name: spec_hash(spec) for name, spec in specs.items()}
+    results = {}
+    pending = {}
+    for name, spec in specs.items():
+        path = root / name
+        if not force and manifest.get(name) == hashes[name] and path.exists():
+            results[name] = None
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pending[name] = (str(path), spec)
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+            futures = {name: executor.submit(render_to_file, *args) for name, args in pending.items()}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = e
+    else:
+        for name, args in pending.items():
+            try:
+                results[name] = render_to_file(*args)
+            except Exception as e:
+                results[name] = e
+
+    for name in pending:
+        if isinstance(results[name], Exception):
+            # Rendered again on the next run, even if the spec is unchanged
+            manifest.pop(name, None)
+        else:
+            manifest[name] = hashes[name]
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    manifest_file.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    legacy = root / MANIFEST_NAME
+    if legacy != manifest_file:
+        # Earlier releases kept it in root, where MEDIA_URL served it
+        legacy.unlink(missing_ok=True)
+    return {name: results[name] for name in specs}
@@ -0,0 +1,30 @@
+from django.db import connections
+
+READ_ALIAS = 'replica'
+WRITE_ALIAS = 'default'
+
+
+class ReadWriteRouter:
+    """Send reads to the ``replica`` alias and writes to ``default``.
+
+    Both are connections to the same SQLite file (see
+    abid_portfolio/database.py). Inside a transaction on ``default`` reads stay
+    there too, so code that reads back what it just wrote sees it.
+    """
+
+    def _read_alias(self):
+        if READ_ALIAS not in connections.settings or connections[WRITE_ALIAS].in_atomic_block:
+            return WRITE_ALIAS
+        return READ_ALIAS
+
+    def db_for_read(self, model, **hints):
+        return self._read_alias()
+
+    def db_for_write(self, model, **hints):
+        return WRITE_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == WRITE_ALIAS
@@ -0,0 +1,48 @@
+"""
+A deterministic data set for the query-budget tests and ``manage.py bench``.
+
+Nothing is random: the same ``seed()`` calls on an empty database always give
+the same rows, primary keys and slugs, so measurements can be compared from
+one run to the next.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+
+from .models import Blog, Contact, Education, Profile, Project, Service, Skill, SkillCategory
+
+PARAGRAPH = (
+    '<p>Python makes it easy to go from a notebook to a web service. This post '
+    'walks through the data model, the Django views and the queries behind them, '
+    'with notes on caching and deployment.</p>\n'
+)
+BLOG_PARAGRAPHS = 8
+
+
+def seed(batch=0, size=4):
+    """Create ``size`` rows of every kind; call again with a new ``batch`` for more."""
+    if batch == 0:
+        Profile.objects.create(
+            name='Test Person', email='person@example.com', phone='123', address='Lahore', objective='Testing',
+        )
+    authors = [
+        User.objects.create_user(f'author{batch}-{i}', first_name='Author', last_name=str(i))
+        for i in range(2)
+    ]
+    for i in range(size):
+        n = f'{batch}-{i}'
+        category = SkillCategory.objects.create(name=f'Category {n}', icon='fas fa-code')
+        for j in range(3):
+            Skill.objects.create(category=category, name=f'Skill {n}-{j}', proficiency=80)
+        Education.objects.create(degree=f'Degree {n}', institution='University', year=str(2000 + i))
+        Project.objects.create(
+            title=f'Python project {n}', description='A project', technologies='Python, Django',
+            featured=i % 2 == 0,
+        )
+        Service.objects.create(title=f'Python service {n}', description='A service', icon='fas fa-cog')
+        Blog.objects.create(
+            title=f'Python post {n}', slug=f'python-post-{n}', author=authors[i % 2],
+            excerpt='An excerpt', content=PARAGRAPH * BLOG_PARAGRAPHS,
+            published_date=date(2024, 1, 1) + timedelta(days=batch * size + i),
+        )
+        Contact.objects.create(name=f'Visitor {n}', email='visitor@example.com', subject='Hi', message='Hello')
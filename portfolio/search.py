@@ -0,0 +1,217 @@
+"""
+Full-text search over blogs, projects and services, backed by an SQLite FTS5
+virtual table.
+
+Each indexed object is one row whose rowid encodes its kind and primary key
+(``pk * 4 + KINDS[kind]``), so re-indexing or removing an object is a rowid
+lookup. Rows are kept in sync from ``post_save``/``post_delete`` signals rather
+than SQL triggers, because the indexed text is the HTML-stripped body, not
+the raw column.
+
+Results are ranked with ``bm25()``, weighting title matches above body
+matches, and carry highlighted title and body snippets. On other database
+backends, or SQLite builds without FTS5, searches return no results.
+
+Without an explicit ``using``, searches go to the database router's read
+alias and index updates to its write alias, like queries on the models.
+"""
+import re
+from html import unescape
+from typing import NamedTuple
+from weakref import WeakKeyDictionary
+
+from django.apps import apps
+from django.db import OperationalError, connections, router
+from django.urls import reverse
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+TABLE = 'portfolio_search'
+
+CREATE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5('
+    "kind UNINDEXED, url UNINDEXED, title, body, "
+    "tokenize='porter unicode61 remove_diacritics 2')"
+)
+
+KINDS = {'blog': 1, 'project': 2, 'service': 3}
+MODELS = {'portfolio.blog': 'blog', 'portfolio.project': 'project', 'portfolio.service': 'service'}
+
+# bm25() weights for the kind, url, title and body columns
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+SNIPPET_TOKENS = 24
+
+# Highlight markers that cannot occur in indexed text; swapped for <mark>
+# after the snippet has been HTML-escaped.
+_OPEN, _CLOSE = '\x02', '\x03'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class SearchResult(NamedTuple):
+    kind: str
+    object_id: int
+    url: str
+    title: str
+    snippet: str
+    rank: float
+
+
+def _plain(html):
+    return ' '.join(unescape(strip_tags(html or '')).split())
+
+
+def document_for(instance):
+    """Return ``(kind, url, title, body)`` for a searchable model instance."""
+    kind = MODELS[instance._meta.label_lower]
+    if kind == 'blog':
+        url = reverse('portfolio:blog_detail', args=[instance.slug])
+        body = f'{_plain(instance.excerpt)} {_plain(instance.content_html)}'
+    elif kind == 'project':
+        url = reverse('portfolio:project_detail', args=[instance.pk])
+        body = f'{_plain(instance.description)} {instance.technologies.replace(",", " ")}'
+    else:
+        url = reverse('portfolio:services')
+        body = _plain(instance.description)
+    return kind, url, instance.title, body.strip()
+
+
+def _rowid(kind, pk):
+    return pk * 4 + KINDS[kind]
+
+
+# is_available() per connection, so searches skip the sqlite_master lookup
+_available = WeakKeyDictionary()
+
+
+def _read_alias():
+    return router.db_for_read(apps.get_model('portfolio', 'Blog'))
+
+
+def _write_alias():
+    return router.db_for_write(apps.get_model('portfolio', 'Blog'))
+
+
+def is_available(using=None):
+    connection = connections[using or _read_alias()]
+    if connection not in _available:
+        if connection.vendor != 'sqlite':
+            _available[connection] = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABLE])
+                _available[connection] = cursor.fetchone() is not None
+    return _available[connection]
+
+
+def create_table(using=None):
+    """Create the FTS5 table; return False if this database cannot."""
+    connection = connections[using or _write_alias()]
+    if connection.vendor != 'sqlite':
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_SQL)
+    except OperationalError:
+        # SQLite compiled without FTS5
+        return False
+    # Every alias may be a connection to this file
+    _available.clear()
+    return True
+
+
+def drop_table(using=None):
+    connection = connections[using or _write_alias()]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+        _available.clear()
+
+
+def index(instance, using=None):
+    """Add or replace ``instance`` in the index."""
+    using = using or _write_alias()
+    if not is_available(using):
+        return
+    kind, url, title, body = document_for(instance)
+    with connections[using].cursor() as cursor:
+        rowid = _rowid(kind, instance.pk)
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [rowid])
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, kind, url, title, body) VALUES (%s, %s, %s, %s, %s)',
+            [rowid, kind, url, title, body],
+        )
+
+
+def unindex(instance, using=None):
+    using = using or _write_alias()
+    if not is_available(using):
+        return
+    kind = MODELS[instance._meta.label_lower]
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [_rowid(kind, instance.pk)])
+
+
+def rebuild(models, using=None, document=document_for):
+    """Empty the index and re-add every instance of ``models``; return the count.
+
+    ``document`` builds the row of an instance (see ``document_for``); migrations
+    pass their own, since historical models lack later fields.
+    """
+    using = using or _write_alias()
+    if not is_available(using):
+        return 0
+    rows = []
+    for model in models:
+        for instance in model._default_manager.using(using).iterator():
+            kind, url, title, body = document(instance)
+            rows.append((_rowid(kind, instance.pk), kind, url, title, body))
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        cursor.executemany(
+            f'INSERT INTO {TABLE} (rowid, kind, url, title, body) VALUES (%s, %s, %s, %s, %s)', rows,
+        )
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+    return len(rows)
+
+
+def build_query(text):
+    """Turn free text into a safe FTS5 query.
+
+    Every word is quoted, so FTS5 operators and column filters typed by the
+    user are matched literally, and the last word matches as a prefix.
+    """
+    tokens = TOKEN_RE.findall(text or '')
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _highlighted(text):
+    return mark_safe(escape(text).replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>'))
+
+
+def search(text, limit=20, using=None):
+    """Return up to ``limit`` ``SearchResult`` rows for ``text``, best first."""
+    query = build_query(text)
+    using = using or _read_alias()
+    if not query or not is_available(using):
+        return []
+    # Ordering by FTS5's hidden ``rank`` column (configured to weighted bm25)
+    # lets FTS5 sort internally, so snippets are only built for the rows
+    # returned rather than for every match.
+    sql = (
+        f"SELECT rowid, kind, url, highlight({TABLE}, 2, %s, %s), "
+        f"snippet({TABLE}, 3, %s, %s, '…', %s), rank "
+        f"FROM {TABLE} WHERE {TABLE} MATCH %s AND rank MATCH %s ORDER BY rank LIMIT %s"
+    )
+    ranking = f'bm25(0.0, 0.0, {TITLE_WEIGHT}, {BODY_WEIGHT})'
+    params = [_OPEN, _CLOSE, _OPEN, _CLOSE, SNIPPET_TOKENS, query, ranking, limit]
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [
+            SearchResult(kind, rowid // 4, url, _highlighted(title), _highlighted(snippet), rank)
+            for rowid, kind, url, title, snippet, rank in cursor.fetchall()
+        ]
@@ -0,0 +1,77 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import search, tasks
+from .cache import bump_content_version
+from .content import inline_images
+from .images import has_derivatives, image_names_for
+from .jobs import enqueue
+from .models import Profile, SkillCategory, Skill, Education, Project, Service, Blog
+
+# Models the public pages are rendered from. Any change to them invalidates
+# the page cache.
+CONTENT_MODELS = (Profile, SkillCategory, Skill, Education, Project, Service, Blog)
+
+# Seconds to wait before rebuilding the sitemap, so a burst of edits costs one rebuild
+SITEMAP_REBUILD_DELAY = 10
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def content_changed(sender, **kwargs):
+    """Bump the content version when portfolio content is edited."""
+    if sender in CONTENT_MODELS:
+        bump_content_version()
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Profile)
+def create_image_derivatives(sender, instance, raw=False, **kwargs):
+    """Queue responsive derivatives for newly uploaded images."""
+    if raw:
+        return
+    for name in image_names_for(instance):
+        if not has_derivatives(name):
+            enqueue(tasks.generate_image_derivatives, name=name, priority=10, unique=True)
+
+
+@receiver(post_save, sender=Blog)
+def create_inline_image_derivatives(sender, instance, raw=False, **kwargs):
+    """Queue derivatives for images used in the post body, then a recompile
+    so its ``srcset`` attributes list them (it runs after them: lower priority)."""
+    if raw:
+        return
+    missing = [
+        name for name in inline_images(instance.content_html)
+        if not has_derivatives(name)
+    ]
+    for name in missing:
+        enqueue(tasks.generate_image_derivatives, name=name, priority=10, unique=True)
+    if missing:
+        enqueue(tasks.compile_blog_content, blog_id=instance.pk, priority=5, unique=True)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+def schedule_sitemap_rebuild(sender, raw=False, **kwargs):
+    """Re-render sitemap.xml in the background once its URLs change."""
+    if not raw:
+        enqueue(tasks.warm_sitemaps, delay=SITEMAP_REBUILD_DELAY, unique=True)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Service)
+def update_search_index(sender, instance, using, **kwargs):
+    """Keep the full-text search row for ``instance`` current."""
+    search.index(instance, using=using)
+
+
+@receiver(post_delete, sender=Blog)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Service)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    search.unindex(instance, using=using)
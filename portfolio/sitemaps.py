@@ -1,23 +1,71 @@
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from django.urls import reverse
-from .models import Project
+from .models import Blog, Project
 
-class StaticViewSitemap(Sitemap):
+
+class PortfolioSitemap(Sitemap):
+    """Sitemap whose pages hold ``SITEMAP_SHARD_SIZE`` URLs"""
+
+    @property
+    def limit(self):
+        return getattr(settings, 'SITEMAP_SHARD_SIZE', 5000)
+
+    @cached_property
+    def paginator(self):
+        # Sitemap.paginator is rebuilt (and re-counted) on every access
+        return Paginator(self._items(), self.limit)
+
+    def page_items(self, page=1):
+        """Items on ``page``, streamed from the database when it is a queryset"""
+        items = self.paginator.page(page).object_list
+        return items.iterator() if hasattr(items, 'iterator') else iter(items)
+
+
+class StaticViewSitemap(PortfolioSitemap):
     priority = 0.5
     changefreq = 'daily'
 
     def items(self):
-        return ['portfolio:home', 'portfolio:about', 'portfolio:projects', 'portfolio:services', 'portfolio:skills', 'portfolio:contact']
+        return ['portfolio:home', 'portfolio:about', 'portfolio:projects', 'portfolio:services',
+                'portfolio:skills', 'portfolio:blogs', 'portfolio:contact']
 
     def location(self, item):
-        return reverse(item.replace('portfolio:', ''))
+        return reverse(item)
+
 
-class ProjectSitemap(Sitemap):
+class ProjectSitemap(PortfolioSitemap):
     changefreq = 'weekly'
     priority = 0.7
 
     def items(self):
-        return Project.objects.all()
+        return Project.objects.order_by('pk').only('id', 'updated_at')
+
+    def location(self, obj):
+        return reverse('portfolio:project_detail', args=[str(obj.id)])
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+
+class BlogSitemap(PortfolioSitemap):
+    changefreq = 'weekly'
+    priority = 0.6
+
+    def items(self):
+        return Blog.objects.order_by('pk').only('id', 'slug', 'updated_at')
 
     def location(self, obj):
-        return reverse('portfolio:project_detail', args=[str(obj.id)])
\ No newline at end of file
+        return reverse('portfolio:blog_detail', args=[obj.slug])
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+
+SITEMAPS = {
+    'static': StaticViewSitemap,
+    'projects': ProjectSitemap,
+    'blogs': BlogSitemap,
+}
@@ -0,0 +1,51 @@
+"""
+Content-addressed media storage.
+
+Uploaded files are named after the SHA-256 of their bytes, keeping the
+``upload_to`` directory and the extension::
+
+    blog/ai-blog-header.png -> blog/51877fe6c673e69ac0332a6ade2684d7.png
+
+Saving bytes that are already stored returns the existing name instead of
+writing another ``_Ip7E7Sk``-suffixed copy, and an unchanged URL stays cached by
+browsers and proxies.
+"""
+import hashlib
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASH_LENGTH = 32
+
+
+def content_hash(content):
+    """Return the hex SHA-256 of a Django ``File`` and rewind it."""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """``FileSystemStorage`` that deduplicates files by content hash."""
+
+    def hashed_name(self, name, digest):
+        dirname, filename = posixpath.split(name.replace('\\', '/'))
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(dirname, f'{digest[:HASH_LENGTH]}{extension}')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        name = self.hashed_name(name, content_hash(content))
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
@@ -0,0 +1,73 @@
+"""
+Background tasks, run by ``manage.py run_worker`` (see portfolio/jobs.py).
+"""
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.mail import mail_admins
+from django.test import RequestFactory
+
+from .cache import bump_content_version
+from .content import compile_content
+from .images import generate_derivatives
+from .jobs import enqueue_many, task
+from .models import Blog, Contact
+
+
+@task
+def generate_image_derivatives(name, force=False):
+    """Resize an uploaded image, then let cached pages pick up the ``srcset``."""
+    generate_derivatives(name, force=force)
+    bump_content_version()
+
+
+@task
+def compile_blog_content(blog_id):
+    """Recompile a post, so its inline images pick up newly generated derivatives."""
+    post = Blog.objects.filter(pk=blog_id).only('content', 'content_html', 'toc_html').first()
+    if post is None:
+        return
+    content_html, toc_html = compile_content(post.content)
+    if (content_html, toc_html) != (post.content_html, post.toc_html):
+        # update() rather than save(): no signals, so no new jobs, and updated_at stays
+        Blog.objects.filter(pk=blog_id).update(content_html=content_html, toc_html=toc_html)
+        bump_content_version()
+
+
+@task
+def notify_new_contact(contact_id):
+    """Email the site admins about a contact form submission."""
+    contact = Contact.objects.filter(pk=contact_id).first()
+    if contact is None:
+        return
+    mail_admins(
+        f'Contact form: {contact.subject}',
+        f'From: {contact.name} <{contact.email}>\n\n{contact.message}',
+        fail_silently=False,
+    )
+
+
+def enqueue_contact_notifications(contacts):
+    """Queue ``notify_new_contact`` for saved ``contacts``, if ADMINS is set."""
+    if settings.ADMINS:
+        enqueue_many(notify_new_contact, [{'contact_id': contact.pk} for contact in contacts])
+
+
+@task
+def warm_sitemaps():
+    """Render sitemap.xml and its shards into the cache for ``SITE_URL``."""
+    from .sitemaps import SITEMAPS
+    from .views.sitemaps import sitemap_index, sitemap_section
+
+    base = urlsplit(settings.SITE_URL)
+    factory = RequestFactory(HTTP_HOST=base.netloc)
+
+    def render(view, *args):
+        response = view(factory.get('/', secure=base.scheme == 'https'), *args)
+        # Consuming the stream is what stores it in the cache
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    if b'<sitemapindex' in render(sitemap_index):
+        for section, sitemap_class in SITEMAPS.items():
+            for page in sitemap_class().paginator.page_range:
+                render(sitemap_section, section, page)
@@ -0,0 +1,68 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from ..assets import BUNDLES, DIST_DIR, assets_root, load_lock
+
+register = template.Library()
+
+# Tags of built bundles; the CDN fallback is not kept, so a build is picked up
+_built_tags = {}
+
+
+def _tag(kind, url, integrity=None):
+    if integrity:
+        if kind == 'css':
+            return format_html('<link rel="stylesheet" href="{}" integrity="{}" crossorigin="anonymous">',
+                               url, integrity)
+        return format_html('<script src="{}" integrity="{}" crossorigin="anonymous"></script>', url, integrity)
+    if kind == 'css':
+        return format_html('<link rel="stylesheet" href="{}">', url)
+    return format_html('<script src="{}"></script>', url)
+
+
+def _inline(kind, source):
+    text = (assets_root() / source.path).read_text(encoding='utf-8')
+    if kind == 'css':
+        return mark_safe(f'<style>\n{text}</style>')
+    return mark_safe(f'<script>\n{text}</script>')
+
+
+def render_bundle(name):
+    kind = name.rsplit('.', 1)[-1]
+    path = f'{DIST_DIR}/{name}'
+    if finders.find(path):
+        return _tag(kind, static(path))
+    # Not built yet: load each part from upstream, pinned to the vendored
+    # hashes, and inline our own sources
+    lock = load_lock()
+    return mark_safe('\n'.join(
+        _tag(kind, source.url, lock.get(source.path)) if source.url else _inline(kind, source)
+        for source in BUNDLES[name]
+    ))
+
+
+def clear_bundle_cache():
+    _built_tags.clear()
+
+
+@register.simple_tag
+def bundle(name):
+    """Include an asset bundle from portfolio/assets.py.
+
+    Usage in template:
+    `{% bundle 'site.css' %}`
+
+    Renders one ``<link>``/``<script>`` for the built, fingerprinted bundle,
+    or the upstream CDN tags until ``build_assets`` has been run.
+    """
+    if settings.DEBUG:
+        return render_bundle(name)
+    if name not in _built_tags:
+        if not finders.find(f'{DIST_DIR}/{name}'):
+            return render_bundle(name)
+        _built_tags[name] = render_bundle(name)
+    return _built_tags[name]
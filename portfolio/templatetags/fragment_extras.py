@@ -0,0 +1,123 @@
+import hashlib
+import json
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.safestring import mark_safe
+
+from ..cache import get_content_version
+
+register = template.Library()
+
+JOB_TITLE = 'Python Developer | Data Scientist | AI Specialist'
+KNOWS_ABOUT = (
+    'Python', 'Django', 'Data Science', 'Machine Learning', 'Artificial Intelligence', 'Web Development',
+)
+
+# json.dumps output is not safe inside <script> as-is (cf. django.utils.html.json_script)
+JSON_SCRIPT_ESCAPES = {ord('>'): '\\u003E', ord('<'): '\\u003C', ord('&'): '\\u0026'}
+
+
+def _timeout():
+    return getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+class VersionedCacheNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        values = '|'.join(str(var.resolve(context)) for var in self.vary_on)
+        digest = hashlib.md5(values.encode('utf-8')).hexdigest()
+        key = f'portfolio:fragment:v{get_content_version()}:{self.name}:{digest}'
+        content = cache.get(key)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, _timeout())
+        return content
+
+
+@register.tag
+def versioned_cache(parser, token):
+    """Cache a template fragment until the content version changes.
+
+    Usage in template:
+    `{% versioned_cache 'nav' site_url %}...{% endversioned_cache %}`
+
+    Like ``{% cache %}``, but keyed by the content version bumped from
+    portfolio/signals.py, so an admin edit shows up on the next request
+    instead of after a timeout. The fragment must not depend on anything
+    per-request (CSRF tokens, the query string) other than the values it
+    varies on.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name.")
+    nodelist = parser.parse((f'end{bits[0]}',))
+    parser.delete_first_token()
+    name = bits[1].strip('\'"')
+    return VersionedCacheNode(nodelist, name, [parser.compile_filter(bit) for bit in bits[2:]])
+
+
+def structured_data(profile, site_url):
+    """The schema.org Person and WebSite objects for ``profile``."""
+    name = getattr(profile, 'name', None) or 'Abid Hussain'
+    person = {
+        '@context': 'https://schema.org',
+        '@type': 'Person',
+        'name': name,
+        'url': site_url,
+        'image': (
+            f'{site_url}{profile.profile_image.url}' if profile and profile.profile_image
+            else f'{site_url}/static/professional_headshot.jpg'
+        ),
+        'description': getattr(profile, 'objective', None) or 'Python Developer, Data Scientist, and AI Specialist',
+        'jobTitle': JOB_TITLE,
+        'address': {
+            '@type': 'PostalAddress',
+            'addressLocality': getattr(profile, 'address', None) or 'Lahore, Punjab, Pakistan',
+        },
+        'sameAs': list(getattr(settings, 'SITE_SAME_AS', ())),
+        'knowsAbout': list(KNOWS_ABOUT),
+    }
+    email = getattr(profile, 'email', None) or getattr(settings, 'SITE_EMAIL', '')
+    if email:
+        person['email'] = email
+    if getattr(profile, 'phone', None):
+        person['telephone'] = profile.phone
+    website = {
+        '@context': 'https://schema.org',
+        '@type': 'WebSite',
+        'name': f'{name} - Portfolio',
+        'url': site_url,
+        'potentialAction': {
+            '@type': 'SearchAction',
+            'target': f'{site_url}{reverse("portfolio:search")}?q={{search_term_string}}',
+            'query-input': 'required name=search_term_string',
+        },
+    }
+    return [person, website]
+
+
+@register.simple_tag(takes_context=True)
+def json_ld(context):
+    """Render the site's JSON-LD ``<script>``, serialized once per profile change.
+
+    Usage in template:
+    `{% json_ld %}`
+    """
+    profile = context.get('site_profile')
+    site_url = context.get('site_url', '')
+    stamp = f'{profile.pk}:{profile.updated_at.timestamp()}' if profile else 'none'
+    digest = hashlib.md5(f'{stamp}|{site_url}'.encode('utf-8')).hexdigest()
+    key = f'portfolio:json-ld:{digest}'
+    content = cache.get(key)
+    if content is None:
+        data = json.dumps(structured_data(profile, site_url), ensure_ascii=False, separators=(',', ':'))
+        content = f'<script type="application/ld+json">{data.translate(JSON_SCRIPT_ESCAPES)}</script>'
+        cache.set(key, content, _timeout())
+    return mark_safe(content)
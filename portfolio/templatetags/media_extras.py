@@ -0,0 +1,65 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from ..images import MIME_TYPES, get_variants, metadata_columns
+
+register = template.Library()
+
+
+def _srcset(candidates):
+    return ', '.join(f'{default_storage.url(name)} {width}w' for width, name in candidates)
+
+
+@register.simple_tag
+def responsive_image(image, sizes='100vw', **attrs):
+    """Render ``image`` as a ``<picture>`` using its AVIF/WebP/JPEG derivatives.
+
+    Usage in template:
+    `{% responsive_image post.image sizes="(min-width: 992px) 50vw, 100vw" alt=post.title class="card-img-top" %}`
+
+    Falls back to a plain ``<img>`` of the original when no derivatives exist.
+    """
+    if not image:
+        return ''
+    variants = get_variants(image.name)
+    attributes = format_html_join(' ', '{}="{}"', ((key.replace('_', '-'), value) for key, value in attrs.items()))
+
+    if not variants['jpeg']:
+        return format_html('<img src="{}" {}>', image.url, attributes)
+
+    sources = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[fmt], _srcset(variants[fmt]), sizes) for fmt in ('avif', 'webp') if variants[fmt]),
+    )
+    fallback = variants['jpeg'][-1][1]
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" {}></picture>',
+        sources, default_storage.url(fallback), _srcset(variants['jpeg']), sizes, attributes,
+    )
+
+
+@register.simple_tag
+def lazy_image(image, sizes='100vw', **attrs):
+    """``responsive_image``, lazy-loaded, with the stored size and placeholder of ``image``.
+
+    Usage in template:
+    `{% lazy_image project.image sizes="(min-width: 768px) 50vw, 100vw" alt=project.title class="card-img-top" %}`
+
+    The width and height come from the model (see images.py), so the browser
+    reserves the space, and the blurred placeholder is the ``<img>``'s
+    background until the image draws over it. The file is never opened.
+    """
+    if not image:
+        return ''
+    width, height, placeholder = (getattr(image.instance, column) for column in metadata_columns(image.field.name))
+    if width and height:
+        attrs.setdefault('width', width)
+        attrs.setdefault('height', height)
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    if placeholder:
+        background = f'background: url({placeholder}) center / cover no-repeat'
+        attrs['style'] = f'{background}; {attrs["style"]}' if attrs.get('style') else background
+    return responsive_image(image, sizes, **attrs)
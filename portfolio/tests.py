@@ -1,3 +1,1582 @@
-from django.test import TestCase
+"""
+Tests for the portfolio app.
 
-# Create your tests here.
+Query budgets: every public page, API endpoint and admin list is rendered
+against a seeded data set with the caches disabled, and must stay within its
+query budget. Each page is then rendered again after more rows are added: the
+number of queries must not grow with the data, which is what an N+1 looks
+like. A failure lists the statements that were repeated.
+
+The other test cases cover the caches, content pipeline, images, jobs,
+API, middleware and management commands.
+"""
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from types import ModuleType
+from unittest import mock
+from xml.etree import ElementTree
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings as django_settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, OperationalError, connection, connections, transaction
+from django.db.utils import ConnectionHandler
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse, HttpResponseServerError, StreamingHttpResponse
+from django.template import Context, Template
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, include, path, reverse
+from django.utils import timezone
+
+from abid_portfolio import urls as root_urls
+from abid_portfolio.database import sqlite_databases
+from . import urls as portfolio_urls
+
+from . import assets, jobs, search, tasks
+from .cache import (
+    _fresh_key, _lock_path, _page_key, aacquire_lock, acquire_lock, arelease_lock, bump_content_version, cached_page,
+    get_content_version, release_lock,
+)
+from .conditional import conditional_on
+from .content import compile_content
+from .images import derivative_name, generate_derivatives, get_variants, update_image_metadata
+from .jobs import enqueue, task
+from .management.commands.explain_views import problems as explain_problems
+from .metrics import registry
+from .middleware import CompressionMiddleware, accepted_encoding, minify_html
+from .models import Blog, Contact, Job, Profile, Project, Skill, SkillCategory
+from .nplusone import NPlusOneMiddleware, QueryRecorder, describe, normalize_sql, repeated_queries
+from .pagination import InvalidCursor, KeysetPaginator
+from .rendering import MANIFEST_NAME as RENDER_MANIFEST, card_spec, render_batch
+from .routers import READ_ALIAS, WRITE_ALIAS
+from .sampledata import seed
+from .storage import ContentAddressedStorage
+from .tasks import enqueue_contact_notifications
+from .templatetags.asset_extras import bundle, clear_bundle_cache
+from .templatetags.media_extras import lazy_image
+from .views import main_async
+from .writebehind import WriteBehindQueue
+from PIL import Image
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+MANIFEST_STORAGES = {
+    **django_settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+}
+
+# Maximum queries per page, independent of the number of rows
+PUBLIC_BUDGETS = {
+    'home': 8,
+    'about': 3,
+    'skills': 4,
+    'projects': 3,
+    'project_detail': 3,
+    'services': 3,
+    'contact': 1,
+    'blogs': 4,
+    'blog_detail': 4,
+    'search': 5,
+    'sitemap': 5,
+    'api_skills': 3,
+    'api_list': 2,
+    'api_detail': 2,
+}
+# Admin changelists, logged in as a superuser (session and user lookups included)
+ADMIN_BUDGETS = {
+    'profile': 6,
+    'skillcategory': 6,
+    'skill': 8,
+    'education': 7,
+    'project': 6,
+    'service': 6,
+    'contact': 6,
+    'blog': 7,
+}
+
+
+def public_urls():
+    project = Project.objects.order_by('pk').first()
+    blog = Blog.objects.order_by('pk').first()
+    return {
+        'home': reverse('portfolio:home'),
+        'about': reverse('portfolio:about'),
+        'skills': reverse('portfolio:skills'),
+        'projects': reverse('portfolio:projects'),
+        'project_detail': reverse('portfolio:project_detail', args=[project.pk]),
+        'services': reverse('portfolio:services'),
+        'contact': reverse('portfolio:contact'),
+        'blogs': reverse('portfolio:blogs'),
+        'blog_detail': reverse('portfolio:blog_detail', args=[blog.slug]),
+        'search': reverse('portfolio:search') + '?q=python',
+        'sitemap': reverse('sitemap'),
+        'api_skills': reverse('portfolio:api_skills'),
+        'api_list': [reverse('portfolio:api_list', args=[name]) for name in ('projects', 'blogs', 'services')],
+        'api_detail': [
+            reverse('portfolio:api_detail', args=['projects', project.pk]),
+            reverse('portfolio:api_detail', args=['blogs', blog.slug]),
+        ],
+    }
+
+
+def admin_urls():
+    return {name: reverse(f'admin:portfolio_{name}_changelist') for name in ADMIN_BUDGETS}
+
+
+class QueryBudgetMixin:
+    def render(self, path):
+        """GET ``path``; return the SQL statements it ran."""
+        with QueryRecorder() as recorder:
+            response = self.client.get(path)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, path)
+        return recorder.statements
+
+    def assertWithinBudget(self, path, statements, budget):
+        if len(statements) > budget:
+            self.fail(
+                f'{path} ran {len(statements)} queries, budget is {budget}. Repeated:\n'
+                f'{describe(repeated_queries(statements, 2)) or "  (none)"}'
+            )
+
+    def assertNoGrowth(self, path, before, after):
+        if len(after) > len(before):
+            grown = [
+                (sql, count) for sql, count in repeated_queries(after, 2)
+                if count > sum(normalize_sql(s) == sql for s in before)
+            ]
+            self.fail(
+                f'{path} went from {len(before)} to {len(after)} queries as rows were added. '
+                f'Repeated per row:\n{describe(grown) or describe(repeated_queries(after, 2))}'
+            )
+
+    def check_urls(self, urls, budgets):
+        """Render ``{name: url or [urls]}`` now and after adding rows."""
+        targets = [
+            (name, url) for name, value in urls.items()
+            for url in ([value] if isinstance(value, str) else value)
+        ]
+        counts = {}
+        for name, url in targets:
+            with self.subTest(path=url):
+                counts[url] = self.render(url)
+                self.assertWithinBudget(url, counts[url], budgets[name])
+        seed(batch=1, size=6)
+        for name, url in targets:
+            with self.subTest(path=url, rows='more'):
+                self.assertNoGrowth(url, counts[url], self.render(url))
+
+
+@override_settings(CACHES=NO_CACHE, JOBS_RUN_INLINE=False, NPLUSONE_DETECTION=False)
+class PublicQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed()
+
+    def test_public_pages(self):
+        self.check_urls(public_urls(), PUBLIC_BUDGETS)
+
+    def test_blog_cursor_pages(self):
+        first = self.render(reverse('portfolio:blogs'))
+        seed(batch=1, size=Blog.objects.count() * 2)
+        response = self.client.get(reverse('portfolio:blogs'))
+        cursor = response.context['page'].next_cursor
+        self.assertIsNotNone(cursor)
+        url = reverse('portfolio:blogs') + f'?cursor={cursor}'
+        self.assertNoGrowth(url, first, self.render(url))
+
+
+@override_settings(CACHES=NO_CACHE, JOBS_RUN_INLINE=False, NPLUSONE_DETECTION=False)
+class AdminQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed()
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelists(self):
+        self.check_urls(admin_urls(), ADMIN_BUDGETS)
+
+    def test_skill_delete_confirmation(self):
+        """The confirmation page lists every Skill by ``__str__`` (its category name)."""
+        def confirm():
+            with QueryRecorder() as recorder:
+                response = self.client.post(reverse('admin:portfolio_skill_changelist'), {
+                    'action': 'delete_selected',
+                    '_selected_action': list(Skill.objects.values_list('pk', flat=True)),
+                })
+            self.assertEqual(response.status_code, 200)
+            return recorder.statements
+
+        before = confirm()
+        seed(batch=1, size=6)
+        self.assertNoGrowth('delete_selected', before, confirm())
+
+    def test_category_delete_confirmation(self):
+        """Deleting categories lists their skills too."""
+        def confirm():
+            with QueryRecorder() as recorder:
+                response = self.client.post(reverse('admin:portfolio_skillcategory_changelist'), {
+                    'action': 'delete_selected',
+                    '_selected_action': list(SkillCategory.objects.values_list('pk', flat=True)),
+                })
+            self.assertEqual(response.status_code, 200)
+            return recorder.statements
+
+        before = confirm()
+        seed(batch=1, size=6)
+        self.assertNoGrowth('delete_selected', before, confirm())
+
+
+class NPlusOneDetectionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed()
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id = 12 AND name = 'x''y' AND pk IN (%s, %s, %s)"),
+            'SELECT * FROM t WHERE id = ? AND name = ? AND pk IN (...)',
+        )
+
+    @override_settings(NPLUSONE_DETECTION=True)
+    def test_middleware_logs_repeated_queries(self):
+        def view(request):
+            # One query per skill for its category
+            [skill.category.name for skill in Skill.objects.all()]
+            return None
+
+        middleware = NPlusOneMiddleware(view)
+        with self.assertLogs('portfolio.nplusone', 'WARNING') as logs:
+            middleware(RequestFactory().get('/skills/'))
+        self.assertIn('portfolio_skillcategory', logs.output[0])
+        self.assertIn(f'{Skill.objects.count()}x', logs.output[0])
+
+    @override_settings(NPLUSONE_DETECTION=True)
+    def test_middleware_quiet_without_repeats(self):
+        middleware = NPlusOneMiddleware(lambda request: list(Skill.objects.select_related('category')))
+        with self.assertNoLogs('portfolio.nplusone'):
+            middleware(RequestFactory().get('/skills/'))
+
+
+class NPlusOneMiddlewareSettingsTests(SimpleTestCase):
+
+    @override_settings(NPLUSONE_DETECTION=False)
+    def test_disabled(self):
+        from django.core.exceptions import MiddlewareNotUsed
+        with self.assertRaises(MiddlewareNotUsed):
+            NPlusOneMiddleware(lambda request: None)
+
+
+@override_settings(CACHES=NO_CACHE)
+class MetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed()
+
+    def setUp(self):
+        registry.clear()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('portfolio:blogs'))
+        timing = response.headers['Server-Timing']
+        for name in ('db', 'tpl', 'ctx', 'total'):
+            self.assertIn(f'{name};dur=', timing)
+        self.assertRegex(timing, r'desc="[1-9]\d* queries"')
+
+    def test_only_portfolio_views(self):
+        response = self.client.get(reverse('sitemap'))
+        self.assertNotIn('Server-Timing', response.headers)
+
+    def test_exposition(self):
+        self.client.get(reverse('portfolio:home'))
+        self.client.get(reverse('portfolio:home'))
+        body = self.client.get(reverse('portfolio:metrics'), REMOTE_ADDR='127.0.0.1').content.decode()
+        labels = 'route="portfolio:home",method="GET"'
+        self.assertIn(f'portfolio_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', body)
+        self.assertIn(f'portfolio_request_duration_seconds_count{{{labels}}} 2', body)
+        self.assertIn(f'portfolio_requests_total{{{labels},status="200"}} 2', body)
+        self.assertRegex(body, r'portfolio_jobs\{status="queued"\} \d+')
+        self.assertIn('portfolio_contact_queue_depth ', body)
+
+    def test_internal_only(self):
+        response = self.client.get(reverse('portfolio:metrics'), REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(response.status_code, 404)
+
+
+def async_urlconf():
+    """The site's URLs with the page views from main_async (as ASYNC_VIEWS does)."""
+    views = {name: view for name, view in vars(main_async).items() if iscoroutinefunction(view)}
+    pages = [
+        path(str(pattern.pattern), views.get(pattern.callback.__name__, pattern.callback), name=pattern.name)
+        for pattern in portfolio_urls.urlpatterns
+    ]
+    urlconf = ModuleType('async_urls')
+    urlconf.urlpatterns = [path('', include((pages, 'portfolio')))] + [
+        pattern for pattern in root_urls.urlpatterns if not isinstance(pattern, URLResolver)
+    ]
+    return urlconf
+
+
+ASYNC_URLCONF = async_urlconf()
+
+
+@override_settings(CACHES=NO_CACHE, JOBS_RUN_INLINE=False, NPLUSONE_DETECTION=False)
+class AsyncViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed()
+
+    def page_paths(self):
+        urls = public_urls()
+        return [urls[name] for name in (
+            'home', 'about', 'skills', 'projects', 'project_detail', 'services', 'blogs', 'blog_detail', 'search',
+        )]
+
+    async def test_same_pages_as_sync_views(self):
+        paths = await sync_to_async(self.page_paths)()
+        expected = {}
+        for page in paths:
+            response = await sync_to_async(self.client.get)(page)
+            expected[page] = response.content
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            for page in paths:
+                with self.subTest(path=page):
+                    response = await self.async_client.get(page)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.content, expected[page])
+
+    async def test_home_queries(self):
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            async with QueryRecorder() as recorder:
+                response = await self.async_client.get(reverse('portfolio:home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Server-Timing', response.headers)
+        # The profile is looked up once, not again by site_profile
+        self.assertLessEqual(len(recorder.statements), PUBLIC_BUDGETS['home'] - 1)
+
+    async def test_not_modified(self):
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            response = await self.async_client.get(reverse('portfolio:blogs'))
+            etag = response.headers['ETag']
+            response = await self.async_client.get(reverse('portfolio:blogs'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(CACHES=NO_CACHE, JOBS_RUN_INLINE=False)
+class ViewErrorTests(TestCase):
+
+    def test_missing_objects_are_404s(self):
+        for urlconf in (django_settings.ROOT_URLCONF, ASYNC_URLCONF):
+            with self.subTest(urlconf=urlconf), override_settings(ROOT_URLCONF=urlconf):
+                for url in (reverse('portfolio:project_detail', args=[999]),
+                            reverse('portfolio:blog_detail', args=['missing'])):
+                    self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_failures_are_500s(self):
+        error = DatabaseError('boom')
+        for urlconf, target in ((django_settings.ROOT_URLCONF, 'portfolio.views.main.get_object_or_404'),
+                                (ASYNC_URLCONF, 'portfolio.views.main_async.aget_object_or_404')):
+            with self.subTest(urlconf=urlconf), override_settings(ROOT_URLCONF=urlconf), \
+                    mock.patch(target, side_effect=error):
+                for url in (reverse('portfolio:project_detail', args=[1]),
+                            reverse('portfolio:blog_detail', args=['post'])):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 500)
+                    self.assertContains(response, 'boom', status_code=500)
+        with mock.patch.object(Contact, 'full_clean', side_effect=error):
+            response = self.client.post(reverse('portfolio:contact'), {'name': 'N'})
+        self.assertEqual(response.status_code, 500)
+
+
+class ContentPipelineTests(TestCase):
+
+    def test_markdown(self):
+        html, _ = compile_content(
+            'Some **bold**, *em* and `a<b`, see [docs](https://example.com).\n\n'
+            '- one\n- two\n\n1. first\n\n```python\nif a < b:\n    pass\n```\n\n> quoted'
+        )
+        self.assertInHTML('<strong>bold</strong>', html)
+        self.assertInHTML('<em>em</em>', html)
+        self.assertInHTML('<code>a&lt;b</code>', html)
+        self.assertInHTML('<a href="https://example.com">docs</a>', html)
+        self.assertInHTML('<ul><li>one</li><li>two</li></ul>', html)
+        self.assertInHTML('<ol><li>first</li></ol>', html)
+        self.assertInHTML('<pre><code class="language-python">if a &lt; b:\n    pass\n</code></pre>', html)
+        self.assertInHTML('<blockquote><p>quoted</p></blockquote>', html)
+
+    def test_html_passes_through(self):
+        source = '<h2>Data &amp; methods</h2>\n<p>Plain <strong>HTML</strong> post.</p>'
+        html, _ = compile_content(source)
+        self.assertInHTML('<p>Plain <strong>HTML</strong> post.</p>', html)
+        self.assertIn('Data &amp; methods', html)
+
+    def test_sanitized(self):
+        html, _ = compile_content(
+            '<div onclick="steal()"><script>alert(1)</script><p style="color: red">Hi '
+            '<a href="javascript:alert(1)">x</a> <a href="https://example.com" target="_blank">y</a></p></div>\n\n'
+            '<iframe src="https://example.com"></iframe>\n\n<p><a href="jav&#x09;ascript:alert(1)">z</a></p>'
+        )
+        for unwanted in ('<script', 'alert', 'onclick', 'style=', '<iframe', 'javascript'):
+            self.assertNotIn(unwanted, html)
+        self.assertIn('<a href="https://example.com" target="_blank" rel="noopener noreferrer">y</a>', html)
+
+    def test_uncompiled_post_shows_its_source(self):
+        post = Blog.objects.create(title='Post', slug='post', content='Plain <b>words</b>')
+        Blog.objects.filter(pk=post.pk).update(content_html='')
+        with self.settings(CACHES=NO_CACHE):
+            response = self.client.get(reverse('portfolio:blog_detail', args=[post.slug]))
+        self.assertContains(response, '<p>Plain &lt;b&gt;words&lt;/b&gt;</p>', html=True)
+
+    def test_parentheses_in_link_destinations(self):
+        html, _ = compile_content(
+            '[x](javascript:alert(1)) [wiki](https://en.wikipedia.org/wiki/Foo_(bar)) (aside) '
+            '[nested](/a(b(c))) ![chart](/media/chart(1).png "T") [open](/a(b)'
+        )
+        self.assertInHTML(
+            '<p><a>x</a> <a href="https://en.wikipedia.org/wiki/Foo_(bar)">wiki</a> (aside) '
+            '<a href="/a(b(c))">nested</a> <img src="/media/chart(1).png" alt="chart" title="T" '
+            'loading="lazy" decoding="async"> [open](/a(b)</p>',
+            html,
+        )
+        self.assertNotIn('alert', html)
+
+    def test_heading_anchors_and_toc(self):
+        html, toc = compile_content('# Title\n\n## Setup\n\n### Details\n\n## Setup\n\ntext')
+        self.assertIn('<h2 id="setup">', html)
+        self.assertIn('<h2 id="setup-2">', html)
+        self.assertIn('href="#details"', html)
+        self.assertInHTML(
+            '<ul class="toc"><li><a href="#setup">Setup</a><ul><li><a href="#details">Details</a></li></ul></li>'
+            '<li><a href="#setup-2">Setup</a></li></ul>',
+            toc,
+        )
+        self.assertEqual(compile_content('## Only one')[1], '')
+
+    def test_compiled_on_save(self):
+        post = Blog.objects.create(title='Post', slug='post', content='## Hello\n\nSome *words* here.')
+        self.assertIn('<em>words</em>', post.content_html)
+        self.assertEqual(post.word_count, 4)
+        post.content = 'Changed'
+        post.save(update_fields=['content'])
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, '<p>Changed</p>')
+        response = self.client.get(reverse('portfolio:blog_detail', args=['post']))
+        self.assertContains(response, '<p>Changed</p>', html=True)
+
+
+class SearchTests(TestCase):
+
+    def test_ranking_snippets_and_updates(self):
+        body = Blog.objects.create(title='Notes', slug='notes', content='Some words about pandas dataframes.')
+        title = Blog.objects.create(title='Pandas tips', slug='pandas-tips', content='Short post.')
+        Project.objects.create(title='Dashboard', description='Built with <b>pandas</b>.', technologies='Python')
+
+        results = search.search('pandas')
+        # Title matches rank above body matches
+        self.assertEqual(results[0].title, '<mark>Pandas</mark> tips')
+        self.assertEqual(results[0].url, reverse('portfolio:blog_detail', args=['pandas-tips']))
+        snippets = {r.title: (r.kind, r.snippet) for r in results[1:]}
+        self.assertEqual(snippets, {
+            'Notes': ('blog', 'Some words about <mark>pandas</mark> dataframes.'),
+            'Dashboard': ('project', 'Built with <mark>pandas</mark>. Python'),
+        })
+        # Prefix match on the last word; FTS5 syntax is matched literally
+        self.assertEqual(len(search.search('panda')), 3)
+        self.assertEqual(search.search('title:pandas OR'), [])
+
+        title.title = 'Numpy tips'
+        title.save()
+        body.delete()
+        self.assertEqual([r.title for r in search.search('pandas')], ['Dashboard'])
+        self.assertEqual([r.title for r in search.search('numpy')], ['<mark>Numpy</mark> tips'])
+
+    def test_html_in_indexed_text_is_escaped(self):
+        Blog.objects.create(title='Escaping', slug='escaping', content='Write `<script>` tags.')
+        snippet = search.search('script')[0].snippet
+        self.assertIn('&lt;<mark>script</mark>&gt;', snippet)
+
+
+class SearchRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def test_searches_read_from_the_replica(self):
+        search.search('pandas')
+        with CaptureQueriesContext(connections[WRITE_ALIAS]) as writes, \
+                CaptureQueriesContext(connections[READ_ALIAS]) as reads:
+            search.search('pandas')
+            search.search('numpy')
+        self.assertEqual(len(writes), 0)
+        # One query per search: is_available() is remembered per connection
+        self.assertEqual(len(reads), 2)
+        self.assertTrue(all('MATCH' in query['sql'] for query in reads))
+
+
+class DatabaseRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def test_reads_use_the_replica_and_writes_default(self):
+        with CaptureQueriesContext(connections[WRITE_ALIAS]) as writes, \
+                CaptureQueriesContext(connections[READ_ALIAS]) as reads:
+            contact = Contact.objects.create(name='N', email='n@example.com', subject='S', message='M')
+            self.assertEqual(Contact.objects.get(pk=contact.pk).name, 'N')
+        self.assertEqual([query['sql'].split()[0] for query in writes], ['INSERT'])
+        self.assertEqual([query['sql'].split()[0] for query in reads], ['SELECT'])
+
+    def test_reads_stay_on_default_in_a_transaction(self):
+        with transaction.atomic(), CaptureQueriesContext(connections[READ_ALIAS]) as reads:
+            contact = Contact.objects.create(name='N', email='n@example.com', subject='S', message='M')
+            self.assertTrue(Contact.objects.filter(pk=contact.pk).exists())
+        self.assertEqual(len(reads), 0)
+
+
+class ReplicaConnectionTests(SimpleTestCase):
+    """The configured aliases (tests mirror ``replica`` to ``default`` instead)."""
+    # Connections of their own, to a temporary file
+    databases = {'default', 'replica'}
+
+    def test_replica_is_read_only(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        handler = ConnectionHandler(sqlite_databases(Path(root) / 'db.sqlite3'))
+        self.addCleanup(handler.close_all)
+
+        with handler[WRITE_ALIAS].cursor() as cursor:
+            cursor.execute('CREATE TABLE item (name TEXT)')
+            cursor.execute("INSERT INTO item VALUES ('written')")
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone(), ('wal',))
+        with handler[READ_ALIAS].cursor() as cursor:
+            cursor.execute('SELECT name FROM item')
+            self.assertEqual(cursor.fetchall(), [('written',)])
+            with self.assertRaisesMessage(OperationalError, 'readonly'):
+                cursor.execute("INSERT INTO item VALUES ('blocked')")
+
+
+def png(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue(), name='upload.png')
+
+
+class MediaRootMixin:
+    """Store uploads in a temporary MEDIA_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+class StaticRootMixin:
+    """Build static files into temporary STATICFILES_DIRS/STATIC_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        self.static_root = root / 'collected'
+        self.static_root.mkdir()
+        settings = override_settings(STATICFILES_DIRS=[root / 'static'], STATIC_ROOT=self.static_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        clear_bundle_cache()
+        self.addCleanup(clear_bundle_cache)
+        self.builds = 0
+
+    def touch(self, path):
+        # Builds within one test can share an mtime; move each one forward
+        self.builds += 1
+        mtime = time.time_ns() + self.builds * 10**9
+        os.utime(path, ns=(mtime, mtime))
+
+    def build(self, content):
+        dist = assets.dist_root()
+        dist.mkdir(parents=True, exist_ok=True)
+        (dist / 'site.css').write_text(content)
+        self.touch(dist / 'site.css')
+
+    def collect(self, hashed_name):
+        """Write the manifest collectstatic would, as on a deploy (new storage, no cached tags)."""
+        manifest = self.static_root / 'staticfiles.json'
+        manifest.write_text(json.dumps({'paths': {'dist/site.css': hashed_name}, 'version': '1.1'}))
+        self.touch(manifest)
+        clear_bundle_cache()
+        return override_settings(STORAGES=MANIFEST_STORAGES)
+
+
+@override_settings(CACHES=NO_CACHE, JOBS_RUN_INLINE=False, IMAGE_DERIVATIVE_WIDTHS=[100])
+class ContentImageTests(MediaRootMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.name = default_storage.save('blog/inline.png', png(300, 200))
+
+    def test_images(self):
+        html, _ = compile_content(f'![Chart](/media/{self.name})\n\n![Remote](https://example.com/a.png)')
+        self.assertIn(
+            f'<img src="/media/{self.name}" alt="Chart" loading="lazy" decoding="async" width="300" height="200" '
+            'style="background: url(data:image/webp;base64,',
+            html,
+        )
+        self.assertIn('<img src="https://example.com/a.png" alt="Remote" loading="lazy" decoding="async">', html)
+
+    def test_derivatives_then_recompile(self):
+        post = Blog.objects.create(title='Post', slug='post', content=f'![Chart](/media/{self.name})')
+        self.assertNotIn('srcset', post.content_html)
+        self.assertEqual(
+            sorted(Job.objects.values_list('task', 'priority')),
+            [('portfolio.tasks.compile_blog_content', 5), ('portfolio.tasks.generate_image_derivatives', 10),
+             ('portfolio.tasks.warm_sitemaps', 0)],
+        )
+        generate_derivatives(self.name)
+        tasks.compile_blog_content(post.pk)
+        post.refresh_from_db()
+        self.assertIn(f'srcset="/media/{derivative_name(self.name, 100, "jpeg")} 100w"', post.content_html)
+
+
+@override_settings(CACHES=NO_CACHE, JOBS_RUN_INLINE=False)
+class ImageMetadataTests(MediaRootMixin, TestCase):
+
+    def test_stored_on_upload(self):
+        project = Project.objects.create(title='P', description='D', technologies='Python', image=png(320, 180))
+        project.refresh_from_db()
+        self.assertEqual((project.image_width, project.image_height), (320, 180))
+        self.assertTrue(project.image_placeholder.startswith('data:image/webp;base64,'))
+        self.assertLess(len(project.image_placeholder), 300)
+
+        profile = Profile.objects.create(name='N', email='n@example.com', phone='1', address='A', objective='O')
+        self.assertIsNone(profile.profile_image_width)
+        profile.profile_image = png(50, 80)
+        profile.save(update_fields=['profile_image'])
+        profile.refresh_from_db()
+        self.assertEqual((profile.profile_image_width, profile.profile_image_height), (50, 80))
+
+        project.image = None
+        project.save()
+        self.assertEqual((project.image_width, project.image_placeholder), (None, ''))
+
+    def test_not_read_again(self):
+        project = Project.objects.create(title='P', description='D', technologies='Python', image=png(320, 180))
+        project.image_width = 999
+        project.save()
+        self.assertEqual(update_image_metadata(project), [])
+        self.assertEqual(project.image_width, 999)
+
+    def test_lazy_image_does_not_open_the_file(self):
+        post = Blog.objects.create(title='Post', slug='post', content='Text', image=png(320, 180))
+        post.refresh_from_db()
+        default_storage.delete(post.image.name)
+        html = lazy_image(post.image, sizes='50vw', alt='Post', style='object-fit: cover;')
+        self.assertIn('width="320" height="180" loading="lazy" decoding="async"', html)
+        self.assertIn('style="background: url(data:image/webp;base64,', html)
+        self.assertIn('no-repeat; object-fit: cover;"', html)
+        self.assertEqual(lazy_image(None), '')
+
+    def test_backfill(self):
+        post = Blog.objects.create(title='Post', slug='post', content='Text', image=png(64, 32))
+        Blog.objects.filter(pk=post.pk).update(image_width=None, image_height=None, image_placeholder='')
+        out = io.StringIO()
+        call_command('backfill_image_metadata', stdout=out)
+        post.refresh_from_db()
+        self.assertEqual((post.image_width, post.image_height), (64, 32))
+        self.assertIn('Updated 1 rows.', out.getvalue())
+
+
+class MigrationTests(MediaRootMixin, TransactionTestCase):
+    """Migrations run against a database that already has content."""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('portfolio', target)])
+        return executor.loader.project_state([('portfolio', target)]).apps
+
+    def tearDown(self):
+        call_command('migrate', verbosity=0)
+
+    def test_blog_through_latest(self):
+        apps = self.migrate('0006_blog_summary')
+        apps.get_model('portfolio', 'Blog').objects.create(
+            title='Old post', slug='old-post', content='<p>Indexed words</p>',
+        )
+        self.migrate('0011_image_metadata')
+        self.assertEqual([result.title for result in search.search('indexed', using='default')], ['Old post'])
+
+    def test_existing_posts_are_summarized(self):
+        apps = self.migrate('0005_updated_at')
+        apps.get_model('portfolio', 'Blog').objects.create(
+            title='Old post', slug='old-post', content='<p>' + 'word ' * 450 + '</p>',
+        )
+        apps = self.migrate('0006_blog_summary')
+        post = apps.get_model('portfolio', 'Blog').objects.using('default').get()
+        self.assertEqual((post.word_count, post.reading_time), (450, 3))
+        self.assertEqual(post.summary, 'word ' * 19 + 'word…')
+
+    def test_existing_images_get_metadata(self):
+        apps = self.migrate('0010_blog_content_html')
+        apps.get_model('portfolio', 'Project').objects.create(
+            title='Old project', description='D', technologies='Python',
+            image=default_storage.save('projects/old.png', png(64, 32)),
+        )
+        apps.get_model('portfolio', 'Project').objects.create(
+            title='Missing file', description='D', technologies='Python', image='projects/gone.png',
+        )
+        apps = self.migrate('0011_image_metadata')
+        rows = apps.get_model('portfolio', 'Project').objects.using('default').order_by('pk')
+        (width, height, placeholder), missing = [
+            (row.image_width, row.image_height, row.image_placeholder) for row in rows
+        ]
+        self.assertEqual((width, height), (64, 32))
+        self.assertTrue(placeholder.startswith('data:image/webp;base64,'))
+        self.assertEqual(missing, (None, None, ''))
+
+    def test_existing_posts_are_compiled(self):
+        apps = self.migrate('0009_ordering_indexes')
+        apps.get_model('portfolio', 'Blog').objects.create(
+            title='Old post', slug='old-post', content='## Setup\n\nSome *words*.',
+        )
+        apps = self.migrate('0010_blog_content_html')
+        post = apps.get_model('portfolio', 'Blog').objects.using('default').get()
+        self.assertInHTML('<p>Some <em>words</em>.</p>', post.content_html)
+        self.assertIn('id="setup"', post.content_html)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   SITE_SAME_AS=('https://github.com/example',), SITE_EMAIL='site@example.com')
+class FragmentTests(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def render(self, source, **context):
+        return Template('{% load fragment_extras %}' + source).render(Context(context))
+
+    def json_ld(self, profile):
+        html = self.render('{% json_ld %}', site_profile=profile, site_url='https://example.com')
+        match = re.fullmatch(r'<script type="application/ld\+json">(.*)</script>', html, re.DOTALL)
+        self.assertIsNotNone(match)
+        return match.group(1), json.loads(match.group(1))
+
+    def test_versioned_cache(self):
+        source = '{% versioned_cache "nav" section %}{{ value }}{% endversioned_cache %}'
+        self.assertEqual(self.render(source, section='a', value=1), '1')
+        self.assertEqual(self.render(source, section='a', value=2), '1')
+        self.assertEqual(self.render(source, section='b', value=2), '2')
+        bump_content_version()
+        self.assertEqual(self.render(source, section='a', value=3), '3')
+
+    def test_json_ld_escapes_script_content(self):
+        profile = Profile.objects.create(
+            name='N', email='n@example.com', phone='1', address='A',
+            objective='</script><script>alert(1)</script> & more',
+        )
+        raw, (person, website) = self.json_ld(profile)
+        self.assertNotIn('<', raw)
+        self.assertNotIn('&', raw)
+        self.assertEqual(person['description'], '</script><script>alert(1)</script> & more')
+        self.assertEqual(person['email'], 'n@example.com')
+        self.assertEqual(person['sameAs'], ['https://github.com/example'])
+        self.assertEqual(website['url'], 'https://example.com')
+
+    def test_json_ld_follows_profile_changes(self):
+        self.assertEqual(self.json_ld(None)[1][0]['email'], 'site@example.com')
+        profile = Profile.objects.create(name='N', email='n@example.com', phone='1', address='A', objective='Old')
+        self.assertEqual(self.json_ld(profile)[1][0]['description'], 'Old')
+        profile.objective = 'New'
+        profile.save()
+        self.assertEqual(self.json_ld(profile)[1][0]['description'], 'New')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   JOBS_RUN_INLINE=False, SITEMAP_SHARD_SIZE=10)
+class SitemapTests(TestCase):
+    NS = {'s': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
+    STATIC_URLS = 7
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def fetch(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return ElementTree.fromstring(content)
+
+    def urls(self, url):
+        return {
+            entry.findtext('s:loc', namespaces=self.NS).removeprefix('http://testserver'): entry
+            for entry in self.fetch(url).findall('s:url', self.NS)
+        }
+
+    def create(self, projects, posts):
+        for i in range(projects):
+            Project.objects.create(title=f'P{i}', description='D', technologies='Python')
+        for i in range(posts):
+            Blog.objects.create(title=f'B{i}', slug=f'post-{i}', content='Text')
+
+    def test_blog_entries_and_lastmod(self):
+        self.create(projects=1, posts=2)
+        post = Blog.objects.get(slug='post-1')
+        Blog.objects.filter(pk=post.pk).update(updated_at=datetime(2024, 3, 5, 12, tzinfo=dt_timezone.utc))
+        bump_content_version()
+
+        urls = self.urls(reverse('sitemap'))
+        self.assertEqual(len(urls), self.STATIC_URLS + 3)
+        entry = urls[reverse('portfolio:blog_detail', args=['post-1'])]
+        self.assertEqual(entry.findtext('s:lastmod', namespaces=self.NS), '2024-03-05')
+        self.assertEqual(entry.findtext('s:changefreq', namespaces=self.NS), 'weekly')
+        self.assertEqual(entry.findtext('s:priority', namespaces=self.NS), '0.6')
+        self.assertIn(reverse('portfolio:blog_detail', args=['post-0']), urls)
+        self.assertIsNone(urls[reverse('portfolio:about')].find('s:lastmod', self.NS))
+
+    def test_shard_boundaries(self):
+        # Exactly SITEMAP_SHARD_SIZE URLs still fit one urlset
+        self.create(projects=2, posts=1)
+        self.assertEqual(self.fetch(reverse('sitemap')).tag, f'{{{self.NS["s"]}}}urlset')
+
+        # One more and it becomes an index
+        Project.objects.create(title='P', description='D', technologies='Python')
+        self.assertEqual(self.fetch(reverse('sitemap')).tag, f'{{{self.NS["s"]}}}sitemapindex')
+
+        caches['default'].clear()
+        with self.settings(SITEMAP_SHARD_SIZE=2):
+            index = self.fetch(reverse('sitemap'))
+            self.assertEqual(index.tag, f'{{{self.NS["s"]}}}sitemapindex')
+            shards = [loc.text.removeprefix('http://testserver') for loc in index.findall('s:sitemap/s:loc', self.NS)]
+            self.assertEqual(shards, [
+                reverse('sitemap_section', args=[section, page])
+                for section, page in [('static', 1), ('static', 2), ('static', 3), ('static', 4),
+                                      ('projects', 1), ('projects', 2), ('blogs', 1)]
+            ])
+            self.assertEqual([len(self.urls(shard)) for shard in shards], [2, 2, 2, 1, 2, 1, 1])
+            for section, page in (('projects', 3), ('widgets', 1)):
+                url = reverse('sitemap_section', args=[section, page])
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_edit_invalidates_the_cached_sitemap(self):
+        self.create(projects=0, posts=1)
+        url = reverse('portfolio:blog_detail', args=['post-0'])
+        self.assertIn(url, self.urls(reverse('sitemap')))
+        # Served from the cache now
+        self.assertFalse(self.client.get(reverse('sitemap')).streaming)
+
+        post = Blog.objects.get()
+        post.slug = 'renamed'
+        post.save()
+        urls = self.urls(reverse('sitemap'))
+        self.assertNotIn(url, urls)
+        self.assertIn(reverse('portfolio:blog_detail', args=['renamed']), urls)
+
+
+@override_settings(CACHES=NO_CACHE, JOBS_RUN_INLINE=False, NPLUSONE_DETECTION=False, ALLOWED_HOSTS=['*'])
+class ExportStaticTests(StaticRootMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed()
+
+    def setUp(self):
+        super().setUp()
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def export(self):
+        out = io.StringIO()
+        call_command('export_static', output=str(self.root), stdout=out)
+        return out.getvalue()
+
+    def test_incremental(self):
+        self.assertIn('0 removed, 0 failed', self.export())
+        about = self.root / 'about' / 'index.html'
+        self.assertTrue(about.exists())
+        self.assertTrue((self.root / 'about' / 'index.html.gz').exists())
+        mtime = about.stat().st_mtime_ns
+
+        output = self.export()
+        self.assertRegex(output, r'\n0 exported, \d+ unchanged, 0 removed')
+        self.assertEqual(about.stat().st_mtime_ns, mtime)
+
+        post = Blog.objects.order_by('pk').first()
+        page = self.root / 'blogs' / post.slug / 'index.html'
+        self.assertTrue(page.exists())
+        post.delete()
+        self.assertIn(f'Removed: /blogs/{post.slug}/', self.export())
+        self.assertFalse(page.exists())
+
+    def test_new_manifest_exports_again(self):
+        self.build('body{color:red}')
+        with self.collect('dist/site.0123456789ab.css'):
+            self.export()
+            self.assertRegex(self.export(), r'\n0 exported, \d+ unchanged')
+        about = self.root / 'about' / 'index.html'
+        self.assertIn('/static/dist/site.0123456789ab.css', about.read_text())
+
+        self.build('body{color:blue}')
+        with self.collect('dist/site.ba9876543210.css'):
+            output = self.export()
+        # Pages that link the bundle are written again; robots.txt comes out the same
+        self.assertIn('Exported: /about/', output)
+        self.assertIn('Unchanged: /robots.txt', output)
+        self.assertIn('/static/dist/site.ba9876543210.css', about.read_text())
+
+    def test_failed_page_keeps_last_export(self):
+        self.export()
+        about = self.root / 'about' / 'index.html'
+        good = about.read_bytes()
+        get = Client.get
+
+        def failing_get(client, url_path, *args, **kwargs):
+            if url_path == reverse('portfolio:about'):
+                return HttpResponseServerError()
+            return get(client, url_path, *args, **kwargs)
+
+        with mock.patch.object(Client, 'get', failing_get), self.assertRaises(CommandError):
+            self.export()
+        self.assertEqual(about.read_bytes(), good)
+        self.assertTrue((self.root / 'about' / 'index.html.gz').exists())
+        manifest = json.loads((self.root / '.export-manifest.json').read_text())
+        self.assertIn(reverse('portfolio:about'), manifest)
+        self.assertIn('0 removed, 0 failed', self.export())
+
+
+class RebuildLockTests(SimpleTestCase):
+
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        settings = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_page_key_ignores_other_parameters(self):
+        key = _page_key(RequestFactory().get('/blogs/', {'cursor': 'a', 'q': 'x'}), 'v1')
+        self.assertEqual(_page_key(RequestFactory().get('/blogs/?utm_source=feed&q=x&cursor=a'), 'v1'), key)
+        self.assertNotEqual(_page_key(RequestFactory().get('/blogs/', {'cursor': 'b', 'q': 'x'}), 'v1'), key)
+        self.assertNotEqual(_page_key(RequestFactory().get('/about/', {'cursor': 'a', 'q': 'x'}), 'v1'), key)
+
+    def test_file_lock_is_exclusive(self):
+        self.assertTrue(acquire_lock('page:lock', 30))
+        self.assertFalse(acquire_lock('page:lock', 30))
+        self.assertTrue(acquire_lock('other:lock', 30))
+        release_lock('page:lock')
+        self.assertTrue(acquire_lock('page:lock', 30))
+
+    def test_stale_file_lock_is_broken(self):
+        self.assertTrue(acquire_lock('page:lock', 30))
+        path = _lock_path(caches['default'], 'page:lock')
+        os.utime(path, (time.time() - 60, time.time() - 60))
+        self.assertTrue(acquire_lock('page:lock', 30))
+
+    async def test_async(self):
+        self.assertTrue(await aacquire_lock('page:lock', 30))
+        self.assertFalse(acquire_lock('page:lock', 30))
+        await arelease_lock('page:lock')
+        self.assertTrue(acquire_lock('page:lock', 30))
+
+    def test_held_lock_serves_stale_copy(self):
+        calls = []
+
+        @cached_page
+        def view(request):
+            calls.append(1)
+            return HttpResponse(f'render {len(calls)}')
+
+        request = RequestFactory().get('/page/')
+        self.assertEqual(view(request).content, b'render 1')
+        bump_content_version()
+        fresh_key = _fresh_key(request, get_content_version())
+        self.assertTrue(acquire_lock(f'{fresh_key}:lock', 30))
+        self.assertEqual(view(request).content, b'render 1')
+        release_lock(f'{fresh_key}:lock')
+        self.assertEqual(view(request).content, b'render 2')
+
+
+@override_settings(CACHES=NO_CACHE)
+class ApiErrorTests(TestCase):
+
+    def test_skills_failure_is_500(self):
+        with mock.patch('portfolio.views.api.cached_json', side_effect=DatabaseError('boom')):
+            response = self.client.get(reverse('portfolio:api_skills'))
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json(), {'error': 'boom'})
+
+    def test_missing_objects_are_json_404s_without_validators(self):
+        for url in (
+            reverse('portfolio:api_detail', args=['projects', 999]),
+            reverse('portfolio:api_detail', args=['projects', 'abc']),
+            reverse('portfolio:api_detail', args=['blogs', 'no-such-post']),
+            reverse('portfolio:api_detail', args=['widgets', 1]),
+            reverse('portfolio:api_list', args=['widgets']),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {'error': 'not found'})
+                self.assertFalse(response.has_header('ETag'))
+                self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_invalid_parameters_are_400s(self):
+        project = Project.objects.create(title='P', description='D', technologies='Python')
+        list_url = reverse('portfolio:api_list', args=['projects'])
+        detail_url = reverse('portfolio:api_detail', args=['projects', project.pk])
+        for url, params in (
+            (list_url, {'fields': 'title,secret'}),
+            (list_url, {'fields': ','}),
+            (list_url, {'limit': 'ten'}),
+            (list_url, {'limit': 0}),
+            (list_url, {'limit': 10_000}),
+            (list_url, {'cursor': 'not-a-cursor'}),
+            (detail_url, {'fields': 'secret'}),
+        ):
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+                self.assertFalse(response.has_header('ETag'))
+        response = self.client.get(detail_url, {'fields': 'title'})
+        self.assertEqual(response.json(), {'data': {'title': 'P'}})
+        self.assertTrue(response.has_header('ETag'))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class StaleValidatorTests(TestCase):
+
+    def test_stale_copy_keeps_its_validators(self):
+        @conditional_on(Profile)
+        @cached_page
+        def view(request):
+            return HttpResponse(f'profiles: {Profile.objects.count()}')
+
+        first = view(RequestFactory().get('/page/'))
+        Profile.objects.create(name='N', email='n@example.com', phone='1', address='A', objective='O')
+        request = RequestFactory().get('/page/')
+        lock_key = f'{_fresh_key(request, get_content_version())}:lock'
+        self.assertTrue(acquire_lock(lock_key, 30))
+        self.addCleanup(release_lock, lock_key)
+
+        stale = view(request)
+        self.assertEqual(stale.content, b'profiles: 0')
+        self.assertEqual(stale['ETag'], first['ETag'])
+        self.assertEqual(stale['Last-Modified'], first['Last-Modified'])
+        release_lock(lock_key)
+
+        current = view(RequestFactory().get('/page/', headers={'If-None-Match': first['ETag']}))
+        self.assertEqual(current.status_code, 200)
+        self.assertEqual(current.content, b'profiles: 1')
+        self.assertNotEqual(current['ETag'], first['ETag'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ValidatorCacheTests(StaticRootMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+
+        @conditional_on(Profile)
+        @cached_page
+        def view(request):
+            return HttpResponse('page')
+        self.view = view
+
+    def test_fingerprint_runs_once_per_content_version(self):
+        first = self.view(RequestFactory().get('/page/'))
+        with self.assertNumQueries(0):
+            revalidated = self.view(RequestFactory().get('/page/', headers={'If-None-Match': first['ETag']}))
+        self.assertEqual(revalidated.status_code, 304)
+
+        Profile.objects.create(name='N', email='n@example.com', phone='1', address='A', objective='O')
+        with self.assertNumQueries(1):
+            changed = self.view(RequestFactory().get('/page/', headers={'If-None-Match': first['ETag']}))
+        self.assertEqual(changed.status_code, 200)
+
+    def test_static_build_changes_validators(self):
+        self.build('body{color:red}')
+        first = self.view(RequestFactory().get('/page/'))
+        self.build('body{color:blue}')
+        second = self.view(RequestFactory().get('/page/', headers={'If-None-Match': first['ETag']}))
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+        # collectstatic's manifest takes over from the build directory
+        with self.collect('dist/site.0123456789ab.css'):
+            third = self.view(RequestFactory().get('/page/', headers={'If-None-Match': second['ETag']}))
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third['ETag'], second['ETag'])
+
+
+@override_settings(CACHES=NO_CACHE, IMAGE_DERIVATIVE_WIDTHS=[320, 640])
+class DerivativeWidthTests(MediaRootMixin, SimpleTestCase):
+
+    def test_narrow_image_uses_its_own_width(self):
+        name = default_storage.save('projects/narrow.png', png(200, 100))
+        # A derivative mislabelled by earlier releases
+        default_storage.save(derivative_name(name, 320, 'jpeg'), png(200, 100))
+
+        variants = generate_derivatives(name)
+        self.assertEqual(variants['jpeg'], [(200, derivative_name(name, 200, 'jpeg'))])
+        self.assertFalse(default_storage.exists(derivative_name(name, 320, 'jpeg')))
+        # Found again without the cache
+        self.assertEqual(get_variants(name), variants)
+        with Image.open(default_storage.path(derivative_name(name, 200, 'webp'))) as image:
+            self.assertEqual(image.width, 200)
+
+    def test_wide_image(self):
+        name = default_storage.save('projects/wide.png', png(700, 100))
+        self.assertEqual([width for width, _ in generate_derivatives(name)['jpeg']], [320, 640])
+        self.assertEqual([width for width, _ in get_variants(name)['jpeg']], [320, 640])
+
+
+class KeysetPaginatorTests(TestCase):
+    ORDERING = ('-published_date', '-created_at', '-id')
+
+    def setUp(self):
+        dates = [date(2024, 1, 3), None, date(2024, 1, 1), date(2024, 1, 3), None, date(2024, 1, 2), None]
+        for i, published in enumerate(dates):
+            Blog.objects.create(title=f'Post {i}', slug=f'post-{i}', content='Text', published_date=published)
+        posts = Blog.objects.all()
+        # NULL dates last, then newest first
+        self.expected = [post.pk for post in sorted(posts, reverse=True, key=lambda post: (
+            post.published_date is not None, post.published_date or date.min, post.created_at, post.pk,
+        ))]
+        self.paginator = KeysetPaginator(Blog.objects.all(), self.ORDERING, 3)
+
+    def test_forward_and_backward(self):
+        pages = [self.paginator.page()]
+        self.assertFalse(pages[0].has_previous())
+        while pages[-1].has_next():
+            pages.append(self.paginator.page(pages[-1].next_cursor))
+        self.assertEqual([post.pk for page in pages for post in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+        back = [pages[-1]]
+        while back[-1].has_previous():
+            back.append(self.paginator.page(back[-1].previous_cursor))
+        self.assertEqual(
+            [[post.pk for post in page] for page in back],
+            [[post.pk for post in page] for page in reversed(pages)],
+        )
+        self.assertFalse(back[-1].has_previous())
+        self.assertTrue(back[-1].has_next())
+
+    def test_tampered_cursor(self):
+        cursor = self.paginator.page().next_cursor
+
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+        for tampered in (
+            'not a cursor',
+            cursor[:-4],
+            encode([['2024-01-01'], 0]),                         # too few keys
+            encode([['yesterday', '2024-01-01T00:00:00', '1'], 0]),
+            encode({'values': []}),
+        ):
+            with self.subTest(cursor=tampered):
+                with self.assertRaises(InvalidCursor):
+                    self.paginator.page(tampered)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CompressionMiddlewareTests(SimpleTestCase):
+    BODY = '<html>\n  <body>\n' + '    <p>Some words here.</p>\n' * 40 + '  </body>\n</html>\n'
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def process(self, response, accept_encoding='gzip'):
+        request = RequestFactory().get('/page/', headers={'Accept-Encoding': accept_encoding})
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_accepted_encoding(self):
+        with mock.patch('portfolio.middleware.brotli', ModuleType('brotli')):
+            self.assertEqual(accepted_encoding('gzip, deflate, br'), 'br')
+            self.assertEqual(accepted_encoding('gzip, br;q=0.5'), 'gzip')
+            self.assertEqual(accepted_encoding('br;q=0, gzip;q=0.1'), 'gzip')
+            self.assertEqual(accepted_encoding('*'), 'br')
+            self.assertEqual(accepted_encoding('*, br;q=0'), 'gzip')
+            self.assertIsNone(accepted_encoding('identity'))
+            self.assertIsNone(accepted_encoding(''))
+        with mock.patch('portfolio.middleware.brotli', None):
+            self.assertIsNone(accepted_encoding('br'))
+            self.assertEqual(accepted_encoding('br, gzip;q=0.1'), 'gzip')
+
+    def test_compressed_response_has_a_weak_etag(self):
+        response = HttpResponse(self.BODY)
+        response['ETag'] = '"abc"'
+        response = self.process(response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response.content).decode(), minify_html(self.BODY))
+
+        # From the cache the second time
+        with mock.patch('portfolio.middleware.compress') as compress:
+            again = self.process(HttpResponse(self.BODY, headers={'ETag': '"abc"'}))
+        compress.assert_not_called()
+        self.assertEqual(again.content, response.content)
+
+    def test_identity_keeps_the_strong_etag(self):
+        response = self.process(HttpResponse(self.BODY, headers={'ETag': '"abc"'}), accept_encoding='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['ETag'], '"abc"')
+        self.assertEqual(response.content.decode(), minify_html(self.BODY))
+
+    def test_skips_encoded_and_streaming_responses(self):
+        encoded = HttpResponse(self.BODY, headers={'Content-Encoding': 'br', 'ETag': '"abc"'})
+        self.assertEqual(self.process(encoded).content, self.BODY.encode())
+        self.assertEqual(encoded['ETag'], '"abc"')
+
+        streaming = self.process(StreamingHttpResponse(iter([self.BODY])))
+        self.assertFalse(streaming.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(streaming.streaming_content), self.BODY.encode())
+
+
+@override_settings(JOBS_RUN_INLINE=False, ADMINS=[('Admin', 'admin@example.com')])
+class WriteBehindQueueTests(TestCase):
+
+    def contact(self, i=0):
+        return Contact(name=f'N{i}', email='n@example.com', subject='S', message='M')
+
+    def writer(self, **kwargs):
+        queue = WriteBehindQueue(Contact, after_write=enqueue_contact_notifications, **kwargs)
+        # No writer thread: the test drives the queue from its own thread
+        patcher = mock.patch.object(queue, '_ensure_started')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Drained into the test database, which is rolled back afterwards
+        self.addCleanup(queue.shutdown)
+        return queue
+
+    def test_shutdown_flushes_the_queue(self):
+        queue = self.writer(batch_size=2)
+        for i in range(5):
+            self.assertTrue(queue.put(self.contact(i)))
+        self.assertEqual(Contact.objects.count(), 0)
+
+        queue.shutdown()
+        self.assertEqual(sorted(Contact.objects.values_list('name', flat=True)), ['N0', 'N1', 'N2', 'N3', 'N4'])
+        self.assertEqual(Job.objects.filter(task=tasks.notify_new_contact.task_name).count(), 5)
+        self.assertEqual(queue.stats()['batches'], 3)
+        self.assertFalse(queue.put(self.contact()))
+
+    def test_only_the_owner_registers_the_exit_hook(self):
+        with mock.patch('atexit.register') as register:
+            WriteBehindQueue(Contact)
+        register.assert_not_called()
+
+    def test_locked_database_is_retried(self):
+        queue = self.writer()
+        queue.put(self.contact())
+        with mock.patch('portfolio.writebehind.RETRY_DELAY', 0), \
+                mock.patch.object(Contact.objects, 'bulk_create', side_effect=[DatabaseError('locked'), None]), \
+                self.assertLogs('portfolio.writebehind', 'WARNING'):
+            queue.flush()
+        self.assertEqual(queue.stats()['retries'], 1)
+        self.assertEqual(queue.stats()['written'], 1)
+
+    @override_settings(CONTACT_WRITE_BEHIND=True)
+    def test_full_queue_saves_inline(self):
+        queue = self.writer(max_size=1)
+        self.assertTrue(queue.put(self.contact()))
+        self.assertFalse(queue.put(self.contact()))
+
+        with mock.patch('portfolio.views.main.contact_queue', queue):
+            response = self.client.post(reverse('portfolio:contact'), {
+                'name': 'Inline', 'email': 'inline@example.com', 'subject': 'Hi', 'message': 'Hello',
+            })
+        self.assertEqual(response.status_code, 200)
+        contact = Contact.objects.get()
+        self.assertEqual(contact.name, 'Inline')
+        self.assertEqual(Job.objects.get().kwargs, {'contact_id': contact.pk})
+        self.assertEqual(queue.stats()['depth'], 1)
+
+
+@task
+def failing_task(message='boom'):
+    raise RuntimeError(message)
+
+
+@override_settings(JOBS_RUN_INLINE=False, JOB_RETRY_DELAY=10)
+class JobQueueTests(TestCase):
+
+    def test_claim_takes_the_highest_priority_due_job(self):
+        low = enqueue(failing_task, priority=0)
+        high = enqueue(failing_task, priority=10)
+        enqueue(failing_task, priority=20, delay=60)
+
+        job = jobs.claim('worker-1')
+        self.assertEqual(job.pk, high.pk)
+        self.assertEqual((job.status, job.attempts, job.locked_by), (Job.RUNNING, 1, 'worker-1'))
+        self.assertEqual(jobs.claim('worker-2').pk, low.pk)
+        # The delayed job is not due yet
+        self.assertIsNone(jobs.claim('worker-3'))
+
+    def test_failure_is_retried_with_backoff(self):
+        enqueue(failing_task, max_attempts=2)
+        job = jobs.claim('worker')
+        with self.assertLogs('portfolio.jobs', 'WARNING'):
+            self.assertFalse(jobs.run(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('RuntimeError: boom', job.last_error)
+        self.assertEqual(job.locked_by, '')
+        delay = (job.run_at - timezone.now()).total_seconds()
+        self.assertTrue(9 < delay <= 12.5, delay)
+        self.assertIsNone(jobs.claim('worker'))
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        job = jobs.claim('worker')
+        with self.assertLogs('portfolio.jobs', 'ERROR'):
+            self.assertFalse(jobs.run(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_retry_delay_grows(self):
+        with mock.patch('portfolio.jobs.random.uniform', return_value=1):
+            self.assertEqual([jobs.retry_delay(n) for n in (1, 2, 3)], [10, 20, 40])
+            with self.settings(JOB_MAX_RETRY_DELAY=30):
+                self.assertEqual(jobs.retry_delay(3), 30)
+
+    def test_requeue_stale(self):
+        old = timezone.now() - timedelta(hours=1)
+        stale = Job.objects.create(task=failing_task.task_name, status=Job.RUNNING, attempts=1,
+                                   locked_by='dead', locked_at=old)
+        exhausted = Job.objects.create(task=failing_task.task_name, status=Job.RUNNING, attempts=5,
+                                       max_attempts=5, locked_by='dead', locked_at=old)
+        running = Job.objects.create(task=failing_task.task_name, status=Job.RUNNING, attempts=1,
+                                     locked_by='alive', locked_at=timezone.now())
+
+        self.assertEqual(jobs.requeue_stale(timeout=60), 2)
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {stale.pk: Job.QUEUED, exhausted.pk: Job.FAILED, running.pk: Job.RUNNING})
+        self.assertEqual(jobs.claim('worker').pk, stale.pk)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   JOBS_RUN_INLINE=False, IMAGE_DERIVATIVE_WIDTHS=[320, 640])
+class DedupeMediaTests(MediaRootMixin, TestCase):
+
+    def test_duplicates_lose_every_derivative(self):
+        # Written directly, as uploads from before ContentAddressedStorage were
+        data = png(200, 100).read()
+        for name in ('projects/logo.png', 'projects/logo_Ab12Cd.png'):
+            path = Path(default_storage.path(name))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        duplicate = 'projects/logo_Ab12Cd.png'
+        self.assertEqual([w for w, _ in generate_derivatives(duplicate)['jpeg']], [200])
+        # Left over from an earlier IMAGE_DERIVATIVE_WIDTHS
+        Path(default_storage.path(derivative_name(duplicate, 100, 'webp'))).write_bytes(b'old')
+        Project.objects.create(title='P', description='D', technologies='Python', image=duplicate)
+
+        call_command('dedupe_media', stdout=io.StringIO())
+        self.assertEqual(Project.objects.get().image.name, 'projects/logo.png')
+        self.assertEqual(os.listdir(default_storage.path('projects')), ['logo.png'])
+        self.assertEqual(get_variants(duplicate)['jpeg'], [])
+
+
+@override_settings(CACHES=NO_CACHE, JOBS_RUN_INLINE=False)
+class ContentAddressedStorageTests(MediaRootMixin, TestCase):
+
+    def test_same_bytes_are_stored_once(self):
+        self.assertIsInstance(default_storage, ContentAddressedStorage)
+        first = default_storage.save('projects/logo.PNG', ContentFile(b'same bytes'))
+        second = default_storage.save('projects/logo.PNG', ContentFile(b'same bytes'))
+        renamed = default_storage.save('projects/other.png', ContentFile(b'same bytes'))
+        self.assertEqual(first, f'projects/{hashlib.sha256(b"same bytes").hexdigest()[:32]}.png')
+        self.assertEqual(second, first)
+        self.assertEqual(renamed, first)
+        self.assertEqual(os.listdir(default_storage.path('projects')), [Path(first).name])
+
+        changed = default_storage.save('projects/logo.png', ContentFile(b'other bytes'))
+        self.assertNotEqual(changed, first)
+        with default_storage.open(first) as stored:
+            self.assertEqual(stored.read(), b'same bytes')
+
+    def test_models_share_an_upload(self):
+        one = Project.objects.create(title='One', description='D', technologies='Python', image=png(32, 32))
+        two = Project.objects.create(title='Two', description='D', technologies='Python', image=png(32, 32))
+        self.assertEqual(one.image.name, two.image.name)
+        self.assertEqual(len(os.listdir(default_storage.path('projects'))), 1)
+
+
+class ExplainViewsTests(SimpleTestCase):
+
+    def test_only_unbounded_full_scans_are_flagged(self):
+        sql = 'SELECT * FROM "portfolio_profile" ORDER BY "portfolio_profile"."id" ASC'
+        self.assertEqual(explain_problems(['SCAN portfolio_profile'], sql), ['full scan of portfolio_profile'])
+        self.assertEqual(explain_problems(['SCAN portfolio_profile'], f'{sql} LIMIT 1'), [])
+        for line in ('SCAN portfolio_blog USING INDEX portfolio_blog_slug',
+                     'SCAN portfolio_blog USING COVERING INDEX portfolio_blog_published',
+                     'SCAN portfolio_blog USING INTEGER PRIMARY KEY',
+                     'SCAN auth_user'):
+            with self.subTest(line=line):
+                self.assertEqual(explain_problems([line], sql), [])
+
+    def test_limit_after_a_temp_sort_still_scans(self):
+        plan = ['SCAN portfolio_blog', 'USE TEMP B-TREE FOR ORDER BY']
+        self.assertEqual(
+            explain_problems(plan, 'SELECT * FROM "portfolio_blog" ORDER BY "title" LIMIT 10'),
+            ['full scan of portfolio_blog', 'temp B-tree for ORDER BY'],
+        )
+
+
+class RenderBatchTests(SimpleTestCase):
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.root = Path(root) / 'media'
+        self.manifest = Path(root) / 'private' / 'manifest.json'
+        settings = override_settings(RENDER_MANIFEST=self.manifest)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.specs = {
+            'cards/good.png': card_spec((40, 20), 'teal', [('OK', 10)]),
+            'cards/bad.png': dict(card_spec((40, 20), 'teal', []), size=(-1, 20)),
+        }
+
+    def test_failure_is_recorded_and_the_manifest_written(self):
+        # Where earlier releases kept it
+        self.root.mkdir()
+        (self.root / RENDER_MANIFEST).write_text('{}')
+        for processes in (1, 2):
+            with self.subTest(jobs=processes):
+                results = render_batch(self.specs, self.root, jobs=processes, force=True)
+                self.assertIsInstance(results['cards/good.png'], float)
+                self.assertIsInstance(results['cards/bad.png'], Exception)
+                manifest = json.loads(self.manifest.read_text())
+                self.assertEqual(list(manifest), ['cards/good.png'])
+                self.assertFalse((self.root / RENDER_MANIFEST).exists())
+
+        again = render_batch(self.specs, self.root)
+        self.assertIsNone(again['cards/good.png'])
+        self.assertIsInstance(again['cards/bad.png'], Exception)
+
+
+FA_CSS = (
+    '.fa-github:before{content:"\\f09b"}.fa-not-used-anywhere:before{content:"\\f000"}'
+    '@font-face{font-family:"Font Awesome 6 Brands";src:url(../webfonts/fa-brands-400.woff2) format("woff2"),'
+    'url(../webfonts/fa-brands-400.ttf) format("truetype")}'
+)
+
+
+@override_settings(DEBUG=False)
+class AssetPipelineTests(TestCase):
+
+    def setUp(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        self.assets = root / 'assets'
+        shutil.copytree(assets.assets_root() / 'src', self.assets / 'src')
+        self.files = {}
+        for source in assets.VENDOR:
+            data = FA_CSS.encode() if source.path == assets.ICON_CSS else f'/* {source.path} */'.encode()
+            self.files[source.path] = data
+            path = self.assets / source.path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        settings = override_settings(ASSETS_ROOT=self.assets, STATICFILES_DIRS=[root / 'static'])
+        settings.enable()
+        self.addCleanup(settings.disable)
+        assets.save_lock({path: assets.sri(data) for path, data in self.files.items()})
+        clear_bundle_cache()
+        self.addCleanup(clear_bundle_cache)
+
+    def download(self, data):
+        return mock.patch('portfolio.assets.urllib.request.urlopen', return_value=io.BytesIO(data))
+
+    def test_fetch_checks_the_pinned_hash(self):
+        source = assets.VENDOR_BY_PATH['vendor/aos/aos.js']
+        path = self.assets / source.path
+        path.unlink()
+        lock = assets.load_lock()
+        with self.download(b'tampered'), self.assertRaises(assets.IntegrityError):
+            assets.fetch(source, lock)
+        self.assertFalse(path.exists())
+
+        with self.download(self.files[source.path]):
+            self.assertTrue(assets.fetch(source, lock))
+        self.assertEqual(path.read_bytes(), self.files[source.path])
+
+        # Files already on disk are checked too
+        path.write_bytes(b'edited')
+        with self.assertRaises(assets.IntegrityError):
+            assets.fetch(source, lock)
+
+        del lock[source.path]
+        with self.download(b'new release'), self.assertRaises(assets.IntegrityError):
+            assets.fetch(source, lock, refresh=True)
+        with self.download(b'new release'):
+            assets.fetch(source, lock, refresh=True, pin=True)
+        self.assertEqual(lock[source.path], assets.sri(b'new release'))
+
+    def test_build_prunes_icons_and_copies_fonts(self):
+        subset = mock.Mock(side_effect=lambda source, target, codepoints: bool(shutil.copyfile(source, target)))
+        with mock.patch('portfolio.management.commands.build_assets.subset_font', subset):
+            call_command('build_assets', stdout=io.StringIO())
+
+        dist = assets.dist_root()
+        css = (dist / 'site.css').read_text()
+        self.assertIn('.fa-github:before{content:"\\f09b"}', css)
+        self.assertNotIn('fa-not-used-anywhere', css)
+        self.assertIn('url(fonts/fa-brands-400.woff2) format("woff2")}', css)
+        self.assertNotIn('.ttf', css)
+        self.assertEqual(subset.call_args.args[2], {0xf09b})
+        self.assertEqual(
+            sorted(path.name for path in (dist / 'fonts').iterdir()),
+            ['fa-brands-400.woff2', 'inter-latin-wght-normal.woff2'],
+        )
+        js = (dist / 'site.js').read_text()
+        self.assertTrue(js.startswith('/* vendor/bootstrap/bootstrap.bundle.min.js */\n/* vendor/aos/aos.js */\n'))
+
+    def test_unpinned_file_fails_the_build(self):
+        lock = assets.load_lock()
+        del lock['vendor/aos/aos.js']
+        assets.save_lock(lock)
+        with self.assertRaisesMessage(CommandError, 'vendor/aos/aos.js has no hash'):
+            call_command('build_assets', stdout=io.StringIO())
+
+    def test_fallback_until_built(self):
+        tags = bundle('site.js')
+        bootstrap = assets.VENDOR_BY_PATH['vendor/bootstrap/bootstrap.bundle.min.js']
+        self.assertInHTML(
+            f'<script src="{bootstrap.url}" integrity="{assets.sri(self.files[bootstrap.path])}" '
+            'crossorigin="anonymous"></script>',
+            tags,
+        )
+        self.assertIn('<script>\n', tags)
+
+        call_command('build_assets', '--all-icons', stdout=io.StringIO())
+        self.assertHTMLEqual(bundle('site.js'), '<script src="/static/dist/site.js"></script>')
@@ -1,20 +1,30 @@
+from django.conf import settings
 from django.urls import path
 from . import views
+from .views import main_async
 from .views.robots import robots_txt
 
 app_name = 'portfolio'
 
+# The page views, async under ASGI (see views/main_async.py)
+pages = main_async if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('about/', views.about, name='about'),
-    path('skills/', views.skills, name='skills'),
-    path('projects/', views.projects, name='projects'),
-    path('projects/<int:project_id>/', views.project_detail, name='project_detail'),
-    path('services/', views.services_view, name='services'),
+    path('', pages.home, name='home'),
+    path('about/', pages.about, name='about'),
+    path('skills/', pages.skills, name='skills'),
+    path('projects/', pages.projects, name='projects'),
+    path('projects/<int:project_id>/', pages.project_detail, name='project_detail'),
+    path('services/', pages.services_view, name='services'),
     path('contact/', views.contact, name='contact'),
+    path('contact/queue/', views.contact_queue_stats, name='contact_queue_stats'),
     path('api/skills/', views.api_skills, name='api_skills'),
-    path('blogs/', views.blogs, name='blogs'),
-    path('blogs/<slug:slug>/', views.blog_detail, name='blog_detail'),
+    path('api/v1/<slug:resource>/', views.api_list, name='api_list'),
+    path('api/v1/<slug:resource>/<str:lookup>/', views.api_detail, name='api_detail'),
+    path('blogs/', pages.blogs, name='blogs'),
+    path('blogs/<slug:slug>/', pages.blog_detail, name='blog_detail'),
+    path('search/', pages.search_view, name='search'),
     path('robots.txt', robots_txt, name='robots_txt'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
 
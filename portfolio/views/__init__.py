@@ -6,9 +6,14 @@ from .main import (
     project_detail,
     services_view,
     contact,
+    contact_queue_stats,
     blogs,
     blog_detail,
-    api_skills
+    search_view,
 )
 
+from .api import api_list, api_detail, api_skills
+
+from .metrics import metrics
+
 from .robots import robots_txt
\ No newline at end of file
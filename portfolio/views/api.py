@@ -0,0 +1,306 @@
+"""
+Read-only JSON API: /api/v1/projects/, /api/v1/blogs/, /api/v1/services/.
+
+List endpoints take:
+
+    ?fields=title,url   sparse fieldset; only the columns those fields need
+                        are selected
+    ?limit=N            page size, up to API_MAX_PAGE_SIZE
+    ?cursor=...         opaque keyset cursor from ``next``/``previous``
+
+and return ``{"data": [...], "next": url|null, "previous": url|null}``.
+Detail endpoints (``/api/v1/projects/<id>/``, ``/api/v1/blogs/<slug>/``,
+``/api/v1/services/<id>/``) return ``{"data": {...}}`` and accept ``fields``.
+Errors are ``{"error": "..."}``: 400 for bad parameters, 404 for unknown
+resources and objects.
+
+Responses carry an ETag from the rows they are built from (see
+portfolio/conditional.py), and the encoded bytes are cached under the content
+version, so they are only serialized again after an edit.
+"""
+import hashlib
+import json
+from functools import wraps
+from typing import Callable, NamedTuple, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from ..cache import get_content_version
+from ..conditional import conditional_on
+from ..models import Blog, Project, Service, Skill, SkillCategory
+from ..pagination import InvalidCursor, KeysetPaginator
+
+CONTENT_TYPE = 'application/json'
+
+
+class Field(NamedTuple):
+    columns: Tuple[str, ...]                     # model fields to load
+    get: Callable                                # (obj, request) -> JSON value
+
+
+class Resource(NamedTuple):
+    model: type
+    ordering: Tuple[str, ...]                    # ends in a unique field
+    lookup: str                                  # detail URL keyword
+    fields: dict
+    default_fields: Tuple[str, ...]
+
+
+def _column(name):
+    return Field((name,), lambda obj, request: getattr(obj, name))
+
+
+def _image(name):
+    def get(obj, request):
+        image = getattr(obj, name)
+        return request.build_absolute_uri(image.url) if image else None
+    return Field((name,), get)
+
+
+def _url(view_name, attr):
+    return Field((attr,), lambda obj, request: request.build_absolute_uri(
+        reverse(view_name, args=[getattr(obj, attr)])
+    ))
+
+
+PROJECT_FIELDS = {
+    'id': _column('id'),
+    'title': _column('title'),
+    'description': _column('description'),
+    'technologies': Field(('technologies',), lambda obj, request: [
+        name.strip() for name in obj.technologies.split(',') if name.strip()
+    ]),
+    'github_url': _column('github_url'),
+    'live_url': _column('live_url'),
+    'image': _image('image'),
+    'featured': _column('featured'),
+    'url': _url('portfolio:project_detail', 'id'),
+    'created_at': _column('created_at'),
+    'updated_at': _column('updated_at'),
+}
+
+BLOG_FIELDS = {
+    'id': _column('id'),
+    'slug': _column('slug'),
+    'title': _column('title'),
+    'author': Field(('author__username',), lambda obj, request: obj.author.username if obj.author else None),
+    'summary': _column('summary'),
+    'excerpt': _column('excerpt'),
+    # The compiled body: clients get the same sanitized HTML as the site
+    'content': _column('content_html'),
+    'published_date': _column('published_date'),
+    'reading_time': _column('reading_time'),
+    'word_count': _column('word_count'),
+    'image': _image('image'),
+    'url': _url('portfolio:blog_detail', 'slug'),
+    'created_at': _column('created_at'),
+    'updated_at': _column('updated_at'),
+}
+
+SERVICE_FIELDS = {
+    'id': _column('id'),
+    'title': _column('title'),
+    'description': _column('description'),
+    'icon': _column('icon'),
+    'created_at': _column('created_at'),
+    'updated_at': _column('updated_at'),
+}
+
+RESOURCES = {
+    'projects': Resource(
+        Project, ('-featured', '-created_at', '-id'), 'id', PROJECT_FIELDS,
+        tuple(name for name in PROJECT_FIELDS if name != 'description'),
+    ),
+    'blogs': Resource(
+        Blog, ('-published_date', '-created_at', '-id'), 'slug', BLOG_FIELDS,
+        tuple(name for name in BLOG_FIELDS if name not in ('content', 'excerpt')),
+    ),
+    'services': Resource(Service, ('id',), 'id', SERVICE_FIELDS, tuple(SERVICE_FIELDS)),
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class NotFound(LookupError):
+    pass
+
+
+def get_resource(name):
+    try:
+        return RESOURCES[name]
+    except KeyError:
+        raise NotFound(f'No API resource {name!r}')
+
+
+def selected_fields(request, resource):
+    requested = request.GET.get('fields')
+    if not requested:
+        return resource.default_fields
+    names = tuple(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+    unknown = [name for name in names if name not in resource.fields]
+    if unknown or not names:
+        raise BadRequest(
+            f'Unknown field(s): {", ".join(unknown) or "(none)"}. '
+            f'Available: {", ".join(resource.fields)}'
+        )
+    return names
+
+
+def queryset_for(resource, names):
+    """Only the columns needed for ``names`` and the ordering."""
+    columns = {'pk'} | {key.lstrip('-') for key in resource.ordering}
+    for name in names:
+        columns.update(resource.fields[name].columns)
+    columns.discard('pk')
+    queryset = resource.model.objects.only(*sorted(columns))
+    related = {column.split('__', 1)[0] for column in columns if '__' in column}
+    return queryset.select_related(*related) if related else queryset
+
+
+def serialize(obj, resource, names, request):
+    return {name: resource.fields[name].get(obj, request) for name in names}
+
+
+def page_size(request):
+    default = getattr(settings, 'API_PAGE_SIZE', 20)
+    maximum = getattr(settings, 'API_MAX_PAGE_SIZE', 100)
+    try:
+        limit = int(request.GET.get('limit', default))
+    except ValueError:
+        raise BadRequest('limit must be an integer.')
+    if not 1 <= limit <= maximum:
+        raise BadRequest(f'limit must be between 1 and {maximum}.')
+    return limit
+
+
+def _page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{urlencode(sorted(params.items()))}')
+
+
+def _json_response(content, status=200):
+    response = HttpResponse(content, content_type=CONTENT_TYPE, status=status)
+    # Public, read-only data for widgets on other sites
+    response['Access-Control-Allow-Origin'] = '*'
+    return response
+
+
+def _error(message, status=400):
+    return _json_response(json.dumps({'error': message}), status=status)
+
+
+def json_errors(view_func):
+    """Answer ``BadRequest`` with a JSON 400 and ``NotFound`` with a JSON 404.
+
+    Outside ``conditional_on``, so a lookup that fails while computing the
+    validators gets the same response.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view_func(request, *args, **kwargs)
+        except BadRequest as e:
+            return _error(str(e))
+        except NotFound:
+            return _error('not found', status=404)
+    return wrapper
+
+
+def cached_json(request, build):
+    """Serve the encoded ``build()`` for this URL, cached per content version."""
+    url = request.build_absolute_uri()
+    key = f'portfolio:api:v{get_content_version()}:{hashlib.md5(url.encode("utf-8")).hexdigest()}'
+    content = cache.get(key)
+    if content is None:
+        data = build()
+        content = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8')
+        cache.set(key, content, getattr(settings, 'PAGE_CACHE_TIMEOUT', 600))
+    return _json_response(content)
+
+
+def _resource_rows(request, resource, lookup=None):
+    return get_resource(resource).model.objects.all()
+
+
+def _lookup(resource, value):
+    try:
+        return resource.model._meta.get_field(resource.lookup).to_python(value)
+    except ValidationError:
+        raise NotFound(f'No such {resource.model._meta.verbose_name}')
+
+
+def _detail_rows(request, resource, lookup):
+    resource = get_resource(resource)
+    return resource.model.objects.filter(**{resource.lookup: _lookup(resource, lookup)})
+
+
+@json_errors
+@conditional_on(_resource_rows)
+def api_list(request, resource):
+    """Paginated list of a resource"""
+    resource = get_resource(resource)
+
+    def build():
+        names = selected_fields(request, resource)
+        paginator = KeysetPaginator(queryset_for(resource, names), resource.ordering, page_size(request))
+        try:
+            page = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise BadRequest('Invalid cursor.')
+        return {
+            'data': [serialize(obj, resource, names, request) for obj in page],
+            'next': _page_url(request, page.next_cursor),
+            'previous': _page_url(request, page.previous_cursor),
+        }
+
+    return cached_json(request, build)
+
+
+@json_errors
+@conditional_on(_detail_rows)
+def api_detail(request, resource, lookup):
+    """A single object of a resource"""
+    resource = get_resource(resource)
+
+    def build():
+        names = selected_fields(request, resource)
+        try:
+            obj = queryset_for(resource, names).get(**{resource.lookup: _lookup(resource, lookup)})
+        except resource.model.DoesNotExist:
+            raise NotFound(f'No such {resource.model._meta.verbose_name}')
+        return {'data': serialize(obj, resource, names, request)}
+
+    return cached_json(request, build)
+
+
+@conditional_on(SkillCategory, Skill)
+def api_skills(request):
+    """API endpoint for skills"""
+    def build():
+        categories = SkillCategory.objects.only('name').prefetch_related('skills')
+        return {'categories': [
+            {
+                'name': category.name,
+                'skills': [
+                    {'name': skill.name, 'proficiency': skill.proficiency}
+                    for skill in category.skills.all()
+                ],
+            }
+            for category in categories
+        ]}
+
+    try:
+        return cached_json(request, build)
+    except Exception as e:
+        return _error(str(e), status=500)
@@ -1,10 +1,33 @@
+import atexit
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 from ..models import Profile, SkillCategory, Skill, Education, Project, Service, Contact
 from ..models import Blog
+from ..cache import cached_page
+from ..conditional import conditional_on
+from ..pagination import InvalidCursor, KeysetPaginator
+from ..tasks import enqueue_contact_notifications
+from ..writebehind import WriteBehindQueue
+from .. import search
+
+SEARCH_QUERY_MAX_LENGTH = 200
+SEARCH_RESULTS = 20
+
+# Blog.Meta.ordering plus the primary key, so every row has a unique position
+BLOG_ORDERING = ('-published_date', '-created_at', '-id')
+
+# Contact submissions are saved by a background writer (see writebehind.py)
+contact_queue = WriteBehindQueue(Contact, after_write=enqueue_contact_notifications)
+atexit.register(contact_queue.shutdown)
 
+@conditional_on(Profile, SkillCategory, Skill, Education, Project, Service)
+@cached_page
 def home(request):
     """Home page view with all portfolio sections"""
     try:
@@ -24,8 +47,10 @@ def home(request):
         
         return render(request, 'portfolio/home.html', context)
     except Exception as e:
-        return render(request, 'portfolio/error.html', {'error': str(e)})
+        return render(request, 'portfolio/error.html', {'error': str(e)}, status=500)
 
+@conditional_on(Profile)
+@cached_page
 def about(request):
     """About page with detailed profile information"""
     try:
@@ -35,8 +60,10 @@ def about(request):
         }
         return render(request, 'portfolio/about.html', context)
     except Exception as e:
-        return render(request, 'portfolio/error.html', {'error': str(e)})
+        return render(request, 'portfolio/error.html', {'error': str(e)}, status=500)
 
+@conditional_on(Profile, SkillCategory, Skill)
+@cached_page
 def skills(request):
     """Skills page with detailed skill breakdown"""
     try:
@@ -46,8 +73,10 @@ def skills(request):
         }
         return render(request, 'portfolio/skills.html', context)
     except Exception as e:
-        return render(request, 'portfolio/error.html', {'error': str(e)})
+        return render(request, 'portfolio/error.html', {'error': str(e)}, status=500)
 
+@conditional_on(Profile, Project)
+@cached_page
 def projects(request):
     """Projects page with all projects"""
     try:
@@ -57,8 +86,9 @@ def projects(request):
         }
         return render(request, 'portfolio/projects.html', context)
     except Exception as e:
-        return render(request, 'portfolio/error.html', {'error': str(e)})
+        return render(request, 'portfolio/error.html', {'error': str(e)}, status=500)
 
+@conditional_on(Profile, lambda request, project_id: Project.objects.filter(id=project_id))
 def project_detail(request, project_id):
     """Individual project detail page"""
     try:
@@ -67,9 +97,13 @@ def project_detail(request, project_id):
             'project': project,
         }
         return render(request, 'portfolio/project_detail.html', context)
+    except Http404:
+        raise
     except Exception as e:
-        return render(request, 'portfolio/error.html', {'error': str(e)})
+        return render(request, 'portfolio/error.html', {'error': str(e)}, status=500)
 
+@conditional_on(Profile, Service)
+@cached_page
 def services_view(request):
     """Services page"""
     try:
@@ -79,56 +113,85 @@ def services_view(request):
         }
         return render(request, 'portfolio/services.html', context)
     except Exception as e:
-        return render(request, 'portfolio/error.html', {'error': str(e)})
+        return render(request, 'portfolio/error.html', {'error': str(e)}, status=500)
 
 def contact(request):
     """Contact page"""
     try:
         if request.method == 'POST':
-            name = request.POST.get('name')
-            email = request.POST.get('email')
-            message = request.POST.get('message')
-            
-            Contact.objects.create(
-                name=name,
-                email=email,
-                message=message
+            submission = Contact(
+                name=request.POST.get('name', '').strip(),
+                email=request.POST.get('email', '').strip(),
+                subject=request.POST.get('subject', '').strip(),
+                message=request.POST.get('message', '').strip(),
             )
+            try:
+                submission.full_clean()
+            except ValidationError as e:
+                for field, errors in e.message_dict.items():
+                    messages.error(request, f'{field.capitalize()}: {" ".join(errors)}')
+                return render(request, 'portfolio/contact.html', status=400)
+
+            # Queued rather than written here, so the request never waits
+            # on the database write lock. Saved inline if the queue is full.
+            if not (settings.CONTACT_WRITE_BEHIND and contact_queue.put(submission)):
+                with transaction.atomic():
+                    submission.save()
+                    enqueue_contact_notifications([submission])
             messages.success(request, 'Message sent successfully!')
             return render(request, 'portfolio/contact.html')
             
         return render(request, 'portfolio/contact.html')
     except Exception as e:
-        return render(request, 'portfolio/error.html', {'error': str(e)})
+        return render(request, 'portfolio/error.html', {'error': str(e)}, status=500)
+
+@staff_member_required
+def contact_queue_stats(request):
+    """Depth and flush latency of the contact write-behind queue (this process)"""
+    return JsonResponse(contact_queue.stats())
 
+@conditional_on(Profile, Blog)
+@cached_page
 def blogs(request):
-    """List of blog posts"""
+    """List of blog posts, one keyset page at a time"""
     try:
-        posts = Blog.objects.all()
-        return render(request, 'portfolio/blogs.html', {'posts': posts, 'profile': Profile.objects.first()})
+        paginator = KeysetPaginator(
+            Blog.objects.select_related('author').defer('content', 'content_html', 'toc_html'),
+            BLOG_ORDERING, settings.BLOG_PAGE_SIZE,
+        )
+        try:
+            page = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor:
+            page = paginator.page()
+        return render(request, 'portfolio/blogs.html', {
+            'posts': page.object_list,
+            'page': page,
+            'profile': Profile.objects.first(),
+        })
     except Exception as e:
-        return render(request, 'portfolio/error.html', {'error': str(e)})
+        return render(request, 'portfolio/error.html', {'error': str(e)}, status=500)
 
+@conditional_on(Profile, lambda request, slug: Blog.objects.filter(slug=slug))
 def blog_detail(request, slug):
     """Individual blog post"""
     try:
-        post = get_object_or_404(Blog, slug=slug)
+        post = get_object_or_404(Blog.objects.select_related('author'), slug=slug)
         return render(request, 'portfolio/blog_detail.html', {'post': post, 'profile': Profile.objects.first()})
+    except Http404:
+        raise
     except Exception as e:
-        return render(request, 'portfolio/error.html', {'error': str(e)})
+        return render(request, 'portfolio/error.html', {'error': str(e)}, status=500)
 
-def api_skills(request):
-    """API endpoint for skills"""
+@conditional_on(Profile, Blog, Project, Service)
+def search_view(request):
+    """Full-text search across blogs, projects and services"""
+    query = request.GET.get('q', '').strip()[:SEARCH_QUERY_MAX_LENGTH]
     try:
-        categories = SkillCategory.objects.prefetch_related('skills').all()
-        data = []
-        for category in categories:
-            skills = [{'name': skill.name, 'proficiency': skill.proficiency} 
-                     for skill in category.skills.all()]
-            data.append({
-                'name': category.name,
-                'skills': skills
-            })
-        return JsonResponse({'categories': data})
+        results = search.search(query, limit=SEARCH_RESULTS) if query else []
+        return render(request, 'portfolio/search.html', {
+            'query': query,
+            'results': results,
+            'profile': Profile.objects.first(),
+        })
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+        return render(request, 'portfolio/error.html', {'error': str(e)}, status=500)
@@ -0,0 +1,181 @@
+"""
+Async versions of the page views in main.py, used when ``ASYNC_VIEWS`` is on
+(abid_portfolio/asgi.py turns it on).
+
+Each view gathers its independent queries with ``asyncio.gather`` over the
+async ORM, so the event loop serves other requests while they run, and hands
+the evaluated results to ``arender``. Rendering (context processors, the
+lazy ``request.user``, the session) stays synchronous and runs in the
+request's worker thread. The site profile comes from ``aget_site_profile``,
+which the ``site_profile`` context processor then reuses.
+
+The contact form and the staff views stay synchronous (main.py); Django runs
+them in a thread under ASGI.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import aget_object_or_404, render
+
+from ..cache import cached_page
+from ..conditional import conditional_on
+from ..context_processors import aget_site_profile
+from ..models import Blog, Education, Profile, Project, Service, Skill, SkillCategory
+from ..pagination import InvalidCursor, KeysetPaginator
+from .. import search
+from .main import BLOG_ORDERING, SEARCH_QUERY_MAX_LENGTH, SEARCH_RESULTS
+
+arender = sync_to_async(render)
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset]
+
+
+@conditional_on(Profile, SkillCategory, Skill, Education, Project, Service)
+@cached_page
+async def home(request):
+    """Home page view with all portfolio sections"""
+    try:
+        profile, skill_categories, education, featured_projects, services = await asyncio.gather(
+            aget_site_profile(request),
+            alist(SkillCategory.objects.prefetch_related('skills')),
+            alist(Education.objects.order_by('-year')),
+            alist(Project.objects.filter(featured=True)[:3]),
+            alist(Service.objects.all()),
+        )
+        return await arender(request, 'portfolio/home.html', {
+            'profile': profile,
+            'skill_categories': skill_categories,
+            'education': education,
+            'featured_projects': featured_projects,
+            'services': services,
+        })
+    except Exception as e:
+        return await arender(request, 'portfolio/error.html', {'error': str(e)}, status=500)
+
+
+@conditional_on(Profile)
+@cached_page
+async def about(request):
+    """About page with detailed profile information"""
+    try:
+        profile = await aget_site_profile(request)
+        return await arender(request, 'portfolio/about.html', {'profile': profile})
+    except Exception as e:
+        return await arender(request, 'portfolio/error.html', {'error': str(e)}, status=500)
+
+
+@conditional_on(Profile, SkillCategory, Skill)
+@cached_page
+async def skills(request):
+    """Skills page with detailed skill breakdown"""
+    try:
+        skill_categories, _ = await asyncio.gather(
+            alist(SkillCategory.objects.prefetch_related('skills')),
+            aget_site_profile(request),
+        )
+        return await arender(request, 'portfolio/skills.html', {'skill_categories': skill_categories})
+    except Exception as e:
+        return await arender(request, 'portfolio/error.html', {'error': str(e)}, status=500)
+
+
+@conditional_on(Profile, Project)
+@cached_page
+async def projects(request):
+    """Projects page with all projects"""
+    try:
+        all_projects, _ = await asyncio.gather(alist(Project.objects.all()), aget_site_profile(request))
+        return await arender(request, 'portfolio/projects.html', {'projects': all_projects})
+    except Exception as e:
+        return await arender(request, 'portfolio/error.html', {'error': str(e)}, status=500)
+
+
+@conditional_on(Profile, lambda request, project_id: Project.objects.filter(id=project_id))
+async def project_detail(request, project_id):
+    """Individual project detail page"""
+    try:
+        project, _ = await asyncio.gather(
+            aget_object_or_404(Project, id=project_id),
+            aget_site_profile(request),
+        )
+        return await arender(request, 'portfolio/project_detail.html', {'project': project})
+    except Http404:
+        raise
+    except Exception as e:
+        return await arender(request, 'portfolio/error.html', {'error': str(e)}, status=500)
+
+
+@conditional_on(Profile, Service)
+@cached_page
+async def services_view(request):
+    """Services page"""
+    try:
+        services, _ = await asyncio.gather(alist(Service.objects.all()), aget_site_profile(request))
+        return await arender(request, 'portfolio/services.html', {'services': services})
+    except Exception as e:
+        return await arender(request, 'portfolio/error.html', {'error': str(e)}, status=500)
+
+
+@conditional_on(Profile, Blog)
+@cached_page
+async def blogs(request):
+    """List of blog posts, one keyset page at a time"""
+    try:
+        paginator = KeysetPaginator(
+            Blog.objects.select_related('author').defer('content', 'content_html', 'toc_html'),
+            BLOG_ORDERING, settings.BLOG_PAGE_SIZE,
+        )
+
+        async def get_page():
+            try:
+                return await sync_to_async(paginator.page)(request.GET.get('cursor'))
+            except InvalidCursor:
+                return await sync_to_async(paginator.page)()
+
+        page, profile = await asyncio.gather(get_page(), aget_site_profile(request))
+        return await arender(request, 'portfolio/blogs.html', {
+            'posts': page.object_list,
+            'page': page,
+            'profile': profile,
+        })
+    except Exception as e:
+        return await arender(request, 'portfolio/error.html', {'error': str(e)}, status=500)
+
+
+@conditional_on(Profile, lambda request, slug: Blog.objects.filter(slug=slug))
+async def blog_detail(request, slug):
+    """Individual blog post"""
+    try:
+        post, profile = await asyncio.gather(
+            aget_object_or_404(Blog.objects.select_related('author'), slug=slug),
+            aget_site_profile(request),
+        )
+        return await arender(request, 'portfolio/blog_detail.html', {'post': post, 'profile': profile})
+    except Http404:
+        raise
+    except Exception as e:
+        return await arender(request, 'portfolio/error.html', {'error': str(e)}, status=500)
+
+
+@conditional_on(Profile, Blog, Project, Service)
+async def search_view(request):
+    """Full-text search across blogs, projects and services"""
+    query = request.GET.get('q', '').strip()[:SEARCH_QUERY_MAX_LENGTH]
+    try:
+        if query:
+            results, profile = await asyncio.gather(
+                sync_to_async(search.search)(query, limit=SEARCH_RESULTS),
+                aget_site_profile(request),
+            )
+        else:
+            results, profile = [], await aget_site_profile(request)
+        return await arender(request, 'portfolio/search.html', {
+            'query': query,
+            'results': results,
+            'profile': profile,
+        })
+    except Exception as e:
+        return await arender(request, 'portfolio/error.html', {'error': str(e)}, status=500)
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db.models import Count
+from django.http import Http404, HttpResponse
+
+from ..metrics import registry
+from ..models import Job
+from .main import contact_queue
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics(request):
+    """Request timings, contact queue and job counts in Prometheus text format.
+
+    Internal: only served to METRICS_ALLOWED_IPS and staff users. The request
+    numbers and the contact queue are those of the process that answers.
+    """
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', ('127.0.0.1', '::1'))
+    if request.META.get('REMOTE_ADDR') not in allowed and not request.user.is_staff:
+        raise Http404
+
+    lines = registry.exposition()
+
+    queue = contact_queue.stats()
+    lines += [
+        '# HELP portfolio_contact_queue_depth Contact submissions waiting to be written.',
+        '# TYPE portfolio_contact_queue_depth gauge',
+        f'portfolio_contact_queue_depth {queue["depth"]}',
+        '# HELP portfolio_contact_queue_written_total Contact submissions written.',
+        '# TYPE portfolio_contact_queue_written_total counter',
+        f'portfolio_contact_queue_written_total {queue["written"]}',
+        '# HELP portfolio_contact_queue_retries_total Failed contact batch writes that were retried.',
+        '# TYPE portfolio_contact_queue_retries_total counter',
+        f'portfolio_contact_queue_retries_total {queue["retries"]}',
+    ]
+
+    jobs = dict(Job.objects.values_list('status').annotate(count=Count('id')).order_by())
+    lines += [
+        '# HELP portfolio_jobs Background jobs, by status.',
+        '# TYPE portfolio_jobs gauge',
+    ]
+    lines += [
+        f'portfolio_jobs{{status="{status}"}} {jobs.get(status, 0)}' for status, _ in Job.STATUS_CHOICES
+    ]
+
+    response = HttpResponse('\n'.join(lines) + '\n', content_type=CONTENT_TYPE)
+    response['Cache-Control'] = 'no-store'
+    return response
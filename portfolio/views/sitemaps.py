@@ -0,0 +1,115 @@
+"""
+sitemap.xml, generated as a stream and cached until content changes.
+
+Up to ``SITEMAP_SHARD_SIZE`` URLs are served as one ``<urlset>``. Above that,
+``/sitemap.xml`` becomes a sitemap index pointing at
+``/sitemap-<section>-<page>.xml`` shards of at most that many URLs each.
+
+On a cache miss the XML is streamed to the client while it is generated, and
+the finished document is stored under the current content version, so a burst
+of crawler requests costs one pass over the database.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.html import escape
+
+from ..cache import get_content_version
+from ..conditional import conditional_on
+from ..models import Blog, Project
+from ..sitemaps import SITEMAPS
+
+CONTENT_TYPE = 'application/xml; charset=utf-8'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def _base_url(request):
+    return f'{request.scheme}://{request.get_host()}'
+
+
+def _cache_key(request, name):
+    return f'portfolio:sitemap:v{get_content_version()}:{_base_url(request)}:{name}'
+
+
+def _url_entry(sitemap, item, base):
+    parts = [f'<url><loc>{escape(base + sitemap.location(item))}</loc>']
+    lastmod = sitemap.lastmod(item) if hasattr(sitemap, 'lastmod') else None
+    if lastmod:
+        parts.append(f'<lastmod>{lastmod.date().isoformat()}</lastmod>')
+    if sitemap.changefreq:
+        parts.append(f'<changefreq>{sitemap.changefreq}</changefreq>')
+    if sitemap.priority is not None:
+        parts.append(f'<priority>{sitemap.priority}</priority>')
+    parts.append('</url>\n')
+    return ''.join(parts)
+
+
+def iter_urlset(sections, base):
+    """Yield a ``<urlset>`` for ``(sitemap, page)`` pairs, one URL at a time."""
+    yield f'{XML_HEADER}<urlset xmlns="{SITEMAP_NS}">\n'
+    for sitemap, page in sections:
+        for item in sitemap.page_items(page):
+            yield _url_entry(sitemap, item, base)
+    yield '</urlset>\n'
+
+
+def iter_index(shards, base):
+    yield f'{XML_HEADER}<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for section, page in shards:
+        loc = base + reverse('sitemap_section', args=[section, page])
+        yield f'<sitemap><loc>{escape(loc)}</loc></sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def _cached_stream(key, make_chunks):
+    """Serve ``key`` from the cache, or stream ``make_chunks()`` and cache it."""
+    content = cache.get(key)
+    if content is not None:
+        return HttpResponse(content, content_type=CONTENT_TYPE)
+    chunks = make_chunks()
+
+    def tee():
+        parts = []
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            parts.append(data)
+            yield data
+        # Only a complete document is cached; an aborted stream is dropped.
+        cache.set(key, b''.join(parts), getattr(settings, 'PAGE_CACHE_TIMEOUT', 600))
+
+    return StreamingHttpResponse(tee(), content_type=CONTENT_TYPE)
+
+
+@conditional_on(Project, Blog)
+def sitemap_index(request):
+    """sitemap.xml: a single urlset, or an index of shards above the threshold"""
+    def make_chunks():
+        sitemaps = {section: cls() for section, cls in SITEMAPS.items()}
+        total = sum(sitemap.paginator.count for sitemap in sitemaps.values())
+        if total <= getattr(settings, 'SITEMAP_SHARD_SIZE', 5000):
+            return iter_urlset([(sitemap, 1) for sitemap in sitemaps.values()], _base_url(request))
+        shards = [
+            (section, page)
+            for section, sitemap in sitemaps.items()
+            for page in sitemap.paginator.page_range
+        ]
+        return iter_index(shards, _base_url(request))
+
+    return _cached_stream(_cache_key(request, 'index'), make_chunks)
+
+
+@conditional_on(Project, Blog)
+def sitemap_section(request, section, page):
+    """One shard of a sharded sitemap"""
+    if section not in SITEMAPS:
+        raise Http404(f'No sitemap section {section!r}')
+
+    def make_chunks():
+        sitemap = SITEMAPS[section]()
+        if page not in sitemap.paginator.page_range:
+            raise Http404(f'No page {page} in sitemap section {section!r}')
+        return iter_urlset([(sitemap, page)], _base_url(request))
+
+    return _cached_stream(_cache_key(request, f'{section}:{page}'), make_chunks)
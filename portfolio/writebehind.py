@@ -0,0 +1,183 @@
+"""
+Write-behind queue for rows that do not need to be in the database before the
+response is sent (contact form submissions).
+
+SQLite allows one writer at a time. Instead of every request waiting for the
+write lock, validated, unsaved instances are put on an in-process queue and a
+background thread inserts them in batches, one ``bulk_create`` transaction per
+batch. A locked database delays the batch, with backoff, instead of failing a
+request.
+
+The queue is per process and lives in memory. Its owner registers
+``shutdown`` with ``atexit``, so on a graceful shutdown (SIGTERM/SIGINT
+handled by gunicorn or runserver, normal interpreter exit) it is drained
+synchronously. A hard kill loses at most what
+was queued in the last ``WRITE_BEHIND_INTERVAL``.
+"""
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.forms.models import model_to_dict
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = 0.05
+MAX_RETRY_DELAY = 5
+SHUTDOWN_ATTEMPTS = 5
+SHUTDOWN_TIMEOUT = 10
+
+
+class WriteBehindQueue:
+    """Queue unsaved ``model`` instances and insert them from a writer thread.
+
+    ``after_write(batch)`` is called in the same transaction as each insert,
+    e.g. to queue follow-up jobs for the new rows.
+
+    Usage::
+
+        contact_queue = WriteBehindQueue(Contact)
+        atexit.register(contact_queue.shutdown)
+        if not contact_queue.put(Contact(name=..., email=...)):
+            ...  # queue full or shut down: save synchronously
+    """
+
+    def __init__(self, model, batch_size=None, interval=None, max_size=None, after_write=None):
+        self.model = model
+        self.after_write = after_write
+        self.batch_size = batch_size or getattr(settings, 'WRITE_BEHIND_BATCH_SIZE', 100)
+        self.interval = interval or getattr(settings, 'WRITE_BEHIND_INTERVAL', 1.0)
+        self._queue = queue.Queue(maxsize=max_size or getattr(settings, 'WRITE_BEHIND_MAX_SIZE', 10000))
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._unwritten = []
+        self.queued = self.written = self.batches = self.retries = 0
+        self.last_flush_ms = self.max_flush_ms = self.total_flush_ms = 0.0
+
+    def put(self, obj):
+        """Queue ``obj`` for insertion. Returns False if it was not queued."""
+        if self._stopping.is_set():
+            return False
+        try:
+            self._queue.put_nowait(obj)
+        except queue.Full:
+            return False
+        with self._stats_lock:
+            self.queued += 1
+        self._ensure_started()
+        return True
+
+    def _ensure_started(self):
+        # Started lazily, so each forked worker process gets its own writer
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f'write-behind-{self.model._meta.model_name}', daemon=True,
+                )
+                self._thread.start()
+
+    def _take(self, block):
+        """Up to ``batch_size`` queued objects, waiting ``interval`` for the first if ``block``."""
+        batch = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                batch = self._take(block=True)
+                if batch and not self._write(batch):
+                    # Shutting down while the database is unavailable
+                    self._unwritten.extend(batch)
+                    break
+        finally:
+            connections.close_all()
+
+    def _write(self, batch, attempts=None):
+        """Insert ``batch`` in one transaction, retrying while the database is locked.
+
+        Retries until it succeeds, or for ``attempts`` tries (fewer once
+        shutting down). Returns whether the batch was written.
+        """
+        delay = RETRY_DELAY
+        attempt = 0
+        while True:
+            attempt += 1
+            for obj in batch:
+                # A rolled-back bulk_create may have assigned primary keys
+                obj.pk = None
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    self.model.objects.bulk_create(batch)
+                    if self.after_write is not None:
+                        self.after_write(batch)
+            except DatabaseError:
+                with self._stats_lock:
+                    self.retries += 1
+                logger.warning('Could not write %d queued %s (attempt %d)',
+                               len(batch), self.model._meta.verbose_name_plural, attempt, exc_info=True)
+                limit = SHUTDOWN_ATTEMPTS if self._stopping.is_set() else attempts
+                if limit is not None and attempt >= limit:
+                    return False
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._stats_lock:
+                self.written += len(batch)
+                self.batches += 1
+                self.last_flush_ms = elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self.total_flush_ms += elapsed_ms
+            return True
+
+    def flush(self):
+        """Write everything queued so far from the calling thread."""
+        while True:
+            batch = self._take(block=False)
+            if not batch:
+                return
+            if not self._write(batch, attempts=SHUTDOWN_ATTEMPTS):
+                self._unwritten.extend(batch)
+                return
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Stop the writer and drain the queue; called at exit."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+        unwritten, self._unwritten = self._unwritten, []
+        for start in range(0, len(unwritten), self.batch_size):
+            batch = unwritten[start:start + self.batch_size]
+            if not self._write(batch, attempts=SHUTDOWN_ATTEMPTS):
+                # Last resort: keep the data in the logs rather than lose it
+                for obj in batch:
+                    logger.error('Unsaved %s: %r', self.model._meta.verbose_name, model_to_dict(obj))
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'depth': self._queue.qsize(),
+                'queued': self.queued,
+                'written': self.written,
+                'batches': self.batches,
+                'retries': self.retries,
+                'last_flush_ms': round(self.last_flush_ms, 2),
+                'max_flush_ms': round(self.max_flush_ms, 2),
+                'mean_flush_ms': round(self.total_flush_ms / self.batches, 2) if self.batches else 0.0,
+            }